@@ -0,0 +1,38 @@
+import random
+import string
+
+from collections import OrderedDict
+
+
+def partition_name(index):
+    return 'partition-%04d' % (index,)
+
+
+def make_rows(
+    count,
+    partitions=10,
+    seed=0
+):
+    '''
+    Returns count deterministic synthetic rows shaped like the rows
+    the driver returns for BenchmarkRowModel (ordered dicts keyed by
+    column name), spread over the given number of partitions.
+    '''
+    generator = random.Random(seed)
+    letters = string.ascii_lowercase
+
+    rows = []
+    for index in xrange(count):
+        rows.append(OrderedDict([
+            ('partition', partition_name(index % partitions)),
+            ('cluster', index // partitions),
+            ('value', generator.randint(0, 1000)),
+            ('name', ''.join(
+                generator.choice(letters) for _ in xrange(16)
+            )),
+            ('payload', ''.join(
+                generator.choice(letters) for _ in xrange(64)
+            ))
+        ]))
+
+    return rows
@@ -0,0 +1,660 @@
+'''
+Concurrent load harness. Seeds a deterministic dataset then runs a
+weighted mix of backend operations from several threads (or processes)
+and reports throughput and latency percentiles per operation:
+
+    python -m benchmarks.load --engine memory --latency 0.0005,0.002
+    python -m benchmarks.load --workers 16 --processes --duration 30
+'''
+import os
+import sys
+import json
+import math
+import time
+import random
+import string
+import platform
+import warnings
+import threading
+import multiprocessing
+
+from timeit import default_timer
+from collections import OrderedDict
+
+from .runner import setup_django
+from .data import (
+    make_rows,
+    partition_name
+)
+
+
+ENGINES = {
+    'cassandra': 'djangocassandra.db.backends.cassandra',
+    'memory': 'djangocassandra.db.backends.memory'
+}
+
+DEFAULT_MIX = OrderedDict([
+    ('get', 40),
+    ('range', 25),
+    ('filter', 5),
+    ('insert', 15),
+    ('denormalize', 10),
+    ('delete', 5)
+])
+
+EVENT_KINDS = (
+    'click',
+    'view',
+    'purchase',
+    'signup'
+)
+
+OPERATIONS = OrderedDict()
+
+
+def operation(name):
+    '''
+    Registers a load operation. It's called with the worker's
+    Workload and returns the number of rows it read or wrote.
+    '''
+    def decorator(function):
+        OPERATIONS[name] = function
+        return function
+
+    return decorator
+
+
+class Workload(object):
+    '''
+    Per worker state: a random generator seeded from the run's seed
+    and the worker index, and the rows the worker inserted (the only
+    ones it deletes, so workers never race on the same keys).
+    '''
+    def __init__(
+        self,
+        index,
+        workers,
+        partitions,
+        partition_width,
+        range_size,
+        seed
+    ):
+        self.index = index
+        self.workers = workers
+        self.partitions = partitions
+        self.partition_width = partition_width
+        self.range_size = range_size
+        self.random = random.Random(seed * 1000003 + index)
+        self.sequence = 0
+        self.inserted = []
+        self.payloads = [
+            ''.join(
+                self.random.choice(string.ascii_lowercase)
+                for _ in xrange(64)
+            ) for _ in xrange(32)
+        ]
+
+    def partition(self):
+        return partition_name(self.random.randrange(self.partitions))
+
+    def payload(self):
+        return self.random.choice(self.payloads)
+
+    def next_sequence(self):
+        '''
+        Clustering values above the seeded ones, unique per worker.
+        '''
+        self.sequence += 1
+        return (
+            self.partition_width +
+            self.sequence * self.workers +
+            self.index
+        )
+
+
+@operation('get')
+def get_row(workload):
+    from .models import BenchmarkRowModel
+
+    BenchmarkRowModel.objects.get(
+        partition=workload.partition(),
+        cluster=workload.random.randrange(workload.partition_width)
+    )
+    return 1
+
+
+@operation('range')
+def clustering_range(workload):
+    from .models import BenchmarkRowModel
+
+    start = workload.random.randrange(
+        max(workload.partition_width - workload.range_size, 0) + 1
+    )
+    return len(list(BenchmarkRowModel.objects.filter(
+        partition=workload.partition(),
+        cluster__gte=start,
+        cluster__lt=start + workload.range_size
+    )))
+
+
+@operation('filter')
+def inefficient_filter(workload):
+    '''
+    name isn't indexed, the partition is read and filtered client side.
+    '''
+    from .models import BenchmarkRowModel
+
+    return len(list(BenchmarkRowModel.objects.filter(
+        partition=workload.partition(),
+        name__startswith=workload.random.choice(string.ascii_lowercase)
+    )))
+
+
+@operation('insert')
+def insert_row(workload):
+    from .models import BenchmarkRowModel
+
+    partition = workload.partition()
+    cluster = workload.next_sequence()
+    BenchmarkRowModel.objects.create(
+        partition=partition,
+        cluster=cluster,
+        value=workload.random.randint(0, 1000),
+        name=workload.payload()[:16],
+        payload=workload.payload()
+    )
+    workload.inserted.append((partition, cluster))
+    return 1
+
+
+@operation('denormalize')
+def denormalized_save(workload):
+    from .models import BenchmarkEventModel
+
+    BenchmarkEventModel.objects.create(
+        tenant=workload.partition(),
+        sequence=workload.next_sequence(),
+        kind=workload.random.choice(EVENT_KINDS),
+        payload=workload.payload()
+    )
+    return 2
+
+
+@operation('delete')
+def delete_row(workload):
+    from .models import BenchmarkRowModel
+
+    if not workload.inserted:
+        return 0
+
+    partition, cluster = workload.inserted.pop(
+        workload.random.randrange(len(workload.inserted))
+    )
+    BenchmarkRowModel.objects.filter(
+        partition=partition,
+        cluster=cluster
+    ).delete()
+    return 1
+
+
+def parse_mix(mix):
+    '''
+    Parses "get=40,range=25,..." into an ordered dict of weights.
+    '''
+    weights = OrderedDict()
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError('Unknown operation %s (one of %s)' % (
+                name,
+                ', '.join(OPERATIONS)
+            ))
+
+        weights[name] = float(weight or 1)
+
+    return weights
+
+
+def percentile(values, percent):
+    '''
+    Nearest rank percentile of already sorted values.
+    '''
+    if not values:
+        return None
+
+    rank = int(math.ceil(percent / 100.0 * len(values)))
+    return values[min(max(rank, 1), len(values)) - 1]
+
+
+def get_models():
+    from .models import (
+        BenchmarkRowModel,
+        BenchmarkEventModel,
+        BenchmarkEventByKindModel
+    )
+
+    return [
+        BenchmarkRowModel,
+        BenchmarkEventModel,
+        BenchmarkEventByKindModel
+    ]
+
+
+def seed_dataset(
+    partitions,
+    partition_width,
+    seed=0,
+    batch_size=500,
+    out=sys.stdout
+):
+    '''
+    Creates the benchmark tables, empties them and inserts
+    partitions * partition_width deterministic rows.
+    '''
+    from django.db import connections
+
+    from .models import BenchmarkRowModel
+
+    connection = connections['default']
+    connection.ensure_connection()
+    with connection.schema_editor() as schema_editor:
+        for model in get_models():
+            schema_editor.create_model(model)
+
+    connection.ops.flush_tables([
+        model._meta.db_table for model in get_models()
+    ])
+
+    started = default_timer()
+    rows = make_rows(
+        partitions * partition_width,
+        partitions=partitions,
+        seed=seed
+    )
+    for start in xrange(0, len(rows), batch_size):
+        BenchmarkRowModel.objects.bulk_create([
+            BenchmarkRowModel(**row)
+            for row in rows[start:start + batch_size]
+        ])
+
+    out.write('Seeded %d rows in %d partitions in %.1fs\n' % (
+        len(rows),
+        partitions,
+        default_timer() - started
+    ))
+
+
+def run_worker(
+    workload,
+    mix,
+    deadline=None,
+    operations=None
+):
+    '''
+    Runs operations picked from mix until the deadline (a time.time()
+    value) passes or the given number of operations ran. Returns
+    {operation: [latency seconds]} and {operation: [error messages]}.
+    '''
+    names = list(mix)
+    cumulative = []
+    total = 0
+    for name in names:
+        total += mix[name]
+        cumulative.append(total)
+
+    latencies = dict((name, []) for name in names)
+    errors = dict((name, []) for name in names)
+
+    with warnings.catch_warnings():
+        # Inefficient query warnings.
+        warnings.simplefilter('ignore')
+
+        count = 0
+        while True:
+            if None is not operations:
+                if count >= operations:
+                    break
+
+            elif time.time() >= deadline:
+                break
+
+            count += 1
+            pick = workload.random.random() * total
+            name = names[[pick < bound for bound in cumulative].index(True)]
+
+            started = default_timer()
+            try:
+                OPERATIONS[name](workload)
+
+            except Exception as e:
+                errors[name].append('%s: %s' % (type(e).__name__, e))
+                continue
+
+            latencies[name].append(default_timer() - started)
+
+    return latencies, errors
+
+
+def reconnect():
+    '''
+    Connections can't be shared with a forked process, drop the
+    inherited ones so the worker opens its own.
+    '''
+    from django.db import connections
+    from cassandra.cqlengine import connection as cqlengine_connection
+
+    from djangocassandra.db.backends.memory.cluster import MemoryCluster
+
+    connection = connections['default']
+    if isinstance(connection.cluster, MemoryCluster):
+        # Same in-memory data, only the helper threads are gone.
+        connection.cluster.scheduler = None
+        return
+
+    for name in list(cqlengine_connection._connections):
+        del cqlengine_connection._connections[name]
+
+    cqlengine_connection.cluster = None
+    cqlengine_connection.session = None
+    connection.connection = None
+    connection.prepared_statements.clear()
+    connection.ensure_connection()
+
+
+def process_worker(queue, workload, mix, deadline, operations):
+    reconnect()
+    queue.put(run_worker(workload, mix, deadline, operations))
+
+
+def run(
+    workers=8,
+    processes=False,
+    duration=10.0,
+    operations=None,
+    mix=DEFAULT_MIX,
+    partitions=100,
+    partition_width=100,
+    range_size=20,
+    seed=0
+):
+    '''
+    Runs the load and returns the per operation results. operations,
+    if given, is the total number of operations (split evenly between
+    the workers) and takes precedence over duration.
+    '''
+    workloads = [
+        Workload(
+            index,
+            workers,
+            partitions,
+            partition_width,
+            range_size,
+            seed
+        ) for index in xrange(workers)
+    ]
+    per_worker = None
+    if None is not operations:
+        per_worker = int(math.ceil(operations / float(workers)))
+
+    started = time.time()
+    deadline = started + duration
+
+    if processes:
+        queue = multiprocessing.Queue()
+        pool = [
+            multiprocessing.Process(
+                target=process_worker,
+                args=(queue, workload, mix, deadline, per_worker)
+            ) for workload in workloads
+        ]
+        for process in pool:
+            process.start()
+
+        results = [queue.get() for _ in pool]
+        for process in pool:
+            process.join()
+
+    else:
+        results = [None] * workers
+
+        def target(index):
+            results[index] = run_worker(
+                workloads[index],
+                mix,
+                deadline,
+                per_worker
+            )
+
+        pool = [
+            threading.Thread(target=target, args=(index,))
+            for index in xrange(workers)
+        ]
+        for thread in pool:
+            thread.start()
+
+        for thread in pool:
+            thread.join()
+
+    elapsed = time.time() - started
+
+    summary = OrderedDict()
+    total = 0
+    for name in mix:
+        latencies = sorted(
+            latency for worker_latencies, _ in results
+            for latency in worker_latencies[name]
+        )
+        errors = [
+            error for _, worker_errors in results
+            for error in worker_errors[name]
+        ]
+        total += len(latencies)
+
+        def ms(value):
+            return None if None is value else value * 1000.0
+
+        summary[name] = {
+            'count': len(latencies),
+            'errors': len(errors),
+            'first_error': errors[0] if errors else None,
+            'throughput': len(latencies) / elapsed,
+            'mean_ms': ms(
+                sum(latencies) / len(latencies) if latencies else None
+            ),
+            'p50_ms': ms(percentile(latencies, 50)),
+            'p95_ms': ms(percentile(latencies, 95)),
+            'p99_ms': ms(percentile(latencies, 99)),
+            'max_ms': ms(latencies[-1] if latencies else None)
+        }
+
+    return {
+        'elapsed': elapsed,
+        'operations': total,
+        'throughput': total / elapsed,
+        'results': summary
+    }
+
+
+def format_ms(value):
+    return '-' if None is value else '%.2f' % (value,)
+
+
+def report(results, out=sys.stdout):
+    out.write('\n%-12s %9s %7s %10s %9s %9s %9s %9s\n' % (
+        'operation',
+        'count',
+        'errors',
+        'ops/s',
+        'p50 ms',
+        'p95 ms',
+        'p99 ms',
+        'max ms'
+    ))
+    for name, result in results['results'].iteritems():
+        out.write('%-12s %9d %7d %10.1f %9s %9s %9s %9s\n' % (
+            name,
+            result['count'],
+            result['errors'],
+            result['throughput'],
+            format_ms(result['p50_ms']),
+            format_ms(result['p95_ms']),
+            format_ms(result['p99_ms']),
+            format_ms(result['max_ms'])
+        ))
+
+    out.write('\n%d operations in %.1fs, %.1f ops/s\n' % (
+        results['operations'],
+        results['elapsed'],
+        results['throughput']
+    ))
+
+    for name, result in results['results'].iteritems():
+        if result['first_error']:
+            out.write('%s failed %d times, first error: %s\n' % (
+                name,
+                result['errors'],
+                result['first_error']
+            ))
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Runs a concurrent mix of djangocassandra operations.'
+    )
+    parser.add_argument(
+        '--engine',
+        choices=sorted(ENGINES),
+        help='Database engine (default: the settings\' ENGINE).'
+    )
+    parser.add_argument(
+        '--latency',
+        help=(
+            'Simulated latency of the memory engine in seconds, or '
+            '"minimum,maximum".'
+        )
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=8
+    )
+    parser.add_argument(
+        '--processes',
+        action='store_true',
+        help='Run the workers in processes instead of threads.'
+    )
+    parser.add_argument(
+        '--duration',
+        type=float,
+        default=10.0,
+        help='Seconds to run for.'
+    )
+    parser.add_argument(
+        '--operations',
+        type=int,
+        help='Total number of operations to run instead of a duration.'
+    )
+    parser.add_argument(
+        '--mix',
+        default=','.join(
+            '%s=%d' % (name, weight)
+            for name, weight in DEFAULT_MIX.iteritems()
+        ),
+        help='Weighted operations (default: %(default)s).'
+    )
+    parser.add_argument(
+        '--partitions',
+        type=int,
+        default=100
+    )
+    parser.add_argument(
+        '--partition-width',
+        type=int,
+        default=100,
+        help='Rows per seeded partition.'
+    )
+    parser.add_argument(
+        '--range-size',
+        type=int,
+        default=20,
+        help='Rows read by each clustering range scan.'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=0
+    )
+    parser.add_argument(
+        '--skip-seed',
+        action='store_true',
+        help='Reuse the dataset of a previous run.'
+    )
+    parser.add_argument(
+        '--output',
+        help='Write the results as JSON to this file.'
+    )
+    args = parser.parse_args(argv)
+
+    if args.engine:
+        os.environ['DJANGOCASSANDRA_BENCHMARK_ENGINE'] = ENGINES[args.engine]
+
+    if args.latency:
+        os.environ['DJANGOCASSANDRA_BENCHMARK_LATENCY'] = args.latency
+
+    mix = parse_mix(args.mix)
+
+    setup_django()
+
+    from django.db import connections
+
+    if not args.skip_seed:
+        seed_dataset(
+            args.partitions,
+            args.partition_width,
+            seed=args.seed
+        )
+
+    results = run(
+        workers=args.workers,
+        processes=args.processes,
+        duration=args.duration,
+        operations=args.operations,
+        mix=mix,
+        partitions=args.partitions,
+        partition_width=args.partition_width,
+        range_size=args.range_size,
+        seed=args.seed
+    )
+    report(results)
+
+    if args.output:
+        settings_dict = connections['default'].settings_dict
+        results.update({
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'engine': settings_dict['ENGINE'],
+            'latency': settings_dict.get('LATENCY'),
+            'workers': args.workers,
+            'processes': args.processes,
+            'mix': mix,
+            'partitions': args.partitions,
+            'partition_width': args.partition_width,
+            'seed': args.seed,
+            'time': time.time()
+        })
+        with open(args.output, 'w') as output:
+            json.dump(
+                results,
+                output,
+                indent=2,
+                sort_keys=True
+            )
+
+    return 0
+
+
+if '__main__' == __name__:
+    sys.exit(main())
@@ -0,0 +1,237 @@
+'''
+CPU microbenchmarks of the backend's per row hot paths. They run on
+synthetic rows and never talk to a cluster:
+
+    python -m benchmarks.micro --output results.json
+    python -m benchmarks.micro --baseline results.json
+'''
+import sys
+
+from .runner import (
+    benchmark,
+    setup_django,
+    main
+)
+from .data import make_rows
+
+
+ROW_COUNT = 1000
+
+
+def get_offline_connection():
+    '''
+    The default connection marked as connected so query objects can
+    be built without a cluster. Nothing is ever executed on it.
+    '''
+    from django.db import connections
+
+    connection = connections['default']
+    if None is connection.connection:
+        connection.connection = connection._make_cursor(None)
+
+    return connection
+
+
+@benchmark('predicate.RangePredicate.incorporate_range_op')
+def bench_incorporate_range_op():
+    from djangocassandra.db.backends.cassandra.predicate import (
+        RangePredicate,
+        COMPOUND_OP_AND,
+        COMPOUND_OP_OR
+    )
+
+    operations = [
+        ('gte', 10, COMPOUND_OP_AND),
+        ('lt', 900, COMPOUND_OP_AND),
+        ('gt', 20, COMPOUND_OP_AND),
+        ('lte', 800, COMPOUND_OP_AND),
+        ('exact', 500, COMPOUND_OP_AND),
+        ('gt', 5, COMPOUND_OP_OR),
+        ('lte', 950, COMPOUND_OP_OR),
+        ('startswith', 'abc', COMPOUND_OP_AND)
+    ]
+
+    def run():
+        for op, value, compound_op in operations:
+            column = 'name' if 'startswith' == op else 'value'
+            RangePredicate(column).incorporate_range_op(
+                column,
+                op,
+                value,
+                compound_op
+            )
+
+    return run, len(operations)
+
+
+@benchmark('predicate.CompoundPredicate.row_matches')
+def bench_compound_row_matches():
+    from djangocassandra.db.backends.cassandra.predicate import (
+        CompoundPredicate,
+        COMPOUND_OP_AND,
+        COMPOUND_OP_OR
+    )
+    from .models import BenchmarkRowModel
+
+    field = BenchmarkRowModel._meta.get_field
+
+    predicate = CompoundPredicate(COMPOUND_OP_AND)
+    predicate.add_filter(field('value'), 'gte', 100)
+    predicate.add_filter(field('value'), 'lt', 900)
+    predicate.add_filter(field('name'), 'icontains', 'ab')
+
+    alternatives = CompoundPredicate(COMPOUND_OP_OR)
+    alternatives.add_filter(field('partition'), 'exact', 'partition-0001')
+    alternatives.add_filter(field('cluster'), 'gt', 50)
+    predicate.add_child(alternatives)
+
+    rows = make_rows(ROW_COUNT)
+
+    def run():
+        row_matches = predicate.row_matches
+        for row in rows:
+            row_matches(row)
+
+    return run, len(rows)
+
+
+def bench_operation(op, value):
+    from djangocassandra.db.backends.cassandra.predicate import (
+        OperationPredicate
+    )
+
+    predicate = OperationPredicate('name', op, value)
+    rows = make_rows(ROW_COUNT)
+
+    def run():
+        row_matches = predicate.row_matches
+        for row in rows:
+            row_matches(row)
+
+    return run, len(rows)
+
+
+@benchmark('predicate.OperationPredicate.regex')
+def bench_operation_regex():
+    return bench_operation('regex', r'^[a-m].*[n-z]$')
+
+
+@benchmark('predicate.OperationPredicate.iregex')
+def bench_operation_iregex():
+    return bench_operation('iregex', r'^[A-M].*q')
+
+
+@benchmark('predicate.OperationPredicate.icontains')
+def bench_operation_icontains():
+    return bench_operation('icontains', 'AB')
+
+
+@benchmark('utils.sort_rows')
+def bench_sort_rows():
+    from djangocassandra.db.backends.cassandra.utils import sort_rows
+
+    rows = make_rows(ROW_COUNT)
+
+    def run():
+        sort_rows(list(rows), (('value', True), ('name',)))
+
+    return run, len(rows)
+
+
+def bench_combine_rows(op):
+    from djangocassandra.db.backends.cassandra.utils import combine_rows
+
+    rows = make_rows(ROW_COUNT)
+    rows1 = rows[::2] + rows[:ROW_COUNT // 4]
+    rows2 = rows[1::2] + rows[:ROW_COUNT // 4]
+
+    def run():
+        combine_rows(list(rows1), list(rows2), op, 'name')
+
+    return run, len(rows1) + len(rows2)
+
+
+@benchmark('utils.combine_rows.union')
+def bench_combine_rows_union():
+    from djangocassandra.db.backends.cassandra.utils import COMBINE_UNION
+    return bench_combine_rows(COMBINE_UNION)
+
+
+@benchmark('utils.combine_rows.intersection')
+def bench_combine_rows_intersection():
+    from djangocassandra.db.backends.cassandra.utils import (
+        COMBINE_INTERSECTION
+    )
+    return bench_combine_rows(COMBINE_INTERSECTION)
+
+
+@benchmark('compiler.CassandraQuery.__init__')
+def bench_cassandra_query():
+    from djangocassandra.db.backends.cassandra.compiler import (
+        CassandraQuery
+    )
+    from .models import BenchmarkRowModel
+
+    connection = get_offline_connection()
+    compiler = BenchmarkRowModel.objects.filter(
+        partition='partition-0001',
+        cluster__gte=10
+    ).query.get_compiler(connection=connection)
+    fields = compiler.get_fields()
+
+    def run():
+        query = CassandraQuery(compiler, fields)
+        query.add_filters(compiler.query.where)
+
+    return run, 1
+
+
+@benchmark('meta.get_column_family')
+def bench_get_column_family():
+    from djangocassandra.db.meta import get_column_family
+    from .models import BenchmarkRowModel
+
+    connection = get_offline_connection()
+
+    def run():
+        get_column_family(connection, BenchmarkRowModel)
+
+    return run, 1
+
+
+def bench_get_pk_val(cached):
+    from .models import BenchmarkCompositeModel
+
+    instances = [
+        BenchmarkCompositeModel(
+            tenant='tenant-%d' % (index % 10,),
+            bucket=index % 7,
+            sequence=index,
+            payload='payload'
+        ) for index in xrange(ROW_COUNT)
+    ]
+
+    def run():
+        for instance in instances:
+            if not cached:
+                # Setting a key attribute drops the cached key.
+                instance.sequence = instance.sequence
+
+            instance._get_pk_val()
+
+    return run, len(instances)
+
+
+@benchmark('models.ColumnFamilyModel._get_pk_val')
+def bench_get_pk_val_uncached():
+    return bench_get_pk_val(False)
+
+
+@benchmark('models.ColumnFamilyModel._get_pk_val.cached')
+def bench_get_pk_val_cached():
+    return bench_get_pk_val(True)
+
+
+if '__main__' == __name__:
+    setup_django()
+    sys.exit(main())
@@ -0,0 +1,91 @@
+from django.db.models import (
+    CharField,
+    IntegerField
+)
+
+from djangocassandra.db.models import (
+    ColumnFamilyModel,
+    ColumnFamilyManager
+)
+
+
+class BenchmarkRowModel(ColumnFamilyModel):
+    class Cassandra:
+        partition_keys = ['partition']
+        clustering_keys = ['cluster']
+        allow_inefficient_queries = True
+
+    partition = CharField(
+        primary_key=True,
+        max_length=32
+    )
+    cluster = IntegerField()
+    value = IntegerField(
+        db_index=True
+    )
+    name = CharField(
+        max_length=64
+    )
+    payload = CharField(
+        max_length=256
+    )
+
+
+class BenchmarkCompositeModel(ColumnFamilyModel):
+    class Cassandra:
+        partition_keys = ['tenant', 'bucket']
+        clustering_keys = ['sequence']
+
+    tenant = CharField(
+        primary_key=True,
+        max_length=32
+    )
+    bucket = IntegerField()
+    sequence = IntegerField()
+    payload = CharField(
+        max_length=256
+    )
+
+
+class BenchmarkEventManager(ColumnFamilyManager):
+    denormalized_models = [
+        'BenchmarkEventByKindModel'
+    ]
+
+
+class BenchmarkEventModel(ColumnFamilyModel):
+    class Cassandra:
+        partition_keys = ['tenant']
+        clustering_keys = ['sequence']
+
+    objects = BenchmarkEventManager()
+
+    tenant = CharField(
+        primary_key=True,
+        max_length=32
+    )
+    sequence = IntegerField()
+    kind = CharField(
+        max_length=32
+    )
+    payload = CharField(
+        max_length=256
+    )
+
+
+class BenchmarkEventByKindModel(ColumnFamilyModel):
+    class Cassandra:
+        partition_keys = ['kind']
+        clustering_keys = ['tenant', 'sequence']
+
+    kind = CharField(
+        primary_key=True,
+        max_length=32
+    )
+    tenant = CharField(
+        max_length=32
+    )
+    sequence = IntegerField()
+    payload = CharField(
+        max_length=256
+    )
@@ -0,0 +1,230 @@
+import os
+import sys
+import json
+import time
+import platform
+
+from timeit import default_timer
+from collections import OrderedDict
+
+
+BENCHMARKS = OrderedDict()
+
+
+def benchmark(name):
+    '''
+    Registers a benchmark setup function. The setup function is called
+    once and returns (function, items), function is the callable that
+    is timed and items the number of rows/operations one call handles.
+    '''
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return decorator
+
+
+def setup_django():
+    os.environ.setdefault(
+        'DJANGO_SETTINGS_MODULE',
+        'benchmarks.settings'
+    )
+
+    import django
+    django.setup()
+
+
+def time_function(
+    function,
+    repeat=5,
+    min_time=0.05
+):
+    '''
+    Returns the number of calls per round and the seconds per call of
+    each of repeat rounds. The number of calls per round is calibrated
+    so a round takes at least min_time seconds.
+    '''
+    def timed(number):
+        started = default_timer()
+        for _ in xrange(number):
+            function()
+
+        return default_timer() - started
+
+    number = 1
+    elapsed = timed(number)
+    while elapsed < min_time:
+        if elapsed <= 0:
+            number *= 10
+
+        else:
+            number = max(
+                number * 2,
+                int(number * min_time * 1.1 / elapsed) + 1
+            )
+
+        elapsed = timed(number)
+
+    timings = [elapsed / number]
+    for _ in xrange(repeat - 1):
+        timings.append(timed(number) / number)
+
+    return number, timings
+
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+
+    return (values[middle - 1] + values[middle]) / 2.0
+
+
+def run(
+    names=None,
+    repeat=5,
+    min_time=0.05,
+    out=sys.stdout
+):
+    results = OrderedDict()
+    for name, setup in BENCHMARKS.iteritems():
+        if names and not any(part in name for part in names):
+            continue
+
+        function, items = setup()
+        number, timings = time_function(
+            function,
+            repeat=repeat,
+            min_time=min_time
+        )
+
+        result = results[name] = {
+            'items': items,
+            'calls': number,
+            'best': min(timings),
+            'median': median(timings),
+            'per_item_ns': min(timings) / items * 1e9
+        }
+
+        out.write('%-48s %12.1f ns/item %10.3f ms/call\n' % (
+            name,
+            result['per_item_ns'],
+            result['best'] * 1000
+        ))
+
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'time': time.time(),
+        'benchmarks': results
+    }
+
+
+def compare(
+    results,
+    baseline,
+    threshold=0.1
+):
+    '''
+    Returns (name, baseline per item ns, per item ns, ratio, regressed)
+    for every benchmark present in both results. A benchmark regressed
+    when it's more than threshold (a fraction) slower than baseline.
+    '''
+    comparison = []
+    for name, result in results['benchmarks'].iteritems():
+        base = baseline['benchmarks'].get(name)
+        if None is base:
+            continue
+
+        ratio = result['per_item_ns'] / base['per_item_ns']
+        comparison.append((
+            name,
+            base['per_item_ns'],
+            result['per_item_ns'],
+            ratio,
+            ratio > 1 + threshold
+        ))
+
+    return comparison
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Runs the djangocassandra CPU microbenchmarks.'
+    )
+    parser.add_argument(
+        'names',
+        nargs='*',
+        help='Only run benchmarks whose name contains one of these.'
+    )
+    parser.add_argument(
+        '--output',
+        help='Write the results as JSON to this file.'
+    )
+    parser.add_argument(
+        '--baseline',
+        help='Compare the results against this JSON results file.'
+    )
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.1,
+        help='Slowdown (fraction) reported as a regression.'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=5
+    )
+    parser.add_argument(
+        '--min-time',
+        type=float,
+        default=0.05,
+        help='Minimum seconds per timed round.'
+    )
+    args = parser.parse_args(argv)
+
+    results = run(
+        names=args.names,
+        repeat=args.repeat,
+        min_time=args.min_time
+    )
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(
+                results,
+                output,
+                indent=2,
+                sort_keys=True
+            )
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+
+    regressions = 0
+    sys.stdout.write('\n')
+    for name, base, current, ratio, regressed in compare(
+        results,
+        baseline,
+        args.threshold
+    ):
+        if regressed:
+            regressions += 1
+
+        sys.stdout.write('%-48s %10.1f -> %10.1f ns/item %+7.1f%%%s\n' % (
+            name,
+            base,
+            current,
+            (ratio - 1) * 100,
+            ' REGRESSION' if regressed else ''
+        ))
+
+    return 1 if regressions else 0
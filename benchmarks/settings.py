@@ -0,0 +1,54 @@
+import os
+import uuid
+
+from cassandra.metadata import (
+    SimpleStrategy
+)
+
+SECRET_KEY = uuid.uuid4().hex
+
+
+def get_latency():
+    '''
+    DJANGOCASSANDRA_BENCHMARK_LATENCY is either seconds or
+    "minimum,maximum" seconds.
+    '''
+    latency = os.environ.get('DJANGOCASSANDRA_BENCHMARK_LATENCY')
+    if not latency:
+        return None
+
+    if ',' in latency:
+        return tuple(float(value) for value in latency.split(','))
+
+    return float(latency)
+
+
+DATABASES = {
+    'default': {
+        'ENGINE': os.environ.get(
+            'DJANGOCASSANDRA_BENCHMARK_ENGINE',
+            'djangocassandra.db.backends.cassandra'
+        ),
+        'DEFAULT_KEYSPACE': 'benchmarks',
+        'CONTACT_POINTS': (os.environ.get(
+            'DJANGOCASSANDRA_BENCHMARK_HOST',
+            'localhost'
+        ),),
+        'PORT': int(os.environ.get(
+            'DJANGOCASSANDRA_BENCHMARK_PORT',
+            9042
+        )),
+        'KEYSPACES': {
+            'benchmarks': {
+                'replication_factor': 1,
+                'strategy_class': SimpleStrategy.name
+            }
+        },
+        'LATENCY': get_latency()
+    }
+}
+
+INSTALLED_APPS = [
+    'djangocassandra',
+    'benchmarks'
+]
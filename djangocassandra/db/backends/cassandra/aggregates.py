@@ -0,0 +1,197 @@
+from django.db.utils import DatabaseError
+
+from cassandra.cqlengine.statements import SelectStatement
+
+
+# Types of the columns Cassandra would sum without widening them.
+SUM_CASTS = {
+    'int': 'varint',
+    'bigint': 'varint',
+    'smallint': 'varint',
+    'tinyint': 'varint',
+    'counter': 'varint',
+    'float': 'double'
+}
+
+
+AGGREGATE_FUNCTIONS = (
+    'COUNT',
+    'SUM',
+    'AVG',
+    'MIN',
+    'MAX'
+)
+
+
+class Aggregator(object):
+    '''
+    Computes a Django aggregate function over a column (None for
+    COUNT(*)), either from the rows themselves or by merging the
+    partial results of the CQL aggregate functions it's pushed down as.
+    Only distinct counts keep more than a single value in memory.
+
+    cast is the CQL type the column is cast to before Cassandra sums
+    it: sums have the type of the column and an int or bigint sum
+    wraps around on overflow.
+    '''
+    def __init__(
+        self,
+        function,
+        column=None,
+        distinct=False,
+        cast=None
+    ):
+        if function not in AGGREGATE_FUNCTIONS:
+            raise DatabaseError(
+                'The %s aggregate function isn\'t supported by this '
+                'backend.' % (function,)
+            )
+
+        if distinct and 'COUNT' != function:
+            raise DatabaseError(
+                'Only COUNT aggregates can be distinct.'
+            )
+
+        self.function = function
+        self.column = column
+        self.distinct = distinct
+        self.cast = cast
+
+        self.count = 0
+        self.value = None
+        self.values = set() if distinct else None
+
+    def __repr__(self):
+        return '(%s: %s%s)' % (
+            self.function,
+            'DISTINCT ' if self.distinct else '',
+            self.column or '*'
+        )
+
+    def clone(self):
+        return Aggregator(
+            self.function,
+            self.column,
+            self.distinct,
+            self.cast
+        )
+
+    @property
+    def can_push_down(self):
+        '''
+        CQL has no distinct aggregates.
+        '''
+        return not self.distinct
+
+    def get_selectors(self, alias):
+        '''
+        Returns the CQL selectors of the partial results merged by
+        merge(), named after alias.
+        '''
+        column = (
+            '*'
+            if None is self.column
+            else '"%s"' % (self.column,)
+        )
+        selectors = ['count(%s) AS "%s_count"' % (column, alias)]
+        if 'SUM' == self.function or 'AVG' == self.function:
+            # Averages are computed from the sum, CQL averages integers
+            # with integer division.
+            if None is not self.cast:
+                column = 'cast(%s as %s)' % (column, self.cast)
+
+            selectors.append('sum(%s) AS "%s_value"' % (column, alias))
+
+        elif 'COUNT' != self.function:
+            selectors.append('%s(%s) AS "%s_value"' % (
+                self.function.lower(),
+                column,
+                alias
+            ))
+
+        return selectors
+
+    def add(self, row):
+        if None is self.column:
+            self.count += 1
+            return
+
+        value = row.get(self.column)
+        if None is value:
+            return
+
+        if self.distinct:
+            self.values.add(value)
+            return
+
+        self.count += 1
+        self._fold(value)
+
+    def merge(self, row, alias):
+        self.count += row['%s_count' % (alias,)] or 0
+        if 'COUNT' != self.function:
+            value = row['%s_value' % (alias,)]
+            if None is not value:
+                self._fold(value)
+
+    def _fold(self, value):
+        if None is self.value:
+            self.value = value
+
+        elif 'SUM' == self.function or 'AVG' == self.function:
+            self.value += value
+
+        elif 'MIN' == self.function:
+            self.value = min(self.value, value)
+
+        elif 'MAX' == self.function:
+            self.value = max(self.value, value)
+
+    def result(self):
+        if 'COUNT' == self.function:
+            return len(self.values) if self.distinct else self.count
+
+        if not self.count:
+            return None
+
+        if 'AVG' == self.function:
+            return float(self.value) / self.count
+
+        return self.value
+
+
+class AggregateSelectStatement(SelectStatement):
+    '''
+    SelectStatement selecting CQL aggregate function calls (or any
+    other raw selectors), grouped by the group_by columns.
+    '''
+    def __init__(
+        self,
+        table,
+        selectors,
+        where=None,
+        group_by=None,
+        allow_filtering=False
+    ):
+        super(AggregateSelectStatement, self).__init__(
+            table,
+            where=where,
+            allow_filtering=allow_filtering
+        )
+        self.selectors = selectors
+        self.group_by = group_by or []
+
+    def __unicode__(self):
+        qs = ['SELECT', ', '.join(self.selectors), 'FROM', self.table]
+        if self.where_clauses:
+            qs += [self._where]
+
+        if self.group_by:
+            qs += ['GROUP BY {0}'.format(', '.join(
+                '"{0}"'.format(column) for column in self.group_by
+            ))]
+
+        if self.allow_filtering:
+            qs += ['ALLOW FILTERING']
+
+        return ' '.join(qs)
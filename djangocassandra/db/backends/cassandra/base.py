@@ -1,4 +1,7 @@
 from uuid import UUID
+from threading import Lock
+
+from django.core.exceptions import ImproperlyConfigured
 
 from djangotoolbox.db.base import (
     NonrelDatabaseFeatures,
@@ -14,6 +17,12 @@ from cassandra import (
 from cassandra.metadata import (
     SimpleStrategy
 )
+from cassandra.cluster import Cluster
+from cassandra.concurrent import execute_concurrent
+from cassandra.policies import (
+    TokenAwarePolicy,
+    DCAwareRoundRobinPolicy
+)
 
 from cassandra.cqlengine import (
     connection,
@@ -25,6 +34,14 @@ from .creation import DatabaseCreation
 from .introspection import DatabaseIntrospection
 from .schema import CassandraSchemaEditor
 from .cursor import CassandraCursor
+from .converters import ModelConverters
+from .metrics import MetricsRegistry
+
+
+# Replica clusters are shared by every DatabaseWrapper in the process
+# the same way the cqlengine connection is.
+replica_sessions = {}
+replica_sessions_lock = Lock()
 
 
 class DatabaseFeatures(NonrelDatabaseFeatures):
@@ -46,6 +63,37 @@ class DatabaseFeatures(NonrelDatabaseFeatures):
 class DatabaseOperations(NonrelDatabaseOperations):
     compiler_module = __name__.rsplit('.', 1)[0] + '.compiler'
 
+    def __init__(self, connection):
+        super(DatabaseOperations, self).__init__(connection)
+        self._model_converters = {}
+
+    def get_model_converters(
+        self,
+        model
+    ):
+        '''
+        Returns the compiled ModelConverters for model, building them
+        the first time the model is seen by this connection.
+        '''
+        converters = self._model_converters.get(model)
+        if None is converters:
+            converters = ModelConverters(self, model)
+            self._model_converters[model] = converters
+
+        return converters
+
+    def quote_name(
+        self,
+        name
+    ):
+        '''
+        Quotes a CQL identifier, keeping its case.
+        '''
+        if name.startswith('"') and name.endswith('"'):
+            return name
+
+        return '"%s"' % (name.replace('"', '""'),)
+
     def sql_flush(
         self,
         style,
@@ -53,10 +101,27 @@ class DatabaseOperations(NonrelDatabaseOperations):
         sequence_list,
         allow_cascade=False
     ):
+        '''
+        With FLUSH_SKIP_EMPTY set the tables are probed concurrently
+        first and no TRUNCATE is returned for the ones already empty.
+        Django runs the statements one at a time through the cursor,
+        flush_tables also truncates concurrently.
+        '''
+        if tables and self.connection.settings_dict.get(
+            'FLUSH_SKIP_EMPTY',
+            False
+        ):
+            tables = self._get_nonempty_tables(
+                self.connection.current_keyspace(),
+                tables
+            )
+
         if tables:
             cql = [
                 'use %s;' % (
-                    style.SQL_FIELD(self.connection.keyspace),
+                    style.SQL_FIELD(self.quote_name(
+                        self.connection.current_keyspace()
+                    )),
                 )
             ]
             for table in tables:
@@ -70,6 +135,82 @@ class DatabaseOperations(NonrelDatabaseOperations):
         else:
             return []
 
+    def _get_nonempty_tables(
+        self,
+        keyspace,
+        tables
+    ):
+        '''
+        Probes tables with a LIMIT 1 select, much cheaper than a
+        TRUNCATE which has to reach every node, and returns the ones
+        that have rows.
+        '''
+        self.connection.ensure_connection()
+        probes = execute_concurrent(
+            self.connection.session,
+            [
+                ('SELECT * FROM %s.%s LIMIT 1' % (
+                    self.quote_name(keyspace),
+                    self.quote_name(table)
+                ), None)
+                for table in tables
+            ],
+            concurrency=self.connection.settings_dict.get(
+                'DDL_CONCURRENCY',
+                10
+            )
+        )
+
+        return [
+            table for table, (_, result) in zip(tables, probes)
+            if result.current_rows
+        ]
+
+    def flush_tables(
+        self,
+        tables,
+        keyspace=None,
+        skip_empty=True
+    ):
+        '''
+        Truncates tables concurrently, keeping their schema. When
+        skip_empty is set tables that have no rows are left alone.
+        '''
+        if not tables:
+            return []
+
+        if None is keyspace:
+            keyspace = self.connection.current_keyspace()
+
+        if skip_empty:
+            tables = self._get_nonempty_tables(
+                keyspace,
+                tables
+            )
+
+        self.connection.ensure_connection()
+        table_names = [
+            '%s.%s' % (
+                self.quote_name(keyspace),
+                self.quote_name(table)
+            )
+            for table in tables
+        ]
+
+        execute_concurrent(
+            self.connection.session,
+            [
+                ('TRUNCATE %s' % (table_name,), None)
+                for table_name in table_names
+            ],
+            concurrency=self.connection.settings_dict.get(
+                'DDL_CONCURRENCY',
+                10
+            )
+        )
+
+        return table_names
+
     def _value_for_db(
         self,
         value,
@@ -156,13 +297,38 @@ class DatabaseWrapper(NonrelDatabaseWrapper):
         self.introspection = DatabaseIntrospection(self)
         self.session = None
         self.cluster = None
+        self.prepared_statements = {}
+        self.metrics = MetricsRegistry(self)
 
-    def schema_editor(self):
-        return CassandraSchemaEditor(self)
+    def schema_editor(
+        self,
+        *args,
+        **kwargs
+    ):
+        return CassandraSchemaEditor(
+            self,
+            *args,
+            **kwargs
+        )
 
     def create_cursor(self):
         self.ensure_connection()
-        return CassandraCursor(connection.get_session())
+        return self._make_cursor(connection.get_session())
+
+    def _make_cursor(self, session):
+        return CassandraCursor(
+            session,
+            statement_cache=self.prepared_statements,
+            metrics=self.metrics,
+            batch_size=self.settings_dict.get(
+                'EXECUTEMANY_BATCH_SIZE',
+                100
+            ),
+            concurrency=self.settings_dict.get(
+                'EXECUTEMANY_CONCURRENCY',
+                50
+            )
+        )
 
     def _cursor(self):
         return self.create_cursor()
@@ -318,7 +484,81 @@ class DatabaseWrapper(NonrelDatabaseWrapper):
         self.session = connection.get_session()
         self.cluster = connection.get_cluster()
         self.session.default_timeout = None  # Should be in config.
-        return CassandraCursor(self.session)
+        return self._make_cursor(self.session)
+
+    def get_replica_session(
+        self,
+        name
+    ):
+        '''
+        Returns the session for the read replica configured under name
+        in the REPLICAS setting, connecting to it on first use.
+
+        Each replica gets its own Cluster. Settings not given for the
+        replica are taken from the main connection. If LOCAL_DC is set
+        (and LOAD_BALANCING_POLICY isn't) the replica uses a token aware
+        DC aware policy pinned to that datacenter.
+        '''
+        session = replica_sessions.get(name)
+        if None is not session:
+            return session
+
+        replica_settings = self.settings_dict.get(
+            'REPLICAS',
+            {}
+        ).get(name)
+
+        if None is replica_settings:
+            raise ImproperlyConfigured(
+                'No read replica named "%s" is defined in the '
+                'REPLICAS setting.' % (name,)
+            )
+
+        with replica_sessions_lock:
+            session = replica_sessions.get(name)
+            if None is not session:
+                return session
+
+            connection_params = self.get_connection_params()
+            keyspace = connection_params.pop('keyspace')
+            for key in (
+                'lazy_connect',
+                'retry_connect',
+                'consistency'
+            ):
+                connection_params.pop(key, None)
+
+            for key, value in replica_settings.iteritems():
+                if key in ('LOCAL_DC', 'USED_HOSTS_PER_REMOTE_DC'):
+                    continue
+
+                connection_params[key.lower()] = value
+
+            local_dc = replica_settings.get('LOCAL_DC')
+            if (
+                None is not local_dc and
+                'LOAD_BALANCING_POLICY' not in replica_settings
+            ):
+                connection_params['load_balancing_policy'] = (
+                    TokenAwarePolicy(DCAwareRoundRobinPolicy(
+                        local_dc=local_dc,
+                        used_hosts_per_remote_dc=replica_settings.get(
+                            'USED_HOSTS_PER_REMOTE_DC',
+                            0
+                        )
+                    ))
+                )
+
+            cluster = Cluster(**{
+                key: value for key, value in connection_params.iteritems()
+                if None is not value
+            })
+            session = cluster.connect(keyspace)
+            session.default_timeout = None  # Should be in config.
+
+            replica_sessions[name] = session
+
+        return session
 
     def current_keyspace(self):
         if not self.keyspace:
@@ -331,11 +571,19 @@ class DatabaseWrapper(NonrelDatabaseWrapper):
 
     def create_keyspace(
         self,
+        keyspace=None
     ):
         '''
-        Ensure self.keyspace is set appropriately.
+        Ensure keyspace (self.keyspace if not passed) exists. Existence
+        is checked against the driver's cluster metadata so keyspaces
+        that already exist cost no round trip.
         '''
-        self.current_keyspace()
+        if None is keyspace:
+            keyspace = self.current_keyspace()
+
+        self.ensure_connection()
+        if keyspace in self.cluster.metadata.keyspaces:
+            return
 
         settings = self.settings_dict
 
@@ -348,15 +596,14 @@ class DatabaseWrapper(NonrelDatabaseWrapper):
         keyspace_settings = settings.get(
             'KEYSPACES', {}
         ).get(
-            self.keyspace, {}
+            keyspace, {}
         )
 
         keyspace_default_settings.update(keyspace_settings)
         keyspace_settings = keyspace_default_settings
 
-        self.ensure_connection()
         create_keyspace_simple(
-            self.keyspace,
+            keyspace,
             keyspace_settings.get(
                 'replication_factor',
                 1
@@ -1,12 +1,31 @@
 import re
 import itertools
 
+from operator import itemgetter
+from collections import OrderedDict
+
 from django.db.utils import (
-    ProgrammingError
+    DatabaseError,
+    ProgrammingError,
+    IntegrityError
 )
 
 from django.db.models import ForeignKey
-from django.db.models.sql.constants import MULTI
+from django.db.models.fields import (
+    NOT_PROVIDED,
+    FieldDoesNotExist
+)
+from django.db.models.expressions import (
+    F,
+    Col,
+    Star,
+    Value,
+    CombinedExpression
+)
+from django.db.models.sql.constants import (
+    MULTI,
+    SINGLE
+)
 from django.db.models.sql.datastructures import EmptyResultSet
 from django.db.models.sql.where import (
     WhereNode,
@@ -22,21 +41,72 @@ from djangotoolbox.db.basecompiler import (
     NonrelDeleteCompiler
 )
 
-from cassandra.cqlengine.query import BatchQuery
+from cassandra import (
+    ConsistencyLevel,
+    InvalidRequest
+)
+from cassandra.query import (
+    SimpleStatement,
+    ordered_dict_factory
+)
+from cassandra.concurrent import execute_concurrent
+from cassandra.cqlengine.query import (
+    BatchQuery,
+    BatchType
+)
+from cassandra.cqlengine.statements import (
+    WhereClause,
+    UpdateStatement
+)
+from cassandra.cqlengine.operators import (
+    EqualsOperator,
+    GreaterThanOperator,
+    LessThanOrEqualOperator
+)
 
 from djangocassandra.db.meta import (
-    get_column_family
+    get_column_family,
+    get_cql_column_type,
+    get_sasi_indexes
+)
+from djangocassandra.db.models import (
+    ColumnFamilyModel,
+    get_denormalized_models
 )
 from djangocassandra.db.fields import (
-    TokenPartitionKeyField
+    TokenPartitionKeyField,
+    CounterField
+)
+from djangocassandra.db.updates import (
+    CollectionUpdate,
+    set_saved,
+    get_collection_updates
 )
 
 from .predicate import (
+    get_query_parameters,
+    get_positional_query,
     CompoundPredicate,
+    RangePredicate,
+    InPredicate,
+    LikePredicate,
+    push_down_negation,
+    get_conjunctions,
+    merge_predicates,
+    predicates_disjoint,
+    iter_leaf_predicates,
+    LIKE_LOOKUPS,
     COMPOUND_OP_AND,
     COMPOUND_OP_OR
 )
 
+from .aggregates import (
+    Aggregator,
+    AggregateSelectStatement,
+    AGGREGATE_FUNCTIONS,
+    SUM_CASTS
+)
+from .statements import CollectionUpdateClause
 from .exceptions import InvalidQueryOpException
 
 from .utils import (
@@ -44,6 +114,11 @@ from .utils import (
 )
 
 
+MURMUR3_PARTITIONER = 'org.apache.cassandra.dht.Murmur3Partitioner'
+MURMUR3_MIN_TOKEN = -2 ** 63
+MURMUR3_MAX_TOKEN = 2 ** 63 - 1
+
+
 class CassandraQuery(NonrelQuery):
     def __init__(
         self,
@@ -65,21 +140,28 @@ class CassandraQuery(NonrelQuery):
                 None is allows_inefficient and
                 hasattr(self.cassandra_meta, 'allow_inefficient_queries')
             ):
-                self.allows_inefficient = (
+                allows_inefficient = (
                     self.cassandra_meta.allow_inefficient_queries
                 )
 
         else:
             self.cassandra_meta = None
 
-        if None is allows_inefficient:
-            if 'ALLOW_INEFFICIENT_QUERIES' in self.connection.settings_dict:
-                self.allows_inefficient = self.connection.settings_dict[
-                    'ALLOW_INEFFICIENT_QUERIES'
-                ]
+        if None is not allows_inefficient:
+            self.allows_inefficient = allows_inefficient
 
-            else:
-                self.allows_inefficient = True  # Default to True
+        elif 'ALLOW_INEFFICIENT_QUERIES' in self.connection.settings_dict:
+            self.allows_inefficient = self.connection.settings_dict[
+                'ALLOW_INEFFICIENT_QUERIES'
+            ]
+
+        else:
+            self.allows_inefficient = True  # Default to True
+
+        # Set by QuerySet.scan(), lets the query read the whole table.
+        self.scan = getattr(self.query, 'scan', False)
+        if self.scan:
+            self.allows_inefficient = True
 
         self.pk_column = (
             self.meta.pk.db_column
@@ -106,8 +188,24 @@ class CassandraQuery(NonrelQuery):
 
         self.high_mark = None
         self.low_mark = None
+        self.sample = None
+        self.routed_from = None
 
         self.connection.ensure_connection()
+
+        replica = None
+        if getattr(compiler, 'reads_from_replica', False):
+            replica = getattr(self.query, 'replica', None)
+            if None is replica:
+                replica = getattr(self.cassandra_meta, 'read_replica', None)
+
+        self.replica = replica
+        if None is replica:
+            self.session = self.connection.session
+
+        else:
+            self.session = self.connection.get_replica_session(replica)
+
         self.column_family_class = get_column_family(
             self.connection,
             self.query.model
@@ -121,6 +219,7 @@ class CassandraQuery(NonrelQuery):
             column.db_column if column.db_column else column.column
             for column in self.columns if column.db_index
         ]
+        self.sasi_columns = get_sasi_indexes(self.query.model)
 
         self.partition_columns = [self.pk_column]
         if hasattr(self.cassandra_meta, 'partition_keys'):
@@ -171,10 +270,25 @@ class CassandraQuery(NonrelQuery):
             ['pk__token'],
             self.partition_columns,
             self.clustering_columns,
-            self.indexed_columns
+            self.indexed_columns,
+            self.sasi_columns
         )
 
-    def _get_rows_by_indexed_column(self, range_predicates):
+    def _get_rows_by_indexed_column(
+        self,
+        range_predicates,
+        selected_columns=None
+    ):
+        # LIKE restrictions can share their column with a range one.
+        like_predicates = [
+            predicate for predicate in range_predicates
+            if isinstance(predicate, LikePredicate)
+        ]
+        range_predicates = [
+            predicate for predicate in range_predicates
+            if not isinstance(predicate, LikePredicate)
+        ]
+
         # Let's sort the predicates in efficient order.
         sorted_predicates = []
         indexed_predicates = []
@@ -215,6 +329,11 @@ class CassandraQuery(NonrelQuery):
         ) == len(range_predicates))
 
         def filter_range(query, predicate):
+            if isinstance(predicate, InPredicate):
+                return query.filter(**{
+                    '__'.join([predicate.column, 'in']): predicate.values
+                })
+
             if predicate._is_exact():
                 return query.filter(**{
                     predicate.column: predicate.start
@@ -260,34 +379,256 @@ class CassandraQuery(NonrelQuery):
 
                 return query.filter(**filter_ops)
 
+        cql_query = self.cql_query
+        if None is selected_columns:
+            selected_columns = self.get_selected_columns()
+
+        if len(selected_columns) < len(self.column_names):
+            cql_query = cql_query.filter()
+            cql_query._only_fields = selected_columns
+
         for predicate in sorted_predicates:
-            self.cql_query = filter_range(
-                self.cql_query,
+            cql_query = filter_range(
+                cql_query,
                 predicate
             )
 
         for predicate in indexed_predicates:
-            self.cql_query = filter_range(
-                self.cql_query,
+            cql_query = filter_range(
+                cql_query,
                 predicate
             )
 
-        return self.cql_query
+        for predicate in like_predicates:
+            cql_query = cql_query.filter(**{
+                '__'.join([predicate.column, 'like']): predicate.pattern
+            })
+
+        return cql_query
+
+    def get_selected_columns(self):
+        '''
+        Returns the columns read from Cassandra: the ones of the selected
+        fields, the primary key and the ones filtered or ordered on
+        client side.
+        '''
+        columns = set(self.cassandra_pk_columns)
+        columns.update(field.column for field in self.fields)
+        if None is not self.root_predicate:
+            columns.update(
+                getattr(predicate, 'column', None)
+                for predicate in iter_leaf_predicates([self.root_predicate])
+            )
+
+        columns.update(
+            field_name for field_name, reversed in self.inefficient_ordering
+        )
+
+        return [
+            column for column in self.column_names
+            if column in columns
+        ]
+
+    def get_scan_token_ranges(
+        self,
+        range_predicates,
+        inefficient_predicates,
+        aggregating=False
+    ):
+        '''
+        Returns the (start, end] token ranges a query reading the whole
+        table is split into, read concurrently and filtered client side
+        or aggregated by Cassandra. None if the query only reads some
+        partitions or if the cluster doesn't use the Murmur3Partitioner.
+        '''
+        if not (self.scan or aggregating or inefficient_predicates):
+            return None
+
+        if any(
+            predicate.column not in self.clustering_columns
+            for predicate in iter_leaf_predicates(range_predicates)
+        ):
+            return None
+
+        partitioner = getattr(
+            self.session.cluster.metadata,
+            'partitioner',
+            None
+        )
+        if MURMUR3_PARTITIONER != partitioner:
+            return None
+
+        splits = self.connection.settings_dict.get('SCAN_SPLITS', 64)
+        if splits < 2:
+            return None
+
+        step = (MURMUR3_MAX_TOKEN - MURMUR3_MIN_TOKEN) // splits
+        bounds = [
+            MURMUR3_MIN_TOKEN + step * split
+            for split in xrange(splits)
+        ]
+        bounds.append(MURMUR3_MAX_TOKEN)
+        return zip(bounds[:-1], bounds[1:])
+
+    def prepare(self, cql):
+        '''
+        Returns cql prepared on the session the query reads from. Like
+        the cursor's, the statements are prepared once per connection.
+        '''
+        key = cql if None is self.replica else (self.replica, cql)
+        prepared = self.connection.prepared_statements.get(key)
+        self.connection.metrics.record_statement_cache(None is not prepared)
+        if None is prepared:
+            prepared = self.session.prepare(cql)
+            self.connection.prepared_statements[key] = prepared
+
+        return prepared
+
+    def get_split_predicates(self, range_predicates):
+        '''
+        Returns the IN predicates split into one exact lookup per value:
+        the ones on indexed columns, which Cassandra can't take as a CQL
+        IN, on a clustering column following one that isn't restricted
+        and on partition key columns. A partition key IN would make the
+        coordinator read every partition, the split lookups each read a
+        single one and run concurrently.
+        '''
+        restricted_columns = set(
+            predicate.column for predicate in range_predicates
+            if isinstance(predicate, InPredicate) or (
+                isinstance(predicate, RangePredicate) and
+                predicate._is_exact()
+            )
+        )
+        partition_restricted = all(
+            column in restricted_columns
+            for column in self.partition_columns
+        )
+
+        split_predicates = []
+        for predicate in range_predicates:
+            if not isinstance(predicate, InPredicate):
+                continue
+
+            if predicate.column in self.partition_columns:
+                native = False
+
+            elif predicate.column in self.clustering_columns:
+                native = partition_restricted and all(
+                    column in restricted_columns
+                    for column in self.clustering_columns[
+                        :self.clustering_columns.index(predicate.column)
+                    ]
+                )
+
+            else:
+                native = False
+
+            if not native:
+                split_predicates.append(predicate)
+
+        return split_predicates
 
-    def get_row_range(self, range_predicates):
+    def get_row_ranges(
+        self,
+        range_predicates,
+        token_ranges=None
+    ):
         '''
-        !!! Does this need to check for clustering key? !!!
+        Returns the CQL queries selecting the rows matching
+        range_predicates. That's a single query unless they contain an
+        OR, made of one query per alternative, or an IN predicate that
+        has to be split into one exact lookup per value. Each query is
+        further split into one per token range of token_ranges.
         '''
-        if not isinstance(range_predicates, list):
-            range_predicates = list(range_predicates)
+        # The selected columns don't depend on the conjunction, don't
+        # walk the predicate tree once per key of a large OR.
+        selected_columns = self.get_selected_columns()
+        queries = []
+        for conjunction in get_conjunctions(range_predicates):
+            conjunction = merge_predicates(conjunction)
+            if None is not conjunction:
+                queries.extend(self._get_conjunction_ranges(
+                    conjunction,
+                    selected_columns
+                ))
+
+        if not token_ranges:
+            return queries
+
+        token = 'token(%s)' % (', '.join(
+            '"%s"' % (column.db_field_name,)
+            for column in self.column_family_class._partition_keys.values()
+        ),)
+
+        return [
+            query.filter(
+                WhereClause(
+                    token,
+                    GreaterThanOperator(),
+                    start,
+                    quote_field=False
+                ),
+                WhereClause(
+                    token,
+                    LessThanOrEqualOperator(),
+                    end,
+                    quote_field=False
+                )
+            )
+            for query in queries
+            for start, end in token_ranges
+        ]
 
+    def _get_conjunction_ranges(
+        self,
+        range_predicates,
+        selected_columns=None
+    ):
         for predicate in range_predicates:
             assert(
                 predicate.column in self.filterable_columns
             )
 
-        query = self._get_rows_by_indexed_column(range_predicates)
-        return query
+        if any(
+            isinstance(predicate, InPredicate) and not predicate.values
+            for predicate in range_predicates
+        ):
+            return []
+
+        split_predicates = self.get_split_predicates(range_predicates)
+        query = self._get_rows_by_indexed_column(
+            [
+                predicate for predicate in range_predicates
+                if predicate not in split_predicates
+            ],
+            selected_columns
+        )
+
+        if not split_predicates:
+            return [query]
+
+        queries = []
+        for values in itertools.product(*[
+            predicate.values for predicate in split_predicates
+        ]):
+            split_query = query.filter(**dict(
+                (predicate.column, value)
+                for predicate, value in zip(split_predicates, values)
+            ))
+
+            # cqlengine doesn't select the columns restricted by
+            # equality, keep one if they're the only ones selected.
+            only_fields = split_query._only_fields
+            if only_fields and all(
+                column in split_query._defer_fields
+                for column in only_fields
+            ):
+                split_query._defer_fields.discard(only_fields[0])
+
+            queries.append(split_query)
+
+        return queries
 
     def get_all_rows(self):
         return self._get_query_results()
@@ -315,56 +656,495 @@ class CassandraQuery(NonrelQuery):
         ):
             raise Exception('Can\'t slice query high_mark > low_mark')
 
+        self.push_down_limit(high_mark)
+        if None is not self.limit:
+            self.cql_query = self.cql_query.limit(self.limit)
+
+        with self.connection.metrics.start(
+            self.query.model,
+            getattr(self.query, 'operation', None) or 'filter'
+        ) as sample:
+            self.sample = sample
+            results = self._get_query_results()
+
+            for entity in results:
+                sample.rows_returned += 1
+                yield entity
+
+    def count(
+        self,
+        limit=None
+    ):
+        if None is not limit:
+            self.push_down_limit(limit)
+
+        self.cql_query = self.cql_query.limit(self.limit)
+
+        with self.connection.metrics.start(
+            self.query.model,
+            getattr(self.query, 'operation', None) or 'count'
+        ) as sample:
+            self.sample = sample
+            if None is limit:
+                _, (aggregator,) = self._aggregate(
+                    [Aggregator('COUNT')],
+                    []
+                )[0]
+                count = aggregator.result()
+
+            else:
+                count = 0
+                for row in itertools.islice(
+                    self.root_predicate.get_matching_rows(self),
+                    limit
+                ):
+                    count += 1
+
+            sample.rows_returned = count
+
+        return count
+
+    def aggregate(
+        self,
+        aggregators,
+        group_by=None
+    ):
+        '''
+        Returns a (group values, aggregators) pair per group of the
+        group_by columns of the matching rows, a single one over all the
+        rows if there are none.
+        '''
+        self.cql_query = self.cql_query.limit(self.limit)
+
+        with self.connection.metrics.start(
+            self.query.model,
+            getattr(self.query, 'operation', None) or 'aggregate'
+        ) as sample:
+            self.sample = sample
+            groups = self._aggregate(aggregators, group_by or [])
+            sample.rows_returned = len(groups)
+
+        return groups
+
+    def _aggregate(
+        self,
+        aggregators,
+        group_by
+    ):
+        range_predicates, inefficient_predicates = (
+            self.root_predicate.split_children(self)
+        )
+
+        # Rows Cassandra can't aggregate are folded as they stream in.
+        pushed_down = self.can_push_down_aggregates(
+            aggregators,
+            group_by,
+            range_predicates,
+            inefficient_predicates
+        )
+        if pushed_down:
+            rows = self._get_aggregate_rows(
+                aggregators,
+                group_by,
+                range_predicates
+            )
+
+        else:
+            rows = self.root_predicate.get_matching_rows(self)
+
+        groups = OrderedDict()
+        for row in rows:
+            key = tuple(row.get(column) for column in group_by)
+            group = groups.get(key)
+            if None is group:
+                group = groups[key] = [
+                    aggregator.clone() for aggregator in aggregators
+                ]
+
+            for index, aggregator in enumerate(group):
+                if pushed_down:
+                    aggregator.merge(row, 'a%d' % (index,))
+
+                else:
+                    aggregator.add(row)
+
+        if not group_by and not groups:
+            groups[()] = [aggregator.clone() for aggregator in aggregators]
+
+        return groups.items()
+
+    def can_push_down_aggregates(
+        self,
+        aggregators,
+        group_by,
+        range_predicates,
+        inefficient_predicates
+    ):
+        '''
+        True if Cassandra can compute the aggregates: every row is
+        filtered by Cassandra, no row is read by two of the statements
+        and the rows are grouped by a primary key prefix containing the
+        partition key, which needs Cassandra 3.10.
+        '''
         if (
-            not low_mark and high_mark and
+            inefficient_predicates or
+            not predicates_disjoint(range_predicates) or
+            not all(aggregator.can_push_down for aggregator in aggregators)
+        ):
+            return False
+
+        if not group_by:
+            return True
+
+        key_columns = self.partition_columns + self.clustering_columns
+        return (
+            len(self.partition_columns) <= len(group_by) and
+            set(group_by) == set(key_columns[:len(group_by)]) and
+            self.supports_group_by()
+        )
+
+    def supports_group_by(self):
+        metadata = self.session.cluster.metadata
+        if not hasattr(metadata, 'all_hosts'):
+            return True
+
+        for host in metadata.all_hosts():
+            version = getattr(host, 'release_version', None)
+            if version and tuple(
+                int(part) for part in re.findall(r'\d+', version)[:2]
+            ) < (3, 10):
+                return False
+
+        return True
+
+    def _get_aggregate_rows(
+        self,
+        aggregators,
+        group_by,
+        range_predicates
+    ):
+        token_ranges = self.get_scan_token_ranges(
+            range_predicates,
+            [],
+            aggregating=True
+        )
+        cql_queries = self.get_row_ranges(range_predicates, token_ranges)
+
+        selectors = ['"%s"' % (column,) for column in group_by]
+        for index, aggregator in enumerate(aggregators):
+            selectors.extend(aggregator.get_selectors('a%d' % (index,)))
+
+        statements = []
+        for cql_query in cql_queries:
+            select_query = cql_query._select_query()
+            statement = AggregateSelectStatement(
+                select_query.table,
+                selectors,
+                where=select_query.where_clauses,
+                group_by=[
+                    column for column in itertools.chain(
+                        self.partition_columns,
+                        self.clustering_columns
+                    ) if column in group_by
+                ],
+                allow_filtering=select_query.allow_filtering
+            )
+            statements.append((
+                SimpleStatement(
+                    unicode(statement),
+                    consistency_level=ConsistencyLevel.ONE
+                ),
+                get_query_parameters(cql_query)
+            ))
+
+        self.session.row_factory = ordered_dict_factory
+        if 1 == len(statements):
+            results = [self.session.execute(*statements[0])]
+
+        else:
+            results = (
+                result for success, result in execute_concurrent(
+                    self.session,
+                    statements,
+                    concurrency=self.connection.settings_dict.get(
+                        'READ_CONCURRENCY',
+                        50
+                    ),
+                    results_generator=True
+                )
+            )
+
+        for result in results:
+            for row in result:
+                if None is not self.sample:
+                    self.sample.rows_fetched += 1
+
+                yield row
+
+    def push_down_limit(self, high_mark):
+        '''
+        Sends high_mark to Cassandra as the LIMIT of every statement when
+        no row is filtered or ordered client side, so that first(),
+        last(), latest(), earliest() and exists() read a single row.
+        '''
+        if None is not high_mark and self.is_efficient():
+            self.limit = high_mark
+
+    def is_efficient(self):
+        '''
+        True if every filter and ordering can be pushed down to
+        Cassandra.
+        '''
+        return (
+            not self.inefficient_ordering and
             self.root_predicate.can_evaluate_efficiently(
                 self.partition_columns,
                 self.clustering_columns,
                 self.indexed_columns
             )
-        ):
-            self.limit = high_mark
+        )
 
-        if None is not self.limit:
-            self.cql_query = self.cql_query.limit(self.limit)
+    def get_predicate_kind(self, predicate):
+        if isinstance(predicate, LikePredicate):
+            return 'sasi'
 
-        results = self._get_query_results()
+        if 'pk__token' == predicate.column:
+            return 'token'
 
-        for entity in results:
-            yield entity
+        if predicate.column in self.partition_columns:
+            return 'partition'
 
-    def count(
+        if predicate.column in self.clustering_columns:
+            return 'clustering'
+
+        return 'index'
+
+    def estimate_partitions(self):
+        '''
+        Sums the partition counts the node coordinating this query
+        keeps in system.size_estimates for the column family. None if
+        no estimate is available.
+        '''
+        try:
+            rows = self.session.execute(
+                'SELECT partitions_count FROM system.size_estimates '
+                'WHERE keyspace_name = %s AND table_name = %s',
+                (
+                    self.column_family_class._get_keyspace(),
+                    self.column_family_class._raw_column_family_name()
+                )
+            )
+
+        except InvalidRequest:
+            return None
+
+        estimate = None
+        for row in rows:
+            partitions_count = (
+                row['partitions_count']
+                if isinstance(row, dict)
+                else row.partitions_count
+            )
+            estimate = (estimate or 0) + partitions_count
+
+        return estimate
+
+    def explain(
         self,
-        limit=None
+        low_mark=None,
+        high_mark=None
     ):
-        return len(
-            [x for x in self.root_predicate.get_matching_rows(self)]
+        '''
+        Returns the plan CompoundPredicate.get_matching_rows follows
+        for this query without running it.
+        '''
+        if None is self.root_predicate:
+            raise Exception('No root query node')
+
+        range_predicates, inefficient_predicates = (
+            self.root_predicate.split_children(self)
+        )
+
+        self.push_down_limit(high_mark)
+
+        token_ranges = self.get_scan_token_ranges(
+            range_predicates,
+            inefficient_predicates
+        )
+        cql_queries = self.get_row_ranges(range_predicates, token_ranges)
+
+        # Split IN predicates and token range scans give several
+        # statements, only the first one is shown.
+        cql = None
+        markers = []
+        if cql_queries:
+            cql_query = cql_queries[0]
+            for order in self.ordering:
+                cql_query = cql_query.order_by(order)
+
+            if None is not self.limit:
+                cql_query = cql_query.limit(self.limit)
+
+            cql, markers = get_positional_query(cql_query)
+
+        partition_values = {}
+        for predicate in range_predicates:
+            if isinstance(predicate, InPredicate):
+                partition_values[predicate.column] = len(predicate.values)
+
+            elif (
+                isinstance(predicate, RangePredicate) and
+                predicate._is_exact()
+            ):
+                partition_values[predicate.column] = 1
+
+        partition_restricted = all(
+            column in partition_values for column in self.partition_columns
+        )
+        partition_count = 1
+        for column in self.partition_columns:
+            partition_count *= partition_values.get(column, 1)
+
+        single_partition = partition_restricted and 1 == partition_count
+
+        table_partitions = self.estimate_partitions()
+        if partition_restricted:
+            estimated_partitions = partition_count
+
+        else:
+            estimated_partitions = table_partitions
+
+        inefficient = bool(
+            inefficient_predicates or
+            self.inefficient_ordering
         )
 
+        return {
+            'column_family': self.column_family,
+            'routed_from': self.routed_from,
+            'cql': cql,
+            'parameters': markers,
+            'statements': len(cql_queries),
+            'token_ranges': len(token_ranges or []),
+            'where': [
+                {
+                    'predicate': repr(predicate),
+                    'column': getattr(predicate, 'column', None),
+                    'kind': self.get_predicate_kind(predicate)
+                } for predicate in iter_leaf_predicates(range_predicates)
+            ],
+            'client_side': [
+                repr(predicate) for predicate in inefficient_predicates
+            ],
+            'ordering': {
+                'pushed_down': list(self.ordering),
+                'in_memory': [
+                    ''.join([
+                        '-' if reversed else '',
+                        field_name
+                    ]) for field_name, reversed in self.inefficient_ordering
+                ]
+            },
+            'limit': self.limit,
+            'slice': (low_mark, high_mark),
+            'single_partition': single_partition,
+            'estimated_partitions': estimated_partitions,
+            'estimated_table_partitions': table_partitions,
+            'inefficient': inefficient,
+            'raises_inefficient_query_error': (
+                inefficient and not self.allows_inefficient
+            )
+        }
+
     def delete(
         self,
         columns=set()
     ):
-        if self.root_predicate.can_evaluate_efficiently(
-            self.partition_columns,
-            self.clustering_columns,
-            self.indexed_columns
-        ):
-            query = self.root_predicate.get_matching_rows(self)
-            for r in query:
-                r.delete()
+        with self.connection.metrics.start(
+            self.query.model,
+            'delete'
+        ) as sample:
+            self.sample = sample
+            self._delete(sample)
+
+    def _delete(
+        self,
+        sample
+    ):
+        range_predicates, inefficient_predicates = (
+            self.root_predicate.split_children(self)
+        )
 
-        else:
-            rows = self.root_predicate.get_matching_rows(self)
-            for row in rows:
-                filterable_columns = itertools.chain(
-                    self.partition_columns,
-                    self.clustering_columns
-                )
-                query_parameters = {
-                    field: row[field] for field in filterable_columns
-                }
-                self.column_family_class.get(**query_parameters).delete()
+        keys = None
+        if not inefficient_predicates:
+            keys = self.get_deletion_keys(range_predicates)
+
+        if None is keys:
+            # Matching rows are plain dicts, each is deleted by its
+            # primary key.
+            keys = []
+            for row in self.root_predicate.get_matching_rows(self):
+                keys.append(OrderedDict(
+                    (column, row[column])
+                    for column in self.cassandra_pk_columns
+                ))
+                sample.rows_returned += 1
+
+        sample.batch_size = len(keys)
+        self.delete_keys(keys)
+
+    def get_deletion_keys(self, range_predicates):
+        '''
+        Returns the keys the rows matching range_predicates can be
+        deleted by without reading them, one dict of column values per
+        CQL query, if every query restricts a whole partition or a whole
+        primary key by equality and nothing else. None otherwise.
+        '''
+        partition_columns = set(self.partition_columns)
+        key_columns = set(self.cassandra_pk_columns)
+
+        keys = []
+        for cql_query in self.get_row_ranges(range_predicates):
+            key = OrderedDict()
+            for where in cql_query._where:
+                if not isinstance(where.operator, EqualsOperator):
+                    return None
+
+                key[where.field] = where.value
+
+            if set(key) not in (partition_columns, key_columns):
+                return None
+
+            keys.append(key)
+
+        return keys
+
+    def delete_keys(self, keys):
+        '''
+        Deletes the rows, or partitions, identified by keys. The
+        prepared DELETE statements are grouped into unlogged batches per
+        partition and run concurrently by the cursor, see the
+        EXECUTEMANY_BATCH_SIZE and EXECUTEMANY_CONCURRENCY settings.
+        '''
+        args_by_columns = OrderedDict()
+        for key in keys:
+            columns = tuple(
+                column for column in self.cassandra_pk_columns
+                if column in key
+            )
+            args_by_columns.setdefault(columns, []).append(
+                [key[column] for column in columns]
+            )
+
+        cursor = self.connection.create_cursor()
+        for columns, args_list in args_by_columns.iteritems():
+            cursor.executemany(
+                'DELETE FROM %s WHERE %s' % (
+                    self.column_family_class.column_family_name(),
+                    ' AND '.join('"%s" = ?' % (column,) for column in columns)
+                ),
+                args_list
+            )
 
     def order_by(
         self,
@@ -374,59 +1154,93 @@ class CassandraQuery(NonrelQuery):
             self.reverse_order = not ordering
             return
 
+        orders = []
+        ordered_columns = set()
         for order in ordering:
             if isinstance(order, basestring):
-                if order.startswith('-'):
-                    field_name = order[1:]
-                    ascending = False
-
-                else:
-                    field_name = order
-                    ascending = True
+                field_name = order.lstrip('-')
+                field = (
+                    self.meta.pk
+                    if 'pk' == field_name
+                    else self.meta.get_field(field_name)
+                )
+                ascending = not order.startswith('-')
 
             elif 2 == len(order):
                 field, ascending = order
-                field_name = field.name
 
             else:
                 raise ProgrammingError(
                     'Invalid ordering specification: %s' % order,
                 )
 
-            order_string = ''.join([
-                '' if ascending else '-',
-                field_name
-            ])
-
-            partition_key_filtered = True
-            for partition_key in self.partition_columns:
-                found = False
-                for filter_tuple in self.filters:
-                    field = filter_tuple[0]
-                    if isinstance(field, ForeignKey):
-                        partition_key = re.sub(
-                            '_id$',
-                            '',
-                            partition_key
-                        )
-
-                    if partition_key == field.name:
-                        found = True
-                        continue
-
-                if not found:
-                    partition_key_filtered = False
-                    break
-
-            if (
-                partition_key_filtered
-                and field_name in self.clustering_columns
-                and not self.inefficient_ordering
-            ):
-                self.ordering.append(order_string)
+            # Rows are ordered by primary key in partition then clustering
+            # order, which is how first() and last() order unordered
+            # querysets.
+            if field == self.meta.pk:
+                columns = [self.pk_column] + self.clustering_columns
 
             else:
-                self.add_inefficient_order_by(order_string)
+                columns = [field.column]
+
+            for column in columns:
+                if column not in ordered_columns:
+                    ordered_columns.add(column)
+                    orders.append((column, ascending))
+
+        # Cassandra can't page ORDER BY queries restricting the
+        # partition key with anything but =.
+        partition_key_filtered = True
+        for partition_key in self.partition_columns:
+            found = False
+            for filter_tuple in self.filters:
+                field = filter_tuple[0]
+                if filter_tuple[1] not in ('exact', 'eq'):
+                    continue
+
+                if isinstance(field, ForeignKey):
+                    partition_key = re.sub(
+                        '_id$',
+                        '',
+                        partition_key
+                    )
+
+                if partition_key == field.name:
+                    found = True
+                    continue
+
+            if not found:
+                partition_key_filtered = False
+                break
+
+        # Within a partition the partition key columns are constant.
+        if partition_key_filtered:
+            orders = [
+                (column, ascending) for column, ascending in orders
+                if column not in self.partition_columns
+            ]
+
+        # ORDER BY takes a prefix of the clustering columns, all in
+        # clustering order or all reversed.
+        if (
+            partition_key_filtered and
+            [column for column, _ in orders] == (
+                self.clustering_columns[:len(orders)]
+            ) and
+            len(set(ascending for _, ascending in orders)) < 2
+        ):
+            for column, ascending in orders:
+                self.ordering.append(''.join([
+                    '' if ascending else '-',
+                    column
+                ]))
+
+        else:
+            for column, ascending in orders:
+                self.add_inefficient_order_by(''.join([
+                    '' if ascending else '-',
+                    column
+                ]))
 
     @safe_call
     def add_inefficient_order_by(self, ordering):
@@ -464,7 +1278,13 @@ class CassandraQuery(NonrelQuery):
                 decoded_child = self._decode_child(node)
                 assert parent_predicate
 
-                parent_predicate.add_filter(*decoded_child)
+                like_predicate = self.get_like_predicate(*decoded_child)
+                if None is like_predicate:
+                    parent_predicate.add_filter(*decoded_child)
+
+                else:
+                    parent_predicate.add_child(like_predicate)
+
                 self.filters.append(decoded_child)
 
             except EmptyResultSet:
@@ -474,6 +1294,50 @@ class CassandraQuery(NonrelQuery):
 
         return predicate
 
+    def get_like_predicate(
+        self,
+        field,
+        lookup_type,
+        value
+    ):
+        '''
+        Returns a LikePredicate for lookups the column's SASI index can
+        answer, None for every other filter.
+        '''
+        column_name = (
+            field.db_column
+            if field.db_column
+            else field.column
+        )
+        options = self.sasi_columns.get(column_name)
+        if (
+            None is options or
+            column_name in self.partition_columns or
+            column_name in self.clustering_columns
+        ):
+            return None
+
+        # SASI has no escape for %, only a leading and a trailing one
+        # are wildcards.
+        if (
+            not isinstance(value, basestring) or
+            not value or
+            '%' in value
+        ):
+            return None
+
+        if lookup_type not in LIKE_LOOKUPS[(
+            options['mode'],
+            bool(options['case_sensitive'])
+        )]:
+            return None
+
+        return LikePredicate(
+            column_name,
+            lookup_type,
+            value
+        )
+
     # FIXME: This is bad. We're modifying the WhereNode object that's passed in to us
     # from the Django ORM. We should do the pruning as we build our predicates, not
     # munge the WhereNode.
@@ -502,27 +1366,545 @@ class CassandraQuery(NonrelQuery):
 
         assert isinstance(filters, WhereNode)
         self.remove_unnecessary_nodes(filters, True)
-        self.root_predicate = self.init_predicate(None, filters)
+        root_predicate = push_down_negation(
+            self.init_predicate(None, filters),
+            self.cassandra_pk_columns + ['pk__token']
+        )
+
+        # Only the children of an AND are sent to Cassandra.
+        if (
+            not isinstance(root_predicate, CompoundPredicate) or
+            root_predicate.negated or
+            root_predicate.op != COMPOUND_OP_AND
+        ):
+            root_predicate = CompoundPredicate(
+                COMPOUND_OP_AND,
+                children=[root_predicate]
+            )
+
+        self.root_predicate = root_predicate
 
 
 class SQLCompiler(NonrelCompiler):
     query_class = CassandraQuery
+    reads_from_replica = True
+    reads_denormalized = True
+
+    def get_fields(self):
+        '''
+        The fields selected by values() querysets are the targets of
+        the columns in query.select.
+        '''
+        if self.query.select:
+            return [column.target for column in self.query.select]
+
+        return super(SQLCompiler, self).get_fields()
+
+    def build_query(self, fields=None):
+        if fields is None:
+            fields = self.get_fields()
+
+        query = super(SQLCompiler, self).build_query(fields)
+        if self.reads_denormalized and not query.is_efficient():
+            denormalized_query = self.get_denormalized_query(fields)
+            if None is not denormalized_query:
+                return denormalized_query
+
+        return query
+
+    def get_denormalized_query(self, fields):
+        '''
+        Returns an equivalent query on the first of the model's
+        denormalized_models that has every selected column and on which
+        all the filters and ordering can be pushed down, None if there
+        is none. Rows read from it are returned as this query's model.
+
+        Denormalized models overriding should_denormalize may only hold
+        some of the rows and are never used. Only models setting
+        route_to_denormalized to True in their Cassandra meta class are
+        routed, QuerySet.update() and delete() don't reach the
+        denormalized models which can then hold stale rows.
+        '''
+        model = self.query.model
+        cassandra_meta = getattr(model, 'Cassandra', None)
+        if not getattr(cassandra_meta, 'route_to_denormalized', False):
+            return None
+
+        columns = set(field.column for field in fields)
+        ordering = self._get_ordering()
+        for denormalized_model in get_denormalized_models(model):
+            if (
+                getattr(denormalized_model, 'should_denormalize', None) is
+                not ColumnFamilyModel.should_denormalize
+            ):
+                continue
+
+            meta = denormalized_model._meta
+            if not columns.issubset(field.column for field in meta.fields):
+                continue
+
+            if isinstance(ordering, bool):
+                denormalized_ordering = ordering
+
+            else:
+                try:
+                    denormalized_ordering = [
+                        (meta.get_field(field.name), ascending)
+                        for field, ascending in ordering
+                    ]
+
+                except FieldDoesNotExist:
+                    continue
+
+            query = self.query.clone()
+            query.model = denormalized_model
+            query.where.relabel_aliases({
+                model._meta.db_table: meta.db_table
+            })
+
+            compiler = query.get_compiler(connection=self.connection)
+            denormalized_query = compiler.query_class(
+                compiler,
+                meta.fields
+            )
+            denormalized_query.add_filters(query.where)
+            denormalized_query.order_by(denormalized_ordering)
+
+            if denormalized_query.is_efficient():
+                denormalized_query.routed_from = model._meta.db_table
+                return denormalized_query
+
+        return None
+
+    def results_iter(self, results=None):
+        if results is None and self.query.annotation_select:
+            for row in self.grouped_results_iter():
+                yield row
+
+            return
+
+        fields = self.get_fields()
+        if results is None:
+            try:
+                results = self.build_query(fields).fetch(
+                    self.query.low_mark,
+                    self.query.high_mark
+                )
+
+            except EmptyResultSet:
+                results = []
+
+        decoders = self.connection.ops.get_model_converters(
+            self.query.model
+        ).row_decoders(fields)
+
+        for entity in results:
+            yield self.decode_row(entity, decoders)
+
+    def decode_row(self, entity, decoders):
+        result = []
+        for column, field, from_db in decoders:
+            value = entity.get(column, NOT_PROVIDED)
+            if value is NOT_PROVIDED or (
+                None is value and isinstance(field, CounterField)
+            ):
+                # Counters never incremented are null.
+                value = field.get_default()
+
+            elif None is not value and None is not from_db:
+                value = from_db(value)
+
+            if None is value and not field.null:
+                raise IntegrityError(
+                    'Non-nullable field %s can\'t be None!' % (
+                        field.name,
+                    )
+                )
+
+            result.append(value)
+
+        return result
+
+    def values_iter(
+        self,
+        names=None,
+        flat=False
+    ):
+        '''
+        Yields the rows of values() querysets as dicts keyed by names,
+        and those of values_list() querysets as tuples (single values
+        if flat), straight from the rows Cassandra returns: no model
+        instance is built and only the columns whose conversion from
+        the database isn't the identity are converted.
+        '''
+        fields = self.get_fields()
+        try:
+            results = self.build_query(fields).fetch(
+                self.query.low_mark,
+                self.query.high_mark
+            )
+
+        except EmptyResultSet:
+            return
+
+        decoders = self.connection.ops.get_model_converters(
+            self.query.model
+        ).row_decoders(fields)
+        conversions = [
+            (index, from_db)
+            for index, (_, _, from_db) in enumerate(decoders)
+            if None is not from_db
+        ]
+        counters = [
+            index for index, (_, field, _) in enumerate(decoders)
+            if isinstance(field, CounterField)
+        ]
+
+        columns = [column for column, _, _ in decoders]
+        if 1 == len(columns):
+            column = columns[0]
+            getter = lambda entity: (entity[column],)
+
+        else:
+            getter = itemgetter(*columns)
+
+        for entity in results:
+            try:
+                values = getter(entity)
+
+            except KeyError:
+                # Columns missing from the row take the field default.
+                values = self.decode_row(entity, decoders)
+
+            else:
+                if conversions or counters:
+                    values = list(values)
+                    for index, from_db in conversions:
+                        if None is not values[index]:
+                            values[index] = from_db(values[index])
+
+                    for index in counters:
+                        if None is values[index]:
+                            values[index] = 0
+
+            if flat:
+                yield values[0]
+
+            elif None is not names:
+                yield dict(zip(names, values))
+
+            else:
+                yield tuple(values)
+
+    def grouped_results_iter(self):
+        '''
+        Yields the rows of values(...).annotate(...) querysets: the
+        values of the selected fields of each group followed by the
+        aggregates over the group.
+        '''
+        if not isinstance(self.query.group_by, list):
+            raise DatabaseError(
+                'Aggregate annotations are only supported after values() '
+                'by this backend.'
+            )
+
+        group_fields = []
+        for column in self.query.select:
+            if not isinstance(column, Col):
+                raise DatabaseError(
+                    'Only fields can be grouped on by this backend.'
+                )
+
+            group_fields.append(column.target)
+
+        aggregators, fields = self.get_aggregators()
+
+        # The ordering is applied to the groups.
+        query = self.query.clone()
+        query.clear_ordering(True)
+        compiler = query.get_compiler(using=self.using)
+        try:
+            groups = compiler.build_query(group_fields + [
+                field for field in fields if field not in group_fields
+            ]).aggregate(
+                aggregators,
+                [field.column for field in group_fields]
+            )
+
+        except EmptyResultSet:
+            return
+
+        decoders = self.connection.ops.get_model_converters(
+            self.query.model
+        ).row_decoders(group_fields)
+
+        rows = []
+        for key, group in groups:
+            row = []
+            for value, (column, field, from_db) in zip(key, decoders):
+                if None is not value and None is not from_db:
+                    value = from_db(value)
+
+                row.append(value)
+
+            row.extend(aggregator.result() for aggregator in group)
+            rows.append(row)
+
+        names = [field.name for field in group_fields] + list(
+            self.query.annotation_select
+        )
+        for order in reversed(self.query.order_by):
+            name = order.lstrip('-')
+            if name in names:
+                index = names.index(name)
+                rows.sort(
+                    key=lambda row: row[index],
+                    reverse=order.startswith('-')
+                )
+
+        for row in rows:
+            yield row
+
+    def get_aggregators(self):
+        '''
+        Returns an Aggregator per annotation of the query and the fields
+        they aggregate.
+        '''
+        aggregators = []
+        fields = []
+        for annotation in self.query.annotation_select.values():
+            function = getattr(annotation, 'function', None)
+            sources = annotation.get_source_expressions()
+            if function not in AGGREGATE_FUNCTIONS or 1 != len(sources):
+                raise DatabaseError(
+                    'Only Count, Sum, Avg, Min and Max aggregates of a '
+                    'field are supported by this backend.'
+                )
+
+            source = sources[0]
+            cast = None
+            if isinstance(source, Star) or (
+                isinstance(source, Value) and '*' == source.value
+            ):
+                column = None
+
+            elif isinstance(source, Col):
+                column = source.target.column
+                if source.target not in fields:
+                    fields.append(source.target)
+
+                if function in ('SUM', 'AVG'):
+                    cast = SUM_CASTS.get(
+                        get_cql_column_type(source.target).db_type
+                    )
+
+            else:
+                raise DatabaseError(
+                    'Only Count, Sum, Avg, Min and Max aggregates of a '
+                    'field are supported by this backend.'
+                )
+
+            aggregators.append(Aggregator(
+                function,
+                column,
+                distinct=bool(getattr(annotation, 'extra', {}).get(
+                    'distinct'
+                )),
+                cast=cast
+            ))
+
+        return aggregators, fields
 
     def execute_sql(
         self,
         result_type=MULTI
     ):
-        return super(SQLCompiler, self).execute_sql(result_type)
+        if not self.query.annotation_select:
+            return super(SQLCompiler, self).execute_sql(result_type)
+
+        self.pre_sql_setup()
+
+        aggregators, fields = self.get_aggregators()
+        try:
+            query = self.build_query(fields)
+            if 1 == len(aggregators) and (
+                'COUNT' == aggregators[0].function and
+                None is aggregators[0].column
+            ):
+                aggregators[0].count = query.count()
+
+            else:
+                _, aggregators = query.aggregate(aggregators)[0]
+
+        except EmptyResultSet:
+            pass
+
+        result = [aggregator.result() for aggregator in aggregators]
+        if result_type is SINGLE:
+            return result
+
+        elif result_type is MULTI:
+            return [result]
+
+    def get_collection_clause(
+        self,
+        column_family,
+        field,
+        update
+    ):
+        '''
+        Returns the CollectionUpdateClause applying the CollectionUpdate
+        update to the column of field, its elements converted the way
+        the whole collection would be.
+        '''
+        kind = field.get_internal_type()
+        if kind not in update.field_kinds:
+            raise DatabaseError(
+                '%s can\'t be applied to %s, a %s.' % (
+                    update.__class__.__name__,
+                    field.name,
+                    kind
+                )
+            )
+
+        converter = self.connection.ops.get_model_converters(
+            self.query.model
+        ).by_column[field.column]
+        column = column_family._columns[field.column]
+
+        def to_database(value):
+            value = converter.prep_save(value)
+            if None is not converter.to_db:
+                value = converter.to_db(value)
+
+            return column.to_database(value)
+
+        key = None
+        if 'set_item' == update.operation:
+            if 'DictField' == kind:
+                key, value = to_database({
+                    update.key: update.value
+                }).items()[0]
+
+            else:
+                key = update.key
+                value = to_database([update.value])[0]
+
+        elif 'remove_key' == update.operation:
+            value = set(
+                column.key_col.to_database(key) for key in update.items
+            )
+
+        elif 'SetField' == kind:
+            value = to_database(set(update.items))
+
+        else:
+            value = to_database(list(update.items))
+
+        return CollectionUpdateClause(
+            column.db_field_name,
+            update.operation,
+            value,
+            key
+        )
 
 
 class SQLInsertCompiler(
     NonrelInsertCompiler,
     SQLCompiler
 ):
+    reads_from_replica = False
+    reads_denormalized = False
+
+    def execute_sql(
+        self,
+        return_id=False
+    ):
+        self.pre_sql_setup()
+
+        converters = self.connection.ops.get_model_converters(
+            self.query.model
+        )
+        columns = set(
+            field.column for field in self.query.fields
+        )
+        columns = [
+            converter for converter in converters.columns
+            if converter.column in columns
+        ]
+        raw = self.query.raw
+
+        to_insert = []
+        updates = []
+        for obj in self.query.objs:
+            adding = obj._state.adding
+            row = {}
+            row_updates = []
+            for converter in columns:
+                if converter.counter:
+                    row[converter.column] = converter.field.get_increment(
+                        obj
+                    )
+                    continue
+
+                if converter.collection and not raw:
+                    # Collections read from Cassandra are only written
+                    # where they changed.
+                    collection_updates = get_collection_updates(
+                        converter.field,
+                        obj
+                    )
+                    if None is not collection_updates:
+                        row_updates.extend(
+                            (converter.field, update)
+                            for update in collection_updates
+                        )
+                        continue
+
+                if converter.has_pre_save and not raw:
+                    value = converter.field.pre_save(obj, adding)
+
+                else:
+                    value = getattr(obj, converter.attname)
+
+                value = converter.prep_save(value)
+                if None is value:
+                    if not converter.null and not converter.primary_key:
+                        raise IntegrityError(
+                            'You can\'t set %s (a non-nullable '
+                            'field) to None!' % (converter.field.name,)
+                        )
+
+                elif None is not converter.to_db:
+                    value = converter.to_db(value)
+
+                row[converter.column] = value
+
+            to_insert.append(row)
+            updates.append(row_updates)
+
+        key = self.insert(
+            to_insert,
+            return_id=return_id,
+            updates=updates
+        )
+
+        for converter in columns:
+            if converter.counter or converter.collection:
+                for obj in self.query.objs:
+                    set_saved(converter.field, obj)
+
+        pk_field = self.query.get_meta().pk
+        return self.ops.convert_values(
+            self.ops.value_from_db(key, pk_field),
+            pk_field
+        )
+
     def insert(
         self,
         values,
-        return_id
+        return_id,
+        updates=None
     ):
         meta = self.query.get_meta()
 
@@ -533,8 +1915,21 @@ class SQLInsertCompiler(
 
         inserted_row_keys = []
 
-        with BatchQuery() as b:
-            for row in values:
+        sample = self.connection.metrics.start(
+            self.query.model,
+            'insert'
+        )
+        sample.batch_size = len(values)
+
+        # Counter tables can only be written by counter updates, which
+        # can't share a batch with other statements.
+        batch_type = BatchType.Counter if column_family._has_counter else None
+
+        with sample, BatchQuery(batch_type=batch_type) as b:
+            for row, row_updates in itertools.izip(
+                values,
+                updates or itertools.repeat(())
+            ):
                 if 'pk__token' in row:
                     del row['pk__token']
 
@@ -561,10 +1956,26 @@ class SQLInsertCompiler(
                             'key for your database model.'
                         )
 
+                if column_family._has_counter:
+                    inserted_row_keys.append(self.increment(
+                        column_family,
+                        b,
+                        row
+                    ))
+                    continue
+
                 inserted = column_family.batch(b).create(
                     **row
                 )
 
+                if row_updates:
+                    self.update_collections(
+                        column_family,
+                        b,
+                        row,
+                        row_updates
+                    )
+
                 inserted_row_keys.append(inserted.pk)
 
         if return_id:
@@ -574,16 +1985,108 @@ class SQLInsertCompiler(
             else:
                 return inserted_row_keys
 
+    def update_collections(
+        self,
+        column_family,
+        batch,
+        row,
+        updates
+    ):
+        '''
+        Adds to batch the UPDATE applying the (field, CollectionUpdate)
+        updates to the row with the primary key of row.
+        '''
+        statement = UpdateStatement(column_family.column_family_name())
+        for name, column in column_family._primary_keys.items():
+            statement.add_where(
+                column,
+                EqualsOperator(),
+                row[name]
+            )
+
+        for field, update in updates:
+            statement._add_assignment_clause(self.get_collection_clause(
+                column_family,
+                field,
+                update
+            ))
+
+        batch.add_query(statement)
+
+    def increment(
+        self,
+        column_family,
+        batch,
+        row
+    ):
+        '''
+        Adds the counter increments of row to the row with its primary
+        key. Cassandra creates counter rows on their first increment.
+        '''
+        keys = OrderedDict(
+            (name, row.pop(name))
+            for name in column_family._primary_keys.keys()
+        )
+        increments = dict(
+            (column, increment) for column, increment in row.iteritems()
+            if increment
+        )
+        if increments:
+            column_family.objects.batch(batch).filter(
+                **keys
+            ).update(
+                **increments
+            )
+
+        return keys.values()[0]
+
 
 class SQLUpdateCompiler(
     NonrelUpdateCompiler,
     SQLCompiler
 ):
+    reads_from_replica = False
+    reads_denormalized = False
+
+    def execute_sql(self, result_type):
+        self.pre_sql_setup()
+
+        values = []
+        for field, _, value in self.query.values:
+            if 'CounterField' == field.get_internal_type():
+                value = get_counter_increment(field, value)
+
+            elif isinstance(value, CollectionUpdate):
+                pass
+
+            elif hasattr(value, 'resolve_expression'):
+                raise DatabaseError(
+                    'Cassandra can\'t update %s from an expression, only '
+                    'counter columns can be incremented.' % (field.name,)
+                )
+
+            else:
+                if hasattr(value, 'prepare_database_save'):
+                    value = value.prepare_database_save(field)
+
+                else:
+                    value = field.get_db_prep_save(
+                        value,
+                        connection=self.connection
+                    )
+
+                value = self.ops.value_for_db(value, field)
+
+            values.append((field, value))
+
+        return self.update(values)
+
     def update(
         self,
         values
     ):
         value_dict = {}
+        collection_updates = []
         fields = []
         for value in values:
             field = value[0]
@@ -591,25 +2094,114 @@ class SQLUpdateCompiler(
                 continue
 
             fields.append(field)
+            if isinstance(value[1], CollectionUpdate):
+                collection_updates.append(value)
+                continue
+
             value_dict[
                 field.db_column
                 if field.db_column
                 else field.column
             ] = value[1]
 
-        query = CassandraQuery(
-            self,
-            fields,
-            allows_inefficient=False
-        )
-        query.add_filters(self.query.where)
-        range_predicates = []
-        if query.root_predicate.children:
-            for predicate in query.root_predicate.children:
-                range_predicates.append(predicate)
-        query.get_row_range(range_predicates).update(**value_dict)
+        with self.connection.metrics.start(
+            self.query.model,
+            'update'
+        ):
+            query = CassandraQuery(
+                self,
+                fields,
+                allows_inefficient=False
+            )
+            query.add_filters(self.query.where)
+            range_predicates = []
+            if query.root_predicate.children:
+                for predicate in query.root_predicate.children:
+                    range_predicates.append(predicate)
+            for cql_query in query.get_row_ranges(range_predicates):
+                if value_dict:
+                    cql_query.update(**value_dict)
+
+                if collection_updates:
+                    statement = UpdateStatement(
+                        cql_query.column_family_name,
+                        where=cql_query._where
+                    )
+                    for field, update in collection_updates:
+                        statement._add_assignment_clause(
+                            self.get_collection_clause(
+                                query.column_family_class,
+                                field,
+                                update
+                            )
+                        )
+
+                    cql_query._execute(statement)
+
         return True
 
 
+def get_counter_increment(field, value):
+    '''
+    Returns n for an update of a counter field to F(field) + n, -n
+    for F(field) - n. Cassandra only increments counters, it can't set
+    them.
+    '''
+    if not hasattr(value, 'resolve_expression'):
+        raise DatabaseError(
+            'Counter %s can\'t be set to %r, only ColumnFamilyModel '
+            'instances keep the value counters were read with to save '
+            'the difference. Update it to F(\'%s\') + n instead.' % (
+                field.name,
+                value,
+                field.name
+            )
+        )
+
+    if (
+        isinstance(value, CombinedExpression) and
+        value.connector in (
+            CombinedExpression.ADD,
+            CombinedExpression.SUB
+        )
+    ):
+        lhs, rhs = value.lhs, value.rhs
+        if CombinedExpression.ADD == value.connector and isinstance(
+            lhs,
+            Value
+        ):
+            lhs, rhs = rhs, lhs
+
+        # Update values are resolved to columns when compiled to SQL.
+        if isinstance(lhs, F):
+            column = lhs.name
+
+        elif isinstance(lhs, Col):
+            column = lhs.target.name
+
+        else:
+            column = None
+
+        if (
+            column == field.name and
+            isinstance(rhs, Value) and
+            isinstance(rhs.value, (int, long))
+        ):
+            if CombinedExpression.SUB == value.connector:
+                return -rhs.value
+
+            return rhs.value
+
+    raise DatabaseError(
+        'Counter columns can only be incremented or decremented, update '
+        '%s to F(\'%s\') + n or F(\'%s\') - n.' % (
+            field.name,
+            field.name,
+            field.name
+        )
+    )
+
+
 class SQLDeleteCompiler(NonrelDeleteCompiler, SQLCompiler):
-    pass
+    reads_from_replica = False
+    reads_denormalized = False
@@ -0,0 +1,149 @@
+from functools import partial
+
+from django.db.models.fields import Field
+
+
+COLLECTION_FIELD_KINDS = (
+    'ListField',
+    'SetField',
+    'DictField'
+)
+
+COLLECTION_FIELD_TYPES = {
+    'ListField': list,
+    'SetField': set,
+    'DictField': dict
+}
+
+
+class ColumnConverter(object):
+    '''
+    Precomputed conversion information for a single model field.
+
+    to_db and from_db are None when the conversion is the identity so
+    callers can skip them entirely.
+    '''
+    def __init__(
+        self,
+        field,
+        prep_save,
+        to_db,
+        from_db
+    ):
+        self.field = field
+        self.attname = field.attname
+        self.column = field.column
+        self.null = field.null
+        self.primary_key = field.primary_key
+        self.counter = 'CounterField' == field.get_internal_type()
+        self.collection = field.get_internal_type() in COLLECTION_FIELD_KINDS
+        self.has_pre_save = (
+            field.pre_save.__func__ is not Field.pre_save.__func__
+        )
+        self.prep_save = prep_save
+        self.to_db = to_db
+        self.from_db = from_db
+
+
+class ModelConverters(object):
+    '''
+    Per model table of column converters, compiled once and reused
+    for every row that is written or read.
+    '''
+    def __init__(
+        self,
+        ops,
+        model
+    ):
+        self.model = model
+        self.columns = []
+        self.by_column = {}
+
+        for field in model._meta.fields:
+            if 'Token' == field.get_internal_type():
+                continue
+
+            converter = ColumnConverter(
+                field,
+                partial(
+                    field.get_db_prep_save,
+                    connection=ops.connection
+                ),
+                compile_to_db(ops, field),
+                compile_from_db(ops, field)
+            )
+            self.columns.append(converter)
+            self.by_column[converter.column] = converter
+
+    def row_decoders(self, fields):
+        '''
+        Returns (column, field, from_db) tuples for the selected fields
+        in the order djangotoolbox expects the result values.
+        '''
+        decoders = []
+        for field in fields:
+            converter = self.by_column.get(field.column)
+            decoders.append((
+                field.column,
+                field,
+                converter.from_db if converter else None
+            ))
+
+        return decoders
+
+
+def compile_to_db(ops, field):
+    '''
+    Returns a function converting a value already prepared by
+    get_db_prep_save into what the driver expects, or None if no
+    conversion is needed.
+    '''
+    field, field_kind, db_type = ops._convert_as(field)
+
+    if 'DictField' == field_kind:
+        return None
+
+    if (
+        field_kind not in COLLECTION_FIELD_KINDS and
+        'EmbeddedModelField' != field_kind
+    ):
+        return None
+
+    return partial(
+        ops._value_for_db,
+        field=field,
+        field_kind=field_kind,
+        db_type=db_type,
+        lookup=None
+    )
+
+
+def compile_from_db(ops, field):
+    '''
+    Returns a function converting a value returned by the driver into
+    the value the field holds, or None if no conversion is needed.
+    '''
+    field, field_kind, db_type = ops._convert_as(field)
+
+    if field_kind in COLLECTION_FIELD_KINDS:
+        _, item_kind, _ = ops._convert_as(field.item_field)
+        serialized = (
+            db_type in ('bytes', 'string') or
+            ('DictField' == field_kind and 'list' == db_type)
+        )
+        if (
+            not serialized and
+            item_kind not in COLLECTION_FIELD_KINDS and
+            'EmbeddedModelField' != item_kind
+        ):
+            return COLLECTION_FIELD_TYPES[field_kind]
+
+    elif 'EmbeddedModelField' != field_kind:
+        return None
+
+    return partial(
+        ops._value_from_db,
+        field=field,
+        field_kind=field_kind,
+        db_type=db_type
+    )
@@ -16,7 +16,8 @@ from cassandra.cqltypes import (
     ListType,
     SetType,
     MapType,
-    BytesType
+    BytesType,
+    CounterColumnType
 )
 
 
@@ -37,7 +38,8 @@ class DatabaseCreation(NonrelDatabaseCreation):
         ListType.typename: ListType,
         SetType.typename: SetType,
         MapType.typename: MapType,
-        BytesType.typename: BytesType
+        BytesType.typename: BytesType,
+        CounterColumnType.typename: CounterColumnType
     }
 
     data_types = {
@@ -55,6 +57,7 @@ class DatabaseCreation(NonrelDatabaseCreation):
         # (or its client / driver) being able to directly store or
         # process Python objects.
         'BigIntegerField': LongType.typename,
+        'CounterField': CounterColumnType.typename,
         'BooleanField': BooleanType.typename,
         'CharField': VarcharType.typename,
         'CommaSeparatedIntegerField': VarcharType.typename,
@@ -149,12 +152,8 @@ class DatabaseCreation(NonrelDatabaseCreation):
     ):
         test_database_name = self._get_test_db_name()
 
-        qn = self.connection.ops.quote_name
-
         nodb_connection = self._nodb_connection
 
-        nodb_connection.create_keyspace(
-            qn(test_database_name)
-        )
+        nodb_connection.create_keyspace(test_database_name)
 
         return test_database_name
@@ -1,5 +1,10 @@
+from collections import OrderedDict
+from copy import copy
+
 try:
     import cassandra as Database
+    import cassandra.query
+    from cassandra.concurrent import execute_concurrent
 
 except ImportError as e:
     from django.core.exceptions import ImproperlyConfigured
@@ -17,15 +22,34 @@ class CassandraCursor(object):
     subclass, so that we aren't stuck to the particular underlying
     representation returned by Connection.cursor().
     """
-    def __init__(self, session):
+    def __init__(
+        self,
+        session,
+        statement_cache=None,
+        batch_size=100,
+        concurrency=50,
+        metrics=None
+    ):
         self._reset_attributes()
         self.session = session
+        self.statement_cache = (
+            statement_cache
+            if None is not statement_cache
+            else {}
+        )
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.metrics = metrics
 
     def _reset_attributes(self):
         self.session = None
-        self.rows = []
-        self.index = -1
+        self.rows = None
+        self.page = []
+        self.index = 0
+        self.arraysize = 1
+        self.fetch_size = None
         self._last_statement = None
+        self._last_args = None
         self._with_rows = False
         self._lastrowid = None
 
@@ -33,6 +57,10 @@ class CassandraCursor(object):
     def lastrowid(self):
         return self._lastrowid
 
+    @property
+    def rowcount(self):
+        return -1
+
     @property
     def with_rows(self):
         return self._with_rows
@@ -49,63 +77,234 @@ class CassandraCursor(object):
 
     @property
     def description(self):
-        raise NotImplementedError(
-            'description propery has not been implemented'
+        '''
+        Column types are only known for prepared statements, from the
+        result metadata Cassandra returns when preparing them.
+        '''
+        column_names = getattr(self.rows, 'column_names', None)
+        if not column_names:
+            return None
+
+        prepared = getattr(
+            self._last_statement,
+            'prepared_statement',
+            self._last_statement
+        )
+        column_types = dict(
+            (column[2], column[3].cql_parameterized_type())
+            for column in getattr(prepared, 'result_metadata', None) or ()
         )
 
-    def fetchone(self):
+        return tuple(
+            (name, column_types.get(name), None, None, None, None, None)
+            for name in column_names
+        )
+
+    def _set_rows(self, rows):
+        self.rows = rows
+        self.index = 0
+
+        if None is rows:
+            self.page = []
+
+        elif hasattr(rows, 'current_rows'):
+            self.page = rows.current_rows
+
+        else:
+            self.page = list(rows)
+
+        self._with_rows = 0 != len(self.page)
+
+    def _fetch_next_page(self, fetch_size=None):
         '''
-        Note that this will have interesting behavior since there is
-        no efficent way to check if we are at the last result, perhaps
-        if the current result = first result?
+        Replaces the current page with the next one from the server.
+        Only the current page is ever held by the cursor. A page of a
+        different fetch_size is requested by executing the statement
+        again from the paging state of the current one.
         '''
+        if not getattr(self.rows, 'has_more_pages', False):
+            return False
+
+        statement = self._last_statement
+        if fetch_size and fetch_size != getattr(
+            statement,
+            'fetch_size',
+            None
+        ):
+            if isinstance(statement, basestring):
+                statement = Database.query.SimpleStatement(statement)
+
+            else:
+                statement = copy(statement)
+
+            statement.fetch_size = fetch_size
+            self._last_statement = statement
+            self.rows = self.session.execute(
+                statement,
+                self._last_args,
+                paging_state=self.rows.paging_state
+            )
+
+        else:
+            self.rows.fetch_next_page()
+
+        self.page = self.rows.current_rows
+        self.index = 0
+        return True
+
+    def fetchone(self):
+        while self.index >= len(self.page):
+            if not self._fetch_next_page():
+                return None
+
+        row = self.page[self.index]
         self.index += 1
-        return self.rows[self.index - 1]
+        return row
 
     def fetchmany(
         self,
-        size=1
+        size=None
     ):
-        many = self.rows[self.index:self.index + size]
-        self.index += size
+        '''
+        size is also used as the fetch size of any page that has to be
+        requested to satisfy this call.
+        '''
+        if None is size:
+            size = self.arraysize
+
+        many = []
+        while len(many) < size:
+            if self.index >= len(self.page):
+                if not self._fetch_next_page(size):
+                    break
+
+                continue
+
+            rows = self.page[self.index:self.index + size - len(many)]
+            self.index += len(rows)
+            many.extend(rows)
 
         return many
 
     def fetchall(self):
-        remaining = self.rows[self.index:]
-        self.rows = []
-        self.index = -1
+        remaining = list(self.page[self.index:])
+        while self._fetch_next_page():
+            remaining.extend(self.page)
 
+        self._set_rows(None)
         return remaining
 
     def execute(self, query, args=None):
-        self.rows = self.session.execute(query, args)
-        self.index = 0
-        if hasattr(self.rows, 'current_rows'):
-            self._with_rows = (
-                None is not self.rows and len(
-                    self.rows.current_rows
-                )
+        if (
+            None is not self.fetch_size and
+            isinstance(query, basestring)
+        ):
+            query = Database.query.SimpleStatement(
+                query,
+                fetch_size=self.fetch_size
             )
 
-        else:
-            self._with_rows = (
-                None is not self.rows and len(self.rows)
-            )
+        self._last_statement = query
+        self._last_args = args
+        self._set_rows(self.session.execute(query, args))
 
         return self.rows
 
-    def executemany(self, query, args_list):
-        prepared = self.session.prepare(query)
-        batch = Database.BatchStatement()
+    def prepare(self, query):
+        prepared = self.statement_cache.get(query)
+        if None is not self.metrics:
+            self.metrics.record_statement_cache(None is not prepared)
+
+        if None is prepared:
+            prepared = self.session.prepare(query)
+            self.statement_cache[query] = prepared
+
+        return prepared
+
+    def _partition_key(self, prepared, args):
+        indexes = prepared.routing_key_indexes
+        if not indexes:
+            return None
+
+        if isinstance(args, dict):
+            key = tuple(
+                args.get(prepared.column_metadata[index].name)
+                for index in indexes
+            )
+
+        else:
+            key = tuple(args[index] for index in indexes)
+
+        try:
+            hash(key)
+
+        except TypeError:
+            return None
+
+        return key
+
+    def _get_statements(self, prepared, args_list):
+        '''
+        Groups args by partition key and yields bound statements or
+        unlogged batches of at most batch_size statements. Rows are
+        only ever batched together with rows of the same partition,
+        if the partition key of the statement can't be determined
+        every row gets its own statement.
+        '''
+        partitions = OrderedDict()
         for args in args_list:
-            batch.add(prepared, args)
+            key = self._partition_key(prepared, args)
+            if None is key:
+                yield prepared.bind(args)
+                continue
 
-        self.rows = self.session.execute(batch)
-        self.index = 0
-        self._with_rows = 0 != len(self.rows)
+            partitions.setdefault(key, []).append(args)
 
-        return self.rows
+        for partition_args in partitions.itervalues():
+            for i in xrange(0, len(partition_args), self.batch_size):
+                chunk = partition_args[i:i + self.batch_size]
+                if 1 == len(chunk):
+                    yield prepared.bind(chunk[0])
+                    continue
+
+                batch = Database.query.BatchStatement(
+                    batch_type=Database.query.BatchType.UNLOGGED
+                )
+                for args in chunk:
+                    batch.add(prepared, args)
+
+                yield batch
+
+    def executemany(self, query, args_list):
+        if None is not self.metrics:
+            args_list = list(args_list)
+            sample = self.metrics.start(None, 'executemany')
+            sample.batch_size = len(args_list)
+
+        else:
+            sample = None
+
+        error = True
+        try:
+            prepared = self.prepare(query)
+
+            execute_concurrent(
+                self.session,
+                (
+                    (statement, None) for statement in
+                    self._get_statements(prepared, args_list)
+                ),
+                concurrency=self.concurrency
+            )
+            error = False
+
+        finally:
+            if None is not sample:
+                sample.finish(error)
+
+        self._set_rows(None)
+
+        return []
 
     def rollback(self):
         pass
@@ -123,7 +322,10 @@ class CassandraCursor(object):
             return getattr(self.session, attr)
 
     def __iter__(self):
-        return self.rows
+        row = self.fetchone()
+        while None is not row:
+            yield row
+            row = self.fetchone()
 
     def __enter__(self):
         return self
@@ -15,7 +15,11 @@ class InefficientQueryError(NotSupportedError):
         'by setting the ALLOW_INEFFICIENT_QUERIES=True in '
         'your settings.py or you can set this per model in '
         'the Cassandra meta class for you model '
-        '"allow_inefficient_queries=True".'
+        '"allow_inefficient_queries=True".\n\nQueries that have to '
+        'scan the table anyway, such as range filters on partition '
+        'key columns, can be run as a parallel token range scan with '
+        'the results verified client side by calling scan() on the '
+        'QuerySet.'
     )
 
     def __init__(self, query):
@@ -1,68 +1,140 @@
-import itertools
+import time
 
 from django.db.backends.base.introspection import (
-    BaseDatabaseIntrospection,
+    FieldInfo,
     TableInfo
 )
 from djangotoolbox.db.base import NonrelDatabaseIntrospection
 
 
 class DatabaseIntrospection(NonrelDatabaseIntrospection):
+    def __init__(
+        self,
+        *args,
+        **kwargs
+    ):
+        super(DatabaseIntrospection, self).__init__(
+            *args,
+            **kwargs
+        )
+
+        self._table_list = None
+        self._table_list_expires = 0
+
+    def invalidate_cache(self):
+        self._table_list = None
+        self._table_list_expires = 0
+
     def get_table_list(
         self,
         cursor=None
     ):
-        if None is cursor:
-            cursor = self.connection.cursor()
+        '''
+        Table information is read from the driver's cluster metadata
+        which the driver keeps up to date by refreshing the affected
+        keyspace/table whenever a schema change event is pushed to the
+        control connection. No queries are issued here.
+
+        Setting INTROSPECTION_CACHE_TTL (seconds) additionally caches
+        the resulting table list on this connection.
+        '''
+        cache_ttl = self.connection.settings_dict.get(
+            'INTROSPECTION_CACHE_TTL',
+            0
+        )
+
+        if (
+            cache_ttl and
+            None is not self._table_list and
+            time.time() < self._table_list_expires
+        ):
+            return list(self._table_list)
 
-        current_keyspace = cursor.keyspace
+        if None is self.connection.cluster:
+            self.connection.ensure_connection()
 
-        keyspaces = [
-            key for key in self.connection.settings_dict.get(
-                'KEYSPACES'
-            ).keys()
-        ]
+        keyspaces_metadata = self.connection.cluster.metadata.keyspaces
+
+        keyspaces = self.connection.settings_dict.get(
+            'KEYSPACES',
+            {}
+        ).keys()
 
         table_list = []
+        for keyspace in keyspaces:
+            keyspace_metadata = keyspaces_metadata.get(keyspace)
+            if None is keyspace_metadata:
+                continue
+
+            for table_name in keyspace_metadata.tables.keys():
+                table_list.append(TableInfo(table_name, 't'))
+
+        if cache_ttl:
+            self._table_list = table_list
+            self._table_list_expires = time.time() + cache_ttl
+
+        return list(table_list)
+
+    def table_names(
+        self,
+        cursor=None,
+        include_views=False
+    ):
         '''
-        These are where the schema information for the cluster is
-        stored for Cassandra version 2.x
+        Same as BaseDatabaseIntrospection.table_names without opening
+        a cursor since get_table_list doesn't need one.
         '''
-        schema_keyspace = 'system'
-        schema_table_name = 'schema_columnfamilies'
-        schema_table_name_field = 'columnfamily_name'
-
-        if 'system_schema' in self.connection.cluster.metadata.keyspaces:
-            '''
-            If there is a 'system_schema' keyspace then we are on
-            Cassandra 3.x and need to look for the schema info here.
-            '''
-            schema_keyspace = 'system_schema'
-            schema_table_name = 'tables'
-            schema_table_name_field = 'table_name'
-
-        try:
-            cursor.set_keyspace(schema_keyspace)
-            for keyspace in keyspaces:
-                table_list = itertools.chain(
-                    table_list, cursor.execute(
-                        ''.join([
-                            'SELECT ',
-                            schema_table_name_field,
-                            ' from ',
-                            schema_table_name,
-                            ' where keyspace_name=\'',
-                            keyspace,  # TODO: SANITIZE ME JUST IN CASE!!!
-                            '\''
-                        ])
-                    )
-                )
+        return sorted(
+            table_info.name for table_info in self.get_table_list(cursor)
+            if include_views or 't' == table_info.type
+        )
 
-        finally:
-            if None is not current_keyspace:
-                cursor.set_keyspace(current_keyspace)
+    def get_table_description(
+        self,
+        cursor,
+        table_name
+    ):
+        '''
+        Column information of table_name is read from the cluster
+        metadata of the first configured keyspace that has the table,
+        the type code is the CQL type of the column. Key columns are
+        the only ones that can't be null.
+        '''
+        if None is self.connection.cluster:
+            self.connection.ensure_connection()
+
+        keyspaces_metadata = self.connection.cluster.metadata.keyspaces
+
+        keyspaces = self.connection.settings_dict.get(
+            'KEYSPACES',
+            {}
+        ).keys()
+
+        for keyspace in keyspaces:
+            keyspace_metadata = keyspaces_metadata.get(keyspace)
+            if None is keyspace_metadata:
+                continue
+
+            table_metadata = keyspace_metadata.tables.get(table_name)
+            if None is table_metadata:
+                continue
+
+            key_columns = set(
+                column.name for column in (
+                    table_metadata.primary_key
+                )
+            )
 
-        return [TableInfo(row[schema_table_name_field], 't') for row in table_list]
+            return [
+                FieldInfo(
+                    column.name,
+                    column.cql_type,
+                    None,
+                    None,
+                    None,
+                    None,
+                    column.name not in key_columns
+                ) for column in table_metadata.columns.values()
+            ]
 
-    def table_names(self, cursor=None):
-        return BaseDatabaseIntrospection.table_names(self, cursor)
+        return []
@@ -0,0 +1,380 @@
+import time
+
+from bisect import bisect_left
+from threading import Lock
+
+from django.utils.module_loading import import_string
+
+
+OPERATIONS = (
+    'get',
+    'filter',
+    'count',
+    'insert',
+    'update',
+    'delete',
+    'denormalize',
+    'executemany'
+)
+
+# Upper bounds of the latency buckets in milliseconds.
+LATENCY_BUCKETS = (
+    1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000
+)
+
+# Upper bounds of the batch size buckets in rows/statements.
+BATCH_SIZE_BUCKETS = (
+    1, 2, 5, 10, 25, 50, 100, 250, 500, 1000
+)
+
+
+class Histogram(object):
+    '''
+    Fixed bucket histogram. Percentiles are estimated as the upper
+    bound of the bucket they fall in (capped at the maximum seen).
+    '''
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if None is self.min or value < self.min:
+            self.min = value
+
+        if None is self.max or value > self.max:
+            self.max = value
+
+    def percentile(self, percent):
+        if not self.count:
+            return None
+
+        rank = self.count * percent / 100.0
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                if index < len(self.buckets):
+                    return min(self.buckets[index], self.max)
+
+                break
+
+        return self.max
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / float(self.count) if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'buckets': [
+                [bound, count] for bound, count in zip(
+                    list(self.buckets) + ['inf'],
+                    self.counts
+                )
+            ]
+        }
+
+
+class OperationMetrics(object):
+    '''
+    Everything recorded for one (model, operation) pair.
+    '''
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.rows_fetched = 0
+        self.rows_returned = 0
+        self.pages = 0
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+
+    def as_dict(self):
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'latency_ms': self.latency.as_dict(),
+            'rows_fetched': self.rows_fetched,
+            'rows_returned': self.rows_returned,
+            'rows_filtered': max(self.rows_fetched - self.rows_returned, 0),
+            'pages': self.pages,
+            'batch_sizes': self.batch_sizes.as_dict()
+        }
+
+
+class Sample(object):
+    '''
+    Measures a single operation. Callers bump the counters while the
+    operation runs and call finish() exactly once when it's done.
+
+    The latency is the time until finish() unless driver calls were
+    timed with timed()/timed_iter(), then it's the time spent in them,
+    so rows streamed to a consumer don't count the consumer's time.
+    '''
+    __slots__ = (
+        'registry',
+        'model',
+        'operation',
+        'started',
+        'driver_time',
+        'rows_fetched',
+        'rows_returned',
+        'pages',
+        'batch_size',
+        'finished'
+    )
+
+    def __init__(
+        self,
+        registry,
+        model,
+        operation
+    ):
+        self.registry = registry
+        self.model = model
+        self.operation = operation
+        self.started = time.time()
+        self.driver_time = None
+        self.rows_fetched = 0
+        self.rows_returned = 0
+        self.pages = 0
+        self.batch_size = None
+        self.finished = False
+
+    def timed(
+        self,
+        function,
+        *args,
+        **kwargs
+    ):
+        '''
+        Calls function, adding the time it takes to the latency.
+        '''
+        if not self.registry.enabled:
+            return function(*args, **kwargs)
+
+        started = time.time()
+        try:
+            return function(*args, **kwargs)
+
+        finally:
+            self.driver_time = (
+                (self.driver_time or 0) + time.time() - started
+            )
+
+    def timed_iter(self, iterable):
+        '''
+        Iterates iterable, adding the time each step takes to the
+        latency.
+        '''
+        if not self.registry.enabled:
+            return iterable
+
+        return self._timed_iter(iter(iterable))
+
+    def _timed_iter(self, iterator):
+        while True:
+            try:
+                item = self.timed(next, iterator)
+
+            except StopIteration:
+                return
+
+            yield item
+
+    def finish(self, error=False):
+        if self.finished:
+            return
+
+        self.finished = True
+        if not self.registry.enabled:
+            return
+
+        if None is self.driver_time:
+            latency = time.time() - self.started
+
+        else:
+            latency = self.driver_time
+
+        self.registry.record(
+            self.model,
+            self.operation,
+            latency=latency * 1000.0,
+            rows_fetched=self.rows_fetched,
+            rows_returned=self.rows_returned,
+            pages=self.pages,
+            batch_size=self.batch_size,
+            error=error
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        # A generator closed before it's exhausted isn't an error.
+        self.finish(
+            None is not type and
+            not issubclass(type, GeneratorExit)
+        )
+
+
+def get_model_label(model):
+    if None is model:
+        return '-'
+
+    if isinstance(model, basestring):
+        return model
+
+    return '.'.join([
+        model._meta.app_label,
+        model._meta.object_name
+    ])
+
+
+class MetricsRegistry(object):
+    '''
+    Per connection metrics of the operations the backend performs.
+
+    Disabled unless the COLLECT_METRICS database setting is True, a
+    disabled registry records nothing and never takes its lock. The
+    driver's own metrics (METRICS_ENABLED) are included in snapshots
+    when they are available. Snapshots can be pushed to the callables
+    listed in METRICS_EXPORTERS (or added with add_exporter), each is
+    called with the snapshot and the connection.
+    '''
+    def __init__(self, connection):
+        self.connection = connection
+        self.enabled = connection.settings_dict.get(
+            'COLLECT_METRICS',
+            False
+        )
+        self.exporters = [
+            import_string(exporter)
+            if isinstance(exporter, basestring)
+            else exporter
+            for exporter in connection.settings_dict.get(
+                'METRICS_EXPORTERS',
+                ()
+            )
+        ]
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.operations = {}
+            self.statement_cache_hits = 0
+            self.statement_cache_misses = 0
+            self.started = time.time()
+
+    def start(
+        self,
+        model,
+        operation
+    ):
+        return Sample(
+            self,
+            model,
+            operation
+        )
+
+    def record(
+        self,
+        model,
+        operation,
+        latency=None,
+        rows_fetched=0,
+        rows_returned=0,
+        pages=0,
+        batch_size=None,
+        error=False
+    ):
+        if not self.enabled:
+            return
+
+        key = (get_model_label(model), operation)
+        with self.lock:
+            metrics = self.operations.get(key)
+            if None is metrics:
+                metrics = self.operations[key] = OperationMetrics()
+
+            metrics.calls += 1
+            if error:
+                metrics.errors += 1
+
+            if None is not latency:
+                metrics.latency.observe(latency)
+
+            metrics.rows_fetched += rows_fetched
+            metrics.rows_returned += rows_returned
+            metrics.pages += pages
+            if None is not batch_size:
+                metrics.batch_sizes.observe(batch_size)
+
+    def record_statement_cache(self, hit):
+        if not self.enabled:
+            return
+
+        with self.lock:
+            if hit:
+                self.statement_cache_hits += 1
+
+            else:
+                self.statement_cache_misses += 1
+
+    def get_driver_stats(self):
+        cluster = self.connection.cluster
+        driver_metrics = getattr(cluster, 'metrics', None)
+        if None is driver_metrics:
+            return None
+
+        return driver_metrics.get_stats()
+
+    def snapshot(self):
+        with self.lock:
+            operations = {}
+            for (model, operation), metrics in self.operations.iteritems():
+                operations.setdefault(model, {})[operation] = (
+                    metrics.as_dict()
+                )
+
+            lookups = self.statement_cache_hits + self.statement_cache_misses
+            statement_cache = {
+                'hits': self.statement_cache_hits,
+                'misses': self.statement_cache_misses,
+                'hit_rate': (
+                    self.statement_cache_hits / float(lookups)
+                    if lookups
+                    else None
+                )
+            }
+            started = self.started
+
+        return {
+            'alias': self.connection.alias,
+            'since': started,
+            'time': time.time(),
+            'operations': operations,
+            'statement_cache': statement_cache,
+            'driver': self.get_driver_stats()
+        }
+
+    def add_exporter(self, exporter):
+        self.exporters.append(exporter)
+
+    def export(self):
+        snapshot = self.snapshot()
+        for exporter in self.exporters:
+            exporter(snapshot, self.connection)
+
+        return snapshot
@@ -18,12 +18,14 @@ import itertools
 import warnings
 
 from cassandra.cqlengine.functions import Token
+from cassandra.cqlengine.operators import BaseWhereOperator
 
 from cassandra import ConsistencyLevel
 from cassandra.query import (
     SimpleStatement,
     ordered_dict_factory
 )
+from cassandra.concurrent import execute_concurrent
 
 from .exceptions import InefficientQueryError
 
@@ -61,6 +63,83 @@ COMPOUND_OP_AND = 1
 COMPOUND_OP_OR = 2
 
 
+class LikeOperator(BaseWhereOperator):
+    '''
+    Registers the column__like filter with cqlengine.
+    '''
+    symbol = 'LIKE'
+    cql_symbol = 'LIKE'
+
+
+LIKE_PATTERNS = {
+    'startswith': u'%s%%',
+    'istartswith': u'%s%%',
+    'endswith': u'%%%s',
+    'iendswith': u'%%%s',
+    'contains': u'%%%s%%',
+    'icontains': u'%%%s%%',
+    'iexact': u'%s'
+}
+
+# Lookups each SASI index can answer by (mode, case_sensitive).
+LIKE_LOOKUPS = {
+    ('PREFIX', True): ('startswith',),
+    ('PREFIX', False): ('istartswith', 'iexact'),
+    ('CONTAINS', True): ('startswith', 'endswith', 'contains'),
+    ('CONTAINS', False): (
+        'istartswith',
+        'iendswith',
+        'icontains',
+        'iexact'
+    )
+}
+
+
+def get_query_parameters(cql_query):
+    '''
+    Returns the values bound to the named markers of the statement
+    built by cql_query._select_query().
+    '''
+    parameters = {}
+    for where in cql_query._where:
+        if isinstance(where.value, Token):
+            value = where.value.value
+            if 1 == len(value):
+                value = value[0]
+
+        else:
+            value = where.value
+
+        parameters[
+            str(where.query_value.context_id)
+        ] = value
+
+    return parameters
+
+
+def get_positional_query(cql_query):
+    '''
+    Returns the statement built by cql_query._select_query() with ?
+    bind markers, as it's prepared, and the values bound to them.
+    '''
+    # Building the statement numbers the markers the parameters are
+    # keyed by.
+    select_query = unicode(cql_query._select_query())
+    parameters = get_query_parameters(cql_query)
+    values = []
+
+    def bind_marker(match):
+        values.append(parameters[match.group(1)])
+        return '?'
+
+    cql = re.sub(
+        r'%\((\w+)\)s',
+        bind_marker,
+        select_query
+    )
+    return cql, values
+
+
 class RangePredicate(object):
     def __init__(
         self,
@@ -229,8 +308,49 @@ class RangePredicate(object):
         value = row.get(self.column, None)
         return self._matches_value(value)
 
+    def is_empty(self):
+        if None is self.start or None is self.end:
+            return False
+
+        if self.start == self.end:
+            return not (self.start_inclusive and self.end_inclusive)
+
+        return self.start > self.end
+
+    def complement(self):
+        '''
+        Returns the ranges of non null values outside of this one: a
+        RangePredicate, or a disjoint OR of the ranges below and above.
+        '''
+        if self.is_empty():
+            return CompoundPredicate(COMPOUND_OP_AND)
+
+        ranges = []
+        if None is not self.start:
+            ranges.append(RangePredicate(
+                self.column,
+                end=self.start,
+                end_inclusive=not self.start_inclusive
+            ))
+
+        if None is not self.end:
+            ranges.append(RangePredicate(
+                self.column,
+                start=self.end,
+                start_inclusive=not self.end_inclusive
+            ))
+
+        if 1 == len(ranges):
+            return ranges[0]
+
+        return CompoundPredicate(
+            COMPOUND_OP_OR,
+            children=ranges,
+            disjoint=True
+        )
+
     def get_matching_rows(self, query):
-        rows = query.get_row_range(self)
+        rows = query.get_row_ranges([self])
         return rows
 
 
@@ -291,7 +411,10 @@ class OperationPredicate(object):
         if self.op == 'in':
             return row_value in self.value
 
-        if self.op == 'istartswith':
+        if self.op == 'startswith':
+            return row_value.startswith(self.value)
+
+        elif self.op == 'istartswith':
             return row_value.lower().startswith(self.value.lower())
 
         elif self.op == 'endswith':
@@ -322,14 +445,98 @@ class OperationPredicate(object):
         )
 
 
+class InPredicate(object):
+    '''
+    An IN lookup on a primary key or indexed column. Sent to Cassandra
+    as a CQL IN where it allows it, as one exact lookup per value
+    otherwise.
+    '''
+    def __init__(self, column, values):
+        self.column = column
+        self.values = []
+        for value in values:
+            if value not in self.values:
+                self.values.append(value)
+
+    def __repr__(self):
+        return '(IN: ' + self.column + ':' + unicode(self.values) + ')'
+
+    def can_evaluate_efficiently(
+        self,
+        partition_columns,
+        clustering_columns,
+        indexed_columns
+    ):
+        return self.column in itertools.chain(
+            partition_columns,
+            clustering_columns,
+            indexed_columns
+        )
+
+    def row_matches(self, row):
+        return row.get(self.column, None) in self.values
+
+    def incorporate_range_op(self, column, op, value, parent_compound_op):
+        if column != self.column or parent_compound_op != COMPOUND_OP_AND:
+            return False
+
+        # Other restrictions on the column narrow down the values.
+        restriction = RangePredicate(column)
+        if not restriction.incorporate_range_op(
+            column,
+            op,
+            value,
+            COMPOUND_OP_AND
+        ):
+            return False
+
+        self.values = [
+            v for v in self.values if restriction._matches_value(v)
+        ]
+        return True
+
+
+class LikePredicate(object):
+    '''
+    A lookup on a column with a SASI index, sent to Cassandra as a LIKE
+    restriction.
+    '''
+    def __init__(self, column, op, value):
+        self.column = column
+        self.op = op
+        self.value = value
+        self.pattern = LIKE_PATTERNS[op] % (value,)
+        self.operation = OperationPredicate(column, op, value)
+
+    def __repr__(self):
+        return '(LIKE: ' + self.column + ':' + self.pattern + ')'
+
+    def can_evaluate_efficiently(
+        self,
+        partition_columns,
+        clustering_columns,
+        indexed_columns
+    ):
+        return True
+
+    def row_matches(self, row):
+        return self.operation.row_matches(row)
+
+    def incorporate_range_op(self, column, op, value, parent_compound_op):
+        return False
+
+
 class CompoundPredicate(object):
-    def __init__(self, op, negated=False, children=None):
+    def __init__(self, op, negated=False, children=None, disjoint=False):
         self.op = op
         self.negated = negated
         self.children = children
         if self.children is None:
             self.children = []
 
+        # Set on ORs whose children never match the same row.
+        self.disjoint = disjoint
+
     def __repr__(self):
         s = '('
         if self.negated:
@@ -416,7 +623,67 @@ class CompoundPredicate(object):
             if column.db_column
             else column.column
         )
-        if op in ('lt', 'lte', 'gt', 'gte', 'eq', 'exact', 'startswith'):
+
+        # Composite primary keys are restricted column by column, so
+        # that Cassandra can look them up.
+        if op in ('eq', 'exact') and isinstance(value, PrimaryKeyValue):
+            self.add_child(self.get_key_predicate(value))
+            return
+
+        if (
+            op == 'in' and
+            value and
+            all(isinstance(v, PrimaryKeyValue) for v in value)
+        ):
+            keys = []
+            seen = set()
+            for key in value:
+                if key not in seen:
+                    seen.add(key)
+                    keys.append(key)
+
+            self.add_child(CompoundPredicate(
+                COMPOUND_OP_OR,
+                children=[self.get_key_predicate(key) for key in keys],
+                disjoint=True
+            ))
+            return
+
+        self.add_column_filter(column_name, op, value)
+
+    @staticmethod
+    def get_key_predicate(key):
+        '''
+        Returns the AND of exact lookups on the columns of the
+        PrimaryKeyValue key.
+        '''
+        predicate = CompoundPredicate(COMPOUND_OP_AND)
+        for key_column, key_value in key.iteritems():
+            predicate.add_column_filter(key_column, 'exact', key_value)
+
+        return predicate
+
+    def add_column_filter(self, column_name, op, value):
+        if (
+            op == 'in' and
+            self.op == COMPOUND_OP_AND and
+            not any(isinstance(v, PrimaryKeyValue) for v in value)
+        ):
+            child = InPredicate(column_name, value)
+            for predicate in list(self.children):
+                if (
+                    isinstance(predicate, (RangePredicate, InPredicate)) and
+                    column_name == predicate.column
+                ):
+                    child.values = [
+                        v for v in child.values
+                        if predicate.row_matches({column_name: v})
+                    ]
+                    self.children.remove(predicate)
+
+            self.children.append(child)
+
+        elif op in ('lt', 'lte', 'gt', 'gte', 'eq', 'exact', 'startswith'):
             if not len(self.children):
                 child = RangePredicate(column_name)
                 incorporated = child.incorporate_range_op(
@@ -429,8 +696,13 @@ class CompoundPredicate(object):
                 self.children.append(child)
 
             else:
+                # Under an OR the children are unioned, merging ranges
+                # would only be right when they overlap.
                 incorporated = None
                 for child in self.children:
+                    if self.op != COMPOUND_OP_AND:
+                        break
+
                     incorporated = child.incorporate_range_op(
                         column_name,
                         op,
@@ -457,15 +729,13 @@ class CompoundPredicate(object):
     def add_child(self, child_query_node):
         self.children.append(child_query_node)
 
-    def get_matching_rows(self, query):
-        # In the first pass we handle the query nodes that can be processed
-        # efficiently. Hopefully, in most cases, this will result in a
-        # subset of the rows that is much smaller than the overall number
-        # of rows so we only have to run the inefficient query predicates
-        # over this smaller number of rows.
+    def split_children(self, query):
+        '''
+        Returns the child predicates that can be evaluated by Cassandra
+        and the ones that have to be evaluated client side.
+        '''
         range_predicates = []
         inefficient_predicates = []
-        result = None
         for predicate in self.children:
             if predicate.can_evaluate_efficiently(
                 query.partition_columns,
@@ -477,69 +747,161 @@ class CompoundPredicate(object):
             else:
                 inefficient_predicates.append(predicate)
 
-        cql_query = query.get_row_range(range_predicates)
+        return range_predicates, inefficient_predicates
+
+    def get_matching_rows(self, query):
+        # In the first pass we handle the query nodes that can be processed
+        # efficiently. Hopefully, in most cases, this will result in a
+        # subset of the rows that is much smaller than the overall number
+        # of rows so we only have to run the inefficient query predicates
+        # over this smaller number of rows.
+        range_predicates, inefficient_predicates = self.split_children(
+            query
+        )
+
+        token_ranges = query.get_scan_token_ranges(
+            range_predicates,
+            inefficient_predicates
+        )
+        cql_queries = query.get_row_ranges(range_predicates, token_ranges)
 
         if query.ordering:
             for order in query.ordering:
-                cql_query = cql_query.order_by(order)
+                cql_queries = [
+                    cql_query.order_by(order) for cql_query in cql_queries
+                ]
 
         result = None
 
         def paged_query_generator(
-            cql_query,
+            cql_queries,
             django_query
         ):
-            statement = SimpleStatement(
-                str(cql_query._select_query()),
-                consistency_level=ConsistencyLevel.ONE
-            )
-
-            if (
-                hasattr(
-                    django_query,
-                    'cassandra_meta'
-                ) and None is not django_query.cassandra_meta and
-                hasattr(
-                    django_query.cassandra_meta,
-                    'fetch_size'
-                )
-            ):
-                statement.fetch_size = django_query.cassandra_meta.fetch_size
-
-            parameters = {}
-            for where in cql_query._where:
-                if isinstance(where.value, Token):
-                    value = where.value.value
-                    if 1 == len(value):
-                        value = value[0]
+            statements = []
+            for cql_query in cql_queries:
+                if 1 < len(cql_queries):
+                    # Split lookups share their statement, it's prepared
+                    # once and bound to the values of each.
+                    cql, values = get_positional_query(cql_query)
+                    statement = django_query.prepare(cql).bind(values)
+                    statement.consistency_level = ConsistencyLevel.ONE
+                    parameters = None
 
                 else:
-                    value = where.value
+                    statement = SimpleStatement(
+                        str(cql_query._select_query()),
+                        consistency_level=ConsistencyLevel.ONE
+                    )
+                    parameters = get_query_parameters(cql_query)
+
+                if (
+                    hasattr(
+                        django_query,
+                        'cassandra_meta'
+                    ) and None is not django_query.cassandra_meta and
+                    hasattr(
+                        django_query.cassandra_meta,
+                        'fetch_size'
+                    )
+                ):
+                    statement.fetch_size = (
+                        django_query.cassandra_meta.fetch_size
+                    )
 
-                parameters[
-                    str(where.query_value.context_id)
-                ] = value
+                statements.append((
+                    statement,
+                    parameters
+                ))
 
-            django_query.connection.session.row_factory = (
+            django_query.session.row_factory = (
                 ordered_dict_factory
             )
 
-            results = django_query.connection.session.execute(
-                statement,
-                parameters
-            )
+            # Only the driver calls are timed, not the consumer of the
+            # rows.
+            sample = getattr(django_query, 'sample', None)
+            if None is not sample:
+                timed = sample.timed
+                timed_iter = sample.timed_iter
+
+            else:
+                def timed(function, *args):
+                    return function(*args)
+
+                timed_iter = iter
 
-            for row in results:
-                for key, value in cql_query._deferred_values.iteritems():
-                    row[key] = value
+            if 1 == len(statements):
+                results = [timed(
+                    django_query.session.execute,
+                    *statements[0]
+                )]
 
-                yield row
+            else:
+                # The first page of every query is fetched concurrently.
+                results = timed_iter(
+                    result for success, result in execute_concurrent(
+                        django_query.session,
+                        statements,
+                        concurrency=django_query.connection.settings_dict.get(
+                            'READ_CONCURRENCY',
+                            50
+                        ),
+                        results_generator=True
+                    )
+                )
+
+            for cql_query, query_results in itertools.izip(
+                cql_queries,
+                results
+            ):
+                deferred_values = cql_query._deferred_values
+                while True:
+                    page = query_results.current_rows
+                    if None is not sample:
+                        sample.pages += 1
+                        sample.rows_fetched += len(page)
+
+                    for row in page:
+                        for key, value in deferred_values.iteritems():
+                            row[key] = value
+
+                        yield row
+
+                    if not query_results.has_more_pages:
+                        break
+
+                    timed(query_results.fetch_next_page)
 
         result = paged_query_generator(
-            cql_query,
+            cql_queries,
             query
         )
 
+        # Rows matching several disjuncts of an OR are returned once.
+        if 1 < len(cql_queries) and not predicates_disjoint(
+            range_predicates
+        ):
+            def unique_rows(rows, key_columns):
+                keys = set()
+                for row in rows:
+                    key = tuple(row.get(column) for column in key_columns)
+                    if key not in keys:
+                        keys.add(key)
+                        yield row
+
+            result = unique_rows(
+                result,
+                query.cassandra_pk_columns
+            )
+
+        # Each query of a split IN or OR is ordered on its own.
+        if 1 < len(cql_queries) and query.ordering:
+            result = list(result)
+            sort_rows(result, [
+                (order.lstrip('-'), order.startswith('-'))
+                for order in query.ordering
+            ])
+
         if (
             inefficient_predicates or
             query.inefficient_ordering
@@ -547,22 +909,207 @@ class CompoundPredicate(object):
             if not query.allows_inefficient:
                 raise InefficientQueryError(query)
 
-            warnings.warn(InefficientQueryError.message)
+            if not query.scan:
+                warnings.warn(InefficientQueryError.message)
 
+        # Rows are streamed unless they have to be sorted client side.
         if inefficient_predicates:
-            result = [
+            result = (
                 row for row in result if self.row_matches_subset(
                     row,
                     inefficient_predicates
                 )
-            ]
+            )
 
         if query.inefficient_ordering:
-            for order in query.inefficient_ordering:
-                sort_rows(result, order)
+            result = list(result)
+            sort_rows(result, list(query.inefficient_ordering))
 
         if query.low_mark is not None or query.high_mark is not None:
             from itertools import islice
             result = islice(result, query.low_mark, query.high_mark)
 
         return result
+
+
+def push_down_negation(predicate, key_columns, negated=False):
+    '''
+    Rewrites predicate with De Morgan's laws so that negations only
+    remain on the leaves. Ranges on key_columns, which can't be null,
+    are replaced by their complement, other negated leaves are wrapped
+    in a negated AND and evaluated client side.
+    '''
+    if isinstance(predicate, CompoundPredicate):
+        negated = negated != predicate.negated
+        op = predicate.op
+        if negated:
+            op = (
+                COMPOUND_OP_OR
+                if op == COMPOUND_OP_AND
+                else COMPOUND_OP_AND
+            )
+
+        children = []
+        for child in predicate.children:
+            child = push_down_negation(child, key_columns, negated)
+            if (
+                isinstance(child, CompoundPredicate) and
+                not child.negated and
+                op == child.op and
+                COMPOUND_OP_AND == op
+            ):
+                children.extend(child.children)
+
+            else:
+                children.append(child)
+
+        if 1 == len(children):
+            return children[0]
+
+        return CompoundPredicate(
+            op,
+            children=children,
+            disjoint=predicate.disjoint and not negated
+        )
+
+    if not negated:
+        return predicate
+
+    if (
+        isinstance(predicate, RangePredicate) and
+        predicate.column in key_columns
+    ):
+        return predicate.complement()
+
+    return CompoundPredicate(
+        COMPOUND_OP_AND,
+        negated=True,
+        children=[predicate]
+    )
+
+
+def get_conjunctions(predicates):
+    '''
+    Returns the AND of predicates as a list of conjunctions of leaf
+    predicates, the matching rows being the union of the rows matching
+    each of them.
+    '''
+    conjunctions = [[]]
+    for predicate in predicates:
+        if not isinstance(predicate, CompoundPredicate):
+            alternatives = [[predicate]]
+
+        elif predicate.op == COMPOUND_OP_AND:
+            alternatives = get_conjunctions(predicate.children)
+
+        else:
+            alternatives = []
+            for child in predicate.children:
+                alternatives.extend(get_conjunctions([child]))
+
+        conjunctions = [
+            conjunction + alternative
+            for conjunction in conjunctions
+            for alternative in alternatives
+        ]
+
+    return conjunctions
+
+
+def iter_leaf_predicates(predicates):
+    for predicate in predicates:
+        if isinstance(predicate, CompoundPredicate):
+            for leaf in iter_leaf_predicates(predicate.children):
+                yield leaf
+
+        else:
+            yield predicate
+
+
+def predicates_disjoint(predicates):
+    '''
+    True if no row can match two of the conjunctions of predicates.
+    '''
+    for predicate in predicates:
+        if not isinstance(predicate, CompoundPredicate):
+            continue
+
+        if (
+            predicate.op == COMPOUND_OP_OR and
+            1 < len(predicate.children) and
+            not predicate.disjoint
+        ):
+            return False
+
+        if not predicates_disjoint(predicate.children):
+            return False
+
+    return True
+
+
+def merge_predicates(predicates):
+    '''
+    Intersects the range and IN predicates of a conjunction restricting
+    the same column. Returns None if the conjunction can't match.
+    '''
+    merged = []
+    by_column = {}
+    for predicate in predicates:
+        if not isinstance(predicate, (RangePredicate, InPredicate)):
+            merged.append(predicate)
+            continue
+
+        other = by_column.get(predicate.column)
+        if None is other:
+            by_column[predicate.column] = predicate
+            merged.append(predicate)
+            continue
+
+        if isinstance(other, RangePredicate) and isinstance(
+            predicate,
+            RangePredicate
+        ):
+            # Keep the tightest bounds of both.
+            intersection = RangePredicate(
+                other.column,
+                other.start,
+                other.start_inclusive,
+                other.end,
+                other.end_inclusive
+            )
+            if None is not predicate.start:
+                intersection.incorporate_range_op(
+                    predicate.column,
+                    'gte' if predicate.start_inclusive else 'gt',
+                    predicate.start,
+                    COMPOUND_OP_AND
+                )
+
+            if None is not predicate.end:
+                intersection.incorporate_range_op(
+                    predicate.column,
+                    'lte' if predicate.end_inclusive else 'lt',
+                    predicate.end,
+                    COMPOUND_OP_AND
+                )
+
+            if intersection.is_empty():
+                return None
+
+        else:
+            in_predicate, restriction = (
+                (other, predicate)
+                if isinstance(other, InPredicate)
+                else (predicate, other)
+            )
+            intersection = InPredicate(in_predicate.column, [
+                value for value in in_predicate.values
+                if restriction.row_matches({predicate.column: value})
+            ])
+            if not intersection.values:
+                return None
+
+        merged[merged.index(other)] = intersection
+        by_column[predicate.column] = intersection
+
+    return merged
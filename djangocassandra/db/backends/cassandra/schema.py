@@ -1,9 +1,15 @@
+from itertools import izip_longest
+from collections import OrderedDict
+
+from cassandra.metadata import protect_name
 from cassandra.cqlengine import management as db_management
 from cassandra.cqlengine.columns import (
     Map,
-    Text
+    Text,
+    Counter
 )
 
+from django.db.utils import DatabaseError
 from django.db.backends.base.schema import (
     BaseDatabaseSchemaEditor
 )
@@ -11,36 +17,377 @@ from django.db.backends.base.schema import (
 from djangocassandra.db.meta import (
     CqlColumnFamilyMetaClass,
     get_column_family,
-    internal_type_to_column_map
+    get_sasi_indexes,
+    internal_type_to_column_map,
+    SASI_INDEX_CLASS,
+    SASI_ANALYZER_CLASS
+)
+
+
+DDL_PHASE_CREATE = 0
+DDL_PHASE_ALTER = 1
+DDL_PHASE_INDEX = 2
+DDL_PHASES = (
+    DDL_PHASE_CREATE,
+    DDL_PHASE_ALTER,
+    DDL_PHASE_INDEX
 )
 
 
+def check_counter_columns(column_family):
+    '''
+    Cassandra tables holding counters can't have other columns besides
+    their primary key, and counters can't be indexed.
+    '''
+    if not column_family._has_counter:
+        return
+
+    for column in column_family._columns.values():
+        if column.primary_key:
+            continue
+
+        if not isinstance(column, Counter):
+            raise DatabaseError(
+                '%s has counter columns, it can\'t have the regular column '
+                '%s. Move the counters to a model of their own.' % (
+                    column_family.__model__._meta.object_name,
+                    column.db_field_name
+                )
+            )
+
+        if column.index:
+            raise DatabaseError(
+                'The counter column %s of %s can\'t be indexed.' % (
+                    column.db_field_name,
+                    column_family.__model__._meta.object_name
+                )
+            )
+
+
 class CassandraSchemaEditor(BaseDatabaseSchemaEditor):
+    '''
+    When used as a context manager (as the migration executor does)
+    DDL is collected for the whole block and issued on exit in three
+    phases: CREATE TABLE, ALTER TABLE ... ADD and CREATE INDEX.
+    Statements within a phase run concurrently, except that statements
+    against the same table are issued in order. Statements are sent
+    with execute_async so the schema agreement checks the driver makes
+    on each response overlap, and an explicit wait is made once the
+    phase completes.
+
+    Outside of a context manager every operation is executed
+    immediately. When collecting SQL (sqlmigrate) nothing is executed,
+    the statements are collected in the order they would run.
+    '''
     known_models = set()
 
+    def __init__(
+        self,
+        connection,
+        *args,
+        **kwargs
+    ):
+        super(CassandraSchemaEditor, self).__init__(
+            connection,
+            *args,
+            **kwargs
+        )
+
+        self.deferred_cql = None
+
+    def __enter__(self):
+        self.deferred_cql = []
+        return super(CassandraSchemaEditor, self).__enter__()
+
+    def __exit__(
+        self,
+        exc_type,
+        exc_value,
+        traceback
+    ):
+        deferred_cql = self.deferred_cql
+        self.deferred_cql = None
+
+        if None is exc_type and deferred_cql:
+            if self.collect_sql:
+                self.collected_sql.extend(
+                    statement[3] + ';' for statement in sorted(
+                        deferred_cql,
+                        key=lambda statement: statement[0]
+                    )
+                )
+
+            else:
+                self.execute_cql(deferred_cql)
+
+        return super(CassandraSchemaEditor, self).__exit__(
+            exc_type,
+            exc_value,
+            traceback
+        )
+
     def skip_default(
         self,
         field
     ):
         return True
 
+    def defer_cql(
+        self,
+        phase,
+        column_family,
+        cql
+    ):
+        statement = (
+            phase,
+            column_family._get_keyspace(),
+            column_family.column_family_name(),
+            cql
+        )
+
+        if None is not self.deferred_cql:
+            if statement not in self.deferred_cql:
+                self.deferred_cql.append(statement)
+
+        elif self.collect_sql:
+            self.collected_sql.append(cql + ';')
+
+        else:
+            self.execute_cql([statement])
+
+    def execute_cql(
+        self,
+        statements
+    ):
+        '''
+        Executes (phase, keyspace, table, cql) statements phase by
+        phase waiting for schema agreement once per phase.
+        '''
+        self.connection.ensure_connection()
+        session = self.connection.session
+        cluster = self.connection.cluster
+
+        concurrency = self.connection.settings_dict.get(
+            'DDL_CONCURRENCY',
+            10
+        )
+
+        keyspaces = set()
+        for phase in DDL_PHASES:
+            statements_by_table = OrderedDict()
+            for statement in statements:
+                if phase != statement[0]:
+                    continue
+
+                keyspaces.add(statement[1])
+                statements_by_table.setdefault(
+                    statement[2],
+                    []
+                ).append(statement[3])
+
+            if not statements_by_table:
+                continue
+
+            # Statements against the same table are not issued
+            # concurrently with each other.
+            for wave in izip_longest(*statements_by_table.values()):
+                wave = [cql for cql in wave if None is not cql]
+                for index in xrange(0, len(wave), concurrency):
+                    futures = [
+                        session.execute_async(cql)
+                        for cql in wave[index:index + concurrency]
+                    ]
+                    for future in futures:
+                        future.result()
+
+            # The cluster's setting is shared with every other session,
+            # it's only read.
+            cluster.control_connection.wait_for_schema_agreement(
+                wait_time=cluster.max_schema_agreement_wait
+            )
+
+        for keyspace in keyspaces:
+            cluster.refresh_keyspace_metadata(keyspace)
+
+        self.connection.introspection.invalidate_cache()
+
+    def _get_table_metadata(
+        self,
+        column_family
+    ):
+        self.connection.ensure_connection()
+        keyspace_metadata = self.connection.cluster.metadata.keyspaces.get(
+            column_family._get_keyspace()
+        )
+        if None is keyspace_metadata:
+            return None
+
+        return keyspace_metadata.tables.get(
+            column_family._raw_column_family_name()
+        )
+
+    def _create_index(
+        self,
+        column_family,
+        column,
+        table_metadata=None
+    ):
+        if (
+            None is not table_metadata and
+            db_management._get_index_name_by_column(
+                table_metadata,
+                column.db_field_name
+            )
+        ):
+            return
+
+        self.defer_cql(
+            DDL_PHASE_INDEX,
+            column_family,
+            'CREATE INDEX ON %s ("%s")' % (
+                column_family.column_family_name(),
+                column.db_field_name
+            )
+        )
+
+    def _create_sasi_indexes(
+        self,
+        column_family,
+        table_metadata=None
+    ):
+        '''
+        Creates the SASI indexes declared in sasi_indexes of the model's
+        Cassandra meta class that don't exist yet.
+        '''
+        sasi_indexes = get_sasi_indexes(column_family.__model__)
+        for column_name, options in sorted(sasi_indexes.items()):
+            if None is not table_metadata and any(
+                SASI_INDEX_CLASS == index_metadata.index_options.get(
+                    'class_name'
+                ) and protect_name(column_name) ==
+                index_metadata.index_options.get('target')
+                for index_metadata in table_metadata.indexes.values()
+            ):
+                continue
+
+            index_options = [('mode', options['mode'])]
+            if not options['case_sensitive']:
+                index_options.extend([
+                    ('analyzer_class', SASI_ANALYZER_CLASS),
+                    ('case_sensitive', 'false')
+                ])
+
+            self.defer_cql(
+                DDL_PHASE_INDEX,
+                column_family,
+                'CREATE CUSTOM INDEX ON %s ("%s") USING \'%s\' '
+                'WITH OPTIONS = {%s}' % (
+                    column_family.column_family_name(),
+                    column_name,
+                    SASI_INDEX_CLASS,
+                    ', '.join(
+                        '\'%s\': \'%s\'' % option
+                        for option in index_options
+                    )
+                )
+            )
+
+    def _add_column(
+        self,
+        column_family,
+        column,
+        table_metadata
+    ):
+        if column.db_field_name not in table_metadata.columns:
+            self.defer_cql(
+                DDL_PHASE_ALTER,
+                column_family,
+                'ALTER TABLE %s ADD %s' % (
+                    column_family.column_family_name(),
+                    column.get_column_def()
+                )
+            )
+
+        if column.index:
+            self._create_index(
+                column_family,
+                column,
+                table_metadata
+            )
+
     def _create_db_table(
         self,
         column_family
     ):
-        db_management.sync_table(column_family)
+        check_counter_columns(column_family)
+
+        table_name = column_family.column_family_name()
+        for index, statement in enumerate(self.deferred_cql or ()):
+            if DDL_PHASE_CREATE == statement[0] and table_name == statement[2]:
+                # Fields were added to a model created earlier in the
+                # block, the pending CREATE TABLE is built again from
+                # the model as it is now.
+                self.deferred_cql[index] = statement[:3] + (
+                    db_management._get_create_table(column_family),
+                )
+                for column in column_family._columns.values():
+                    if column.index:
+                        self._create_index(
+                            column_family,
+                            column
+                        )
+
+                self._create_sasi_indexes(column_family)
+                return
+
+        table_metadata = self._get_table_metadata(column_family)
+
+        if None is table_metadata:
+            self.defer_cql(
+                DDL_PHASE_CREATE,
+                column_family,
+                db_management._get_create_table(column_family)
+            )
+
+            for column in column_family._columns.values():
+                if column.index:
+                    self._create_index(
+                        column_family,
+                        column
+                    )
+
+        else:
+            for column in column_family._columns.values():
+                if column.primary_key:
+                    continue
+
+                self._add_column(
+                    column_family,
+                    column,
+                    table_metadata
+                )
+
+        self._create_sasi_indexes(
+            column_family,
+            table_metadata
+        )
 
     def create_model(
         self,
         model
     ):
-        self.connection.create_keyspace()
-
         column_family = get_column_family(
             self.connection,
             model
         )
 
+        # sqlmigrate only collects the table statements, it must not
+        # change the database.
+        if not self.collect_sql:
+            self.connection.create_keyspace(
+                column_family._get_keyspace()
+            )
+
         self._create_db_table(column_family)
 
     def delete_model(
@@ -53,6 +400,7 @@ class CassandraSchemaEditor(BaseDatabaseSchemaEditor):
         )
 
         db_management.drop_table(column_family)
+        self.connection.introspection.invalidate_cache()
 
     def alter_unique_together(
         self,
@@ -128,22 +476,38 @@ class CassandraSchemaEditor(BaseDatabaseSchemaEditor):
         model,
         field
     ):
+        # AddField passes the model before the field was added, the
+        # field belongs to the model after it.
         column_family = get_column_family(
             self.connection,
-            model
+            getattr(field, 'model', model)
         )
 
-        for key in column_family._columns.keys():
-            '''
-            Turn off indexing for old fields or 
-            sync_table will try to recreate them
-            '''
-            if key is field.db_column:
-                continue
+        column_name = field.db_column if field.db_column else field.column
+        column = None
+        for candidate in column_family._columns.values():
+            if column_name == candidate.db_field_name:
+                column = candidate
+                break
 
-            column_family._columns[key].index = False
+        if None is column or column.primary_key:
+            return
 
-        self._create_db_table(column_family)
+        check_counter_columns(column_family)
+        table_metadata = self._get_table_metadata(column_family)
+        if None is table_metadata:
+            self._create_db_table(column_family)
+
+        else:
+            self._add_column(
+                column_family,
+                column,
+                table_metadata
+            )
+            self._create_sasi_indexes(
+                column_family,
+                table_metadata
+            )
 
     def remove_field(
         self,
@@ -0,0 +1,49 @@
+from cassandra.cqlengine.statements import AssignmentClause
+
+
+class CollectionUpdateClause(AssignmentClause):
+    '''
+    In place update of a list, set or map column by a CollectionUpdate
+    operation, writing only the elements it adds or removes.
+    '''
+    def __init__(
+        self,
+        field,
+        operation,
+        value,
+        key=None
+    ):
+        super(CollectionUpdateClause, self).__init__(field, value)
+        self.operation = operation
+        self.key = key
+
+    def get_context_size(self):
+        return 2 if 'set_item' == self.operation else 1
+
+    def update_context(self, ctx):
+        if 'set_item' == self.operation:
+            ctx[str(self.context_id)] = self.key
+            ctx[str(self.context_id + 1)] = self.value
+
+        else:
+            ctx[str(self.context_id)] = self.value
+
+    def __unicode__(self):
+        if 'set_item' == self.operation:
+            return '"{0}"[%({1})s] = %({2})s'.format(
+                self.field,
+                self.context_id,
+                self.context_id + 1
+            )
+
+        if 'prepend' == self.operation:
+            return '"{0}" = %({1})s + "{0}"'.format(
+                self.field,
+                self.context_id
+            )
+
+        return '"{0}" = "{0}" {1} %({2})s'.format(
+            self.field,
+            '+' if self.operation in ('append', 'add') else '-',
+            self.context_id
+        )
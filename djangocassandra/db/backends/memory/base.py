@@ -0,0 +1,133 @@
+from threading import Lock
+
+from django.core.exceptions import ImproperlyConfigured
+
+from cassandra.cqlengine import (
+    connection,
+    models
+)
+
+from djangocassandra.db.backends.cassandra.base import (
+    DatabaseFeatures,
+    DatabaseOperations,
+    DatabaseClient,
+    DatabaseValidation,
+    DatabaseWrapper as CassandraDatabaseWrapper
+)
+
+from .cluster import MemoryCluster
+
+
+# Like real clusters the in-memory ones outlive the DatabaseWrappers
+# using them, one per set of contact points.
+clusters = {}
+clusters_lock = Lock()
+
+replica_sessions = {}
+
+
+def get_cluster(
+    contact_points,
+    latency=None
+):
+    key = tuple(contact_points)
+    with clusters_lock:
+        cluster = clusters.get(key)
+        if None is cluster:
+            cluster = clusters[key] = MemoryCluster(
+                contact_points=list(contact_points)
+            )
+
+        cluster.latency = latency
+        return cluster
+
+
+class DatabaseWrapper(CassandraDatabaseWrapper):
+    '''
+    Runs the Cassandra backend against an in-process fake cluster
+    instead of a real one. Meant for tests and benchmarks: data is
+    lost when the process exits.
+
+    LATENCY (seconds, or a (minimum, maximum) tuple) delays every
+    request and page fetch to simulate the network.
+    '''
+    def get_new_connection(self, connection_settings):
+        contact_points = connection_settings.pop(
+            'contact_points',
+            self.default_settings['CONTACT_POINTS']
+        )
+        keyspace = connection_settings.pop(
+            'keyspace',
+            self.settings_dict['DEFAULT_KEYSPACE']
+        )
+
+        self.keyspace = keyspace
+
+        cluster = get_cluster(
+            contact_points,
+            latency=self.settings_dict.get('LATENCY')
+        )
+
+        if connection.cluster is not cluster:
+            models.DEFAULT_KEYSPACE = keyspace
+            conn = connection.register_connection(
+                connection.DEFAULT_CONNECTION,
+                hosts=contact_points,
+                lazy_connect=True,
+                default=True
+            )
+            conn.lazy_connect = False
+            conn.cluster = cluster
+            conn.session = cluster.connect()
+            conn.setup_session()
+            connection.set_default_connection(connection.DEFAULT_CONNECTION)
+
+        self.session = connection.get_session()
+        self.cluster = connection.get_cluster()
+        self.session.default_timeout = None
+        return self._make_cursor(self.session)
+
+    def get_replica_session(
+        self,
+        name
+    ):
+        '''
+        Replicas are separate in-memory clusters, sharing the main one
+        unless the replica sets its own CONTACT_POINTS.
+        '''
+        session = replica_sessions.get(name)
+        if None is not session:
+            return session
+
+        self.ensure_connection()
+        replica_settings = self.settings_dict.get(
+            'REPLICAS',
+            {}
+        ).get(name)
+
+        if None is replica_settings:
+            raise ImproperlyConfigured(
+                'No read replica named "%s" is defined in the '
+                'REPLICAS setting.' % (name,)
+            )
+
+        cluster = get_cluster(
+            replica_settings.get(
+                'CONTACT_POINTS',
+                self.settings_dict.get(
+                    'CONTACT_POINTS',
+                    self.default_settings['CONTACT_POINTS']
+                )
+            ),
+            latency=replica_settings.get(
+                'LATENCY',
+                self.settings_dict.get('LATENCY')
+            )
+        )
+        session = replica_sessions[name] = cluster.connect(
+            self.current_keyspace()
+        )
+        session.row_factory = self.session.row_factory
+        session.default_timeout = None
+        return session
+
@@ -0,0 +1,650 @@
+'''
+Stand-ins for the driver's Cluster, Session and ResponseFuture backed
+by an in-memory Store.
+
+Only what the backend and cqlengine use is implemented. Requests can
+be delayed by a simulated network latency, in which case responses are
+delivered from a scheduler thread like the driver's event loop does.
+'''
+import heapq
+import random
+import time
+
+from hashlib import md5
+from concurrent.futures import ThreadPoolExecutor
+from threading import (
+    Condition,
+    Event,
+    Lock,
+    RLock,
+    Thread,
+    local
+)
+from contextlib import contextmanager
+
+from cassandra import (
+    ConsistencyLevel,
+    InvalidRequest
+)
+from cassandra import cqltypes
+from cassandra.encoder import Encoder
+from cassandra.protocol import ColumnMetadata as ProtocolColumnMetadata
+from cassandra.query import (
+    BatchStatement,
+    BoundStatement,
+    PreparedStatement,
+    FETCH_SIZE_UNSET,
+    named_tuple_factory
+)
+from cassandra.cluster import (
+    ResultSet,
+    QueryExhausted,
+    _NOT_SET
+)
+
+from .cql import (
+    parse,
+    Param,
+    TupleTerm,
+    MapTerm
+)
+from .store import (
+    PROTOCOL_VERSION,
+    Store,
+    get_base_type,
+    parse_type
+)
+
+
+class MemoryMetadata(object):
+    def __init__(self):
+        self.keyspaces = {}
+        self.partitioner = 'org.apache.cassandra.dht.Murmur3Partitioner'
+
+
+class MemoryControlConnection(object):
+    def wait_for_schema_agreement(self, *args, **kwargs):
+        return True
+
+
+class LatencyScheduler(Thread):
+    '''
+    Runs callables once their simulated network delay has elapsed.
+    '''
+    def __init__(self):
+        super(LatencyScheduler, self).__init__(
+            name='djangocassandra-memory-latency'
+        )
+        self.daemon = True
+        self.condition = Condition(Lock())
+        self.queue = []
+        self.sequence = 0
+
+    def schedule(self, delay, function):
+        with self.condition:
+            self.sequence += 1
+            heapq.heappush(
+                self.queue,
+                (time.time() + delay, self.sequence, function)
+            )
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.queue:
+                    self.condition.wait()
+
+                due, _, function = self.queue[0]
+                delay = due - time.time()
+                if 0 < delay:
+                    self.condition.wait(delay)
+                    continue
+
+                heapq.heappop(self.queue)
+
+            function()
+
+
+class MemoryCluster(object):
+    '''
+    A single node "cluster" holding its data in memory.
+
+    latency is either a number of seconds or a (minimum, maximum)
+    tuple to pick from uniformly, applied to every request and every
+    page fetched.
+    '''
+    protocol_version = PROTOCOL_VERSION
+
+    def __init__(
+        self,
+        contact_points=None,
+        latency=None,
+        **kwargs
+    ):
+        self.contact_points = contact_points or ['127.0.0.1']
+        self.latency = latency
+        self.metadata = MemoryMetadata()
+        self.store = Store(self.metadata)
+        self.lock = RLock()
+        self.control_connection = MemoryControlConnection()
+        self.max_schema_agreement_wait = 10
+        self.metrics = None
+        self.prepared_statements = {}
+        self.statements = {}
+        self.scheduler = None
+        self.scheduler_lock = Lock()
+        self.executor = ThreadPoolExecutor(2)
+        self.local = local()
+
+    def connect(self, keyspace=None):
+        return MemorySession(self, keyspace)
+
+    def shutdown(self):
+        self.executor.shutdown()
+
+    def refresh_schema_metadata(self, *args, **kwargs):
+        pass
+
+    def refresh_keyspace_metadata(self, *args, **kwargs):
+        pass
+
+    def refresh_table_metadata(self, *args, **kwargs):
+        pass
+
+    def register_user_type(self, *args, **kwargs):
+        pass
+
+    def get_latency(self):
+        if not self.latency:
+            return 0
+
+        if isinstance(self.latency, (list, tuple)):
+            return random.uniform(*self.latency)
+
+        return self.latency
+
+    def run(self, function):
+        '''
+        Calls function after the simulated latency, right away if
+        there is none. Requests made from response callbacks are always
+        handed to the scheduler thread, as chaining them inline (like
+        execute_concurrent does) would recurse.
+        '''
+        latency = self.get_latency()
+        if not latency and not getattr(self.local, 'callbacks', 0):
+            function()
+            return
+
+        with self.scheduler_lock:
+            if None is self.scheduler:
+                self.scheduler = LatencyScheduler()
+                self.scheduler.start()
+
+        self.scheduler.schedule(latency, function)
+
+    @contextmanager
+    def running_callbacks(self):
+        self.local.callbacks = getattr(self.local, 'callbacks', 0) + 1
+        try:
+            yield
+
+        finally:
+            self.local.callbacks -= 1
+
+    def parse(self, query):
+        statement = self.statements.get(query)
+        if None is statement:
+            if 1000 < len(self.statements):
+                self.statements.clear()
+
+            statement = self.statements[query] = parse(query)
+
+        return statement
+
+    def execute(self, statement, parameters, keyspace):
+        with self.lock:
+            return self.store.execute(statement, parameters, keyspace)
+
+
+class MemorySession(object):
+    def __init__(self, cluster, keyspace=None):
+        self.cluster = cluster
+        self.keyspace = keyspace
+        self.row_factory = named_tuple_factory
+        self.default_timeout = 10.0
+        self.default_fetch_size = 5000
+        self.default_consistency_level = ConsistencyLevel.LOCAL_ONE
+        self.encoder = Encoder()
+        self.is_shutdown = False
+
+    def execute(
+        self,
+        query,
+        parameters=None,
+        timeout=_NOT_SET,
+        trace=False,
+        custom_payload=None,
+        paging_state=None,
+        **kwargs
+    ):
+        return self.execute_async(
+            query,
+            parameters,
+            paging_state=paging_state
+        ).result()
+
+    def execute_async(
+        self,
+        query,
+        parameters=None,
+        trace=False,
+        custom_payload=None,
+        timeout=_NOT_SET,
+        paging_state=None,
+        **kwargs
+    ):
+        future = MemoryResponseFuture(
+            self,
+            query,
+            parameters,
+            paging_state
+        )
+        future.send_request()
+        return future
+
+    def set_keyspace(self, keyspace):
+        self.execute('USE %s' % (keyspace,))
+        self.keyspace = keyspace
+
+    def shutdown(self):
+        self.is_shutdown = True
+
+    def submit(self, fn, *args, **kwargs):
+        return self.cluster.executor.submit(fn, *args, **kwargs)
+
+    def get_statements(self, query, parameters):
+        '''
+        Returns the (statement, parameters) pairs to execute for a
+        query as the driver would send it.
+        '''
+        if isinstance(query, BatchStatement):
+            statements = []
+            for is_prepared, query_or_id, values in (
+                query._statements_and_parameters
+            ):
+                if is_prepared:
+                    statement, prepared = self.cluster.prepared_statements[
+                        query_or_id
+                    ]
+                    values = self.decode_values(prepared, values)
+
+                else:
+                    statement = self.cluster.parse(query_or_id)
+
+                statements.append((statement, values))
+
+            return statements
+
+        if isinstance(query, BoundStatement):
+            statement, prepared = self.cluster.prepared_statements[
+                query.prepared_statement.query_id
+            ]
+            return [(statement, self.decode_values(prepared, query.values))]
+
+        if not isinstance(query, basestring):
+            query = query.query_string
+
+        return [(self.cluster.parse(query), parameters or {})]
+
+    def decode_values(self, prepared, values):
+        return [
+            None if None is value else column.type.deserialize(
+                value,
+                PROTOCOL_VERSION
+            )
+            for column, value in zip(prepared.column_metadata, values)
+        ]
+
+    def execute_statements(self, statements):
+        result = None, None, None
+        with self.cluster.lock:
+            for statement, parameters in statements:
+                result = self.cluster.execute(
+                    statement,
+                    parameters,
+                    self.keyspace
+                )
+
+                if 'use' == statement.kind:
+                    self.keyspace = statement.keyspace
+
+        return result
+
+    def prepare(self, query, custom_payload=None):
+        statement = self.cluster.parse(query)
+        with self.cluster.lock:
+            markers = get_bind_markers(
+                self.cluster.store,
+                statement,
+                self.keyspace
+            )
+
+        column_metadata = [
+            ProtocolColumnMetadata(keyspace, table, name, cql_type)
+            for keyspace, table, name, cql_type in markers
+        ]
+
+        routing_key_indexes = None
+        if markers:
+            keyspace, table_name = markers[0][:2]
+            table = self.cluster.store.keyspaces.get(
+                keyspace,
+                {}
+            ).get(table_name)
+            names = [name for _, _, name, _ in markers]
+            if None is not table and all(
+                column in names for column in table.partition_key
+            ):
+                routing_key_indexes = [
+                    names.index(column) for column in table.partition_key
+                ]
+
+        query_id = md5(query).digest()
+        prepared = PreparedStatement(
+            column_metadata,
+            query_id,
+            routing_key_indexes,
+            query,
+            markers[0][0] if markers else self.keyspace,
+            PROTOCOL_VERSION,
+            None
+        )
+        self.cluster.prepared_statements[query_id] = (statement, prepared)
+        return prepared
+
+
+def get_bind_markers(store, statement, keyspace):
+    '''
+    Returns (keyspace, table, name, type) for each bind marker of a
+    statement in order, like the server does when preparing.
+    '''
+    keyspace = getattr(statement, 'keyspace', None) or keyspace
+    table = store.keyspaces.get(keyspace, {}).get(
+        getattr(statement, 'table', None)
+    )
+    if None is table:
+        if statement.kind in ('select', 'insert', 'update', 'delete'):
+            raise InvalidRequest(
+                'unconfigured table %s' % (statement.table,)
+            )
+
+        return []
+
+    markers = {}
+
+    def add(term, name, cql_type):
+        if isinstance(term, Param):
+            markers[term.key] = (keyspace, table.name, name, cql_type)
+
+        elif isinstance(term, TupleTerm):
+            subtypes = getattr(cql_type, 'subtypes', None) or [cql_type]
+            for index, child in enumerate(term.terms):
+                add(child, name, subtypes[min(index, len(subtypes) - 1)])
+
+        elif isinstance(term, MapTerm):
+            for key, value in term.items:
+                add(key, name, cql_type.subtypes[0])
+                add(value, name, cql_type.subtypes[1])
+
+    def add_relations(relations):
+        for relation in relations:
+            if relation.token:
+                if isinstance(relation.term, TupleTerm):
+                    for column, term in zip(
+                        relation.columns,
+                        relation.term.terms
+                    ):
+                        add(term, column, table.types[column])
+
+                else:
+                    add(relation.term, 'partition key token', parse_type(
+                        'bigint'
+                    ))
+
+                continue
+
+            table.check_column(relation.column)
+            cql_type = table.types[relation.column]
+            if 'in' == relation.op:
+                if isinstance(relation.term, Param):
+                    cql_type = parse_type(
+                        'list<%s>' % (table.columns[relation.column],)
+                    )
+
+            elif relation.op in ('contains', 'contains_key'):
+                cql_type = cql_type.subtypes[
+                    0 if 'contains_key' == relation.op else -1
+                ]
+
+            add(relation.term, relation.column, cql_type)
+
+    if 'insert' == statement.kind:
+        for column, term in zip(statement.columns, statement.values):
+            table.check_column(column)
+            add(term, column, table.types[column])
+
+    elif 'update' == statement.kind:
+        for assignment in statement.assignments:
+            table.check_column(assignment.column)
+            cql_type = table.types[assignment.column]
+            base_type = get_base_type(table.columns[assignment.column])
+            if 'set_item' == assignment.op:
+                if 'map' == base_type:
+                    add(assignment.key, assignment.column, cql_type.subtypes[0])
+
+                else:
+                    add(assignment.key, assignment.column, parse_type('int'))
+
+                add(assignment.term, assignment.column, cql_type.subtypes[-1])
+
+            elif 'counter' == base_type:
+                add(assignment.term, assignment.column, parse_type('bigint'))
+
+            elif 'map' == base_type and 'remove' == assignment.op:
+                add(
+                    assignment.term,
+                    assignment.column,
+                    cqltypes.SetType.apply_parameters([cql_type.subtypes[0]])
+                )
+
+            else:
+                add(assignment.term, assignment.column, cql_type)
+
+        add_relations(statement.where)
+
+    elif 'delete' == statement.kind:
+        for column, key in statement.columns:
+            if None is not key:
+                table.check_column(column)
+                add(key, column, table.types[column].subtypes[0])
+
+        add_relations(statement.where)
+
+    elif 'select' == statement.kind:
+        add_relations(statement.where)
+        if None is not statement.limit:
+            add(statement.limit, '[limit]', parse_type('int'))
+
+    return [markers[key] for key in sorted(markers)]
+
+
+class MemoryMessage(object):
+    def __init__(self, fetch_size):
+        self.fetch_size = fetch_size
+
+
+class MemoryResponseFuture(object):
+    '''
+    Result of an asynchronous request. Rows are computed when the
+    request is executed and handed out a page at a time.
+    '''
+    def __init__(
+        self,
+        session,
+        query,
+        parameters,
+        paging_state=None
+    ):
+        self.session = session
+        self.query = query
+        self.parameters = parameters
+        self.row_factory = session.row_factory
+        fetch_size = getattr(query, 'fetch_size', None)
+        if fetch_size in (None, FETCH_SIZE_UNSET):
+            fetch_size = session.default_fetch_size
+
+        self.message = MemoryMessage(fetch_size)
+        self.has_more_pages = False
+        self._paging_state = None
+        self._col_names = None
+        self._col_types = None
+        self._rows = None
+        self._offset = int(paging_state) if paging_state else 0
+        self._event = Event()
+        self._callback_lock = Lock()
+        self._callbacks = []
+        self._errbacks = []
+        self._final_result = _NOT_SET
+        self._final_exception = None
+
+    def send_request(self):
+        self.session.cluster.run(self._execute)
+
+    def _execute(self):
+        try:
+            statements = self.session.get_statements(
+                self.query,
+                self.parameters
+            )
+            names, types, rows = self.session.execute_statements(
+                statements
+            )
+
+        except Exception as e:
+            self._set_final_exception(e)
+            return
+
+        self._col_names = names
+        self._col_types = types
+        self._rows = rows
+        self._set_page()
+
+    def _set_page(self):
+        if None is self._col_names:
+            self._set_final_result(None)
+            return
+
+        start = self._offset
+        if self.message.fetch_size and 0 < self.message.fetch_size:
+            self._offset = start + self.message.fetch_size
+
+        else:
+            self._offset = len(self._rows)
+
+        self.has_more_pages = self._offset < len(self._rows)
+        self._paging_state = (
+            str(self._offset) if self.has_more_pages else None
+        )
+
+        try:
+            page = self.row_factory(
+                self._col_names,
+                self._rows[start:self._offset]
+            )
+
+        except Exception as e:
+            self._set_final_exception(e)
+            return
+
+        self._set_final_result(page)
+
+    def _set_final_result(self, result):
+        with self._callback_lock:
+            self._final_result = result
+            self._event.set()
+            callbacks = list(self._callbacks)
+
+        with self.session.cluster.running_callbacks():
+            for function, args, kwargs in callbacks:
+                function(result, *args, **kwargs)
+
+    def _set_final_exception(self, exception):
+        with self._callback_lock:
+            self._final_exception = exception
+            self._event.set()
+            errbacks = list(self._errbacks)
+
+        with self.session.cluster.running_callbacks():
+            for function, args, kwargs in errbacks:
+                function(exception, *args, **kwargs)
+
+    def start_fetching_next_page(self):
+        if not self.has_more_pages:
+            raise QueryExhausted()
+
+        self._event.clear()
+        self._final_result = _NOT_SET
+        self._final_exception = None
+        self.session.cluster.run(self._set_page)
+
+    def result(self):
+        self._event.wait()
+        if None is not self._final_exception:
+            raise self._final_exception
+
+        return ResultSet(self, self._final_result)
+
+    def get_query_trace(self, *args, **kwargs):
+        return None
+
+    def add_callback(self, fn, *args, **kwargs):
+        with self._callback_lock:
+            if _NOT_SET is self._final_result:
+                self._callbacks.append((fn, args, kwargs))
+                return self
+
+            result = self._final_result
+
+        with self.session.cluster.running_callbacks():
+            fn(result, *args, **kwargs)
+        return self
+
+    def add_errback(self, fn, *args, **kwargs):
+        with self._callback_lock:
+            if None is self._final_exception:
+                self._errbacks.append((fn, args, kwargs))
+                return self
+
+            exception = self._final_exception
+
+        with self.session.cluster.running_callbacks():
+            fn(exception, *args, **kwargs)
+        return self
+
+    def add_callbacks(
+        self,
+        callback,
+        errback,
+        callback_args=(),
+        callback_kwargs=None,
+        errback_args=(),
+        errback_kwargs=None
+    ):
+        self.add_callback(callback, *callback_args, **(callback_kwargs or {}))
+        self.add_errback(errback, *errback_args, **(errback_kwargs or {}))
+
+    def clear_callbacks(self):
+        with self._callback_lock:
+            self._callbacks = []
+            self._errbacks = []
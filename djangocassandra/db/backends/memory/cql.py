@@ -0,0 +1,980 @@
+'''
+Parser for the subset of CQL the backend (and cqlengine) emits.
+
+Statements are parsed into plain objects holding terms (Param,
+Literal, ...) that are bound to the request's values on execution.
+'''
+import re
+
+from uuid import UUID
+from decimal import Decimal
+
+from cassandra.protocol import SyntaxException
+
+
+TOKEN_PATTERN = re.compile(r'''
+    (?P<space>\s+|--[^\n]*|//[^\n]*)
+  | (?P<named>%\((?P<name>[^)]+)\)s)
+  | (?P<positional>%s|\?)
+  | (?P<quoted>"(?:[^"]|"")*")
+  | (?P<string>'(?:[^']|'')*')
+  | (?P<uuid>[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-
+             [0-9a-fA-F]{4}-[0-9a-fA-F]{12})
+  | (?P<blob>0[xX][0-9a-fA-F]*)
+  | (?P<number>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+  | (?P<word>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<symbol><=|>=|!=|[(),.;=<>*{}:\[\]+-])
+''', re.VERBOSE)
+
+
+class Param(object):
+    __slots__ = ('key',)
+
+    def __init__(self, key):
+        self.key = key
+
+    def bind(self, parameters):
+        try:
+            return parameters[self.key]
+
+        except (KeyError, IndexError):
+            raise SyntaxException(
+                code=SyntaxException.error_code,
+                message='No value bound for marker %s' % (self.key,),
+                info=None
+            )
+
+
+class Literal(object):
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def bind(self, parameters):
+        return self.value
+
+
+class TupleTerm(object):
+    __slots__ = ('terms',)
+
+    def __init__(self, terms):
+        self.terms = terms
+
+    def bind(self, parameters):
+        return tuple(term.bind(parameters) for term in self.terms)
+
+
+class ListTerm(TupleTerm):
+    def bind(self, parameters):
+        return [term.bind(parameters) for term in self.terms]
+
+
+class SetTerm(TupleTerm):
+    def bind(self, parameters):
+        return set(term.bind(parameters) for term in self.terms)
+
+
+class MapTerm(object):
+    __slots__ = ('items',)
+
+    def __init__(self, items):
+        self.items = items
+
+    def bind(self, parameters):
+        return dict(
+            (key.bind(parameters), value.bind(parameters))
+            for key, value in self.items
+        )
+
+
+class Relation(object):
+    '''
+    column op term. For token relations columns is the tuple of
+    partition key columns and token is True.
+    '''
+    __slots__ = ('columns', 'op', 'term', 'token')
+
+    def __init__(self, columns, op, term, token=False):
+        self.columns = columns
+        self.op = op
+        self.term = term
+        self.token = token
+
+    @property
+    def column(self):
+        return self.columns[0]
+
+
+AGGREGATE_FUNCTIONS = (
+    'count',
+    'sum',
+    'avg',
+    'min',
+    'max'
+)
+
+
+class Selector(object):
+    '''
+    An aggregate function call in a select clause, column being None
+    for COUNT(*) and cast the type the column is cast to if any.
+    '''
+    __slots__ = ('function', 'column', 'cast')
+
+    def __init__(self, function, column=None, cast=None):
+        self.function = function
+        self.column = column
+        self.cast = cast
+
+    @property
+    def name(self):
+        if None is self.column:
+            return self.function
+
+        if None is not self.cast:
+            return 'system.%s(cast(%s as %s))' % (
+                self.function,
+                self.column,
+                self.cast
+            )
+
+        return 'system.%s(%s)' % (self.function, self.column)
+
+
+class Select(object):
+    kind = 'select'
+
+    def __init__(self):
+        self.keyspace = None
+        self.table = None
+        self.columns = None  # None is *, Selectors for aggregates
+        self.aliases = None
+        self.distinct = False
+        self.where = []
+        self.group_by = []
+        self.order_by = []
+        self.limit = None
+        self.allow_filtering = False
+
+
+class Insert(object):
+    kind = 'insert'
+
+    def __init__(self):
+        self.keyspace = None
+        self.table = None
+        self.columns = []
+        self.values = []
+        self.if_not_exists = False
+
+
+class Assignment(object):
+    '''
+    op is one of set, add (column + term), remove (column - term),
+    prepend (term + column) and set_item (column[key] = term).
+    '''
+    __slots__ = ('column', 'op', 'term', 'key')
+
+    def __init__(self, column, op, term, key=None):
+        self.column = column
+        self.op = op
+        self.term = term
+        self.key = key
+
+
+class Update(object):
+    kind = 'update'
+
+    def __init__(self):
+        self.keyspace = None
+        self.table = None
+        self.assignments = []
+        self.where = []
+        self.if_exists = False
+
+
+class Delete(object):
+    kind = 'delete'
+
+    def __init__(self):
+        self.keyspace = None
+        self.table = None
+        self.columns = []  # (column, key term or None)
+        self.where = []
+        self.if_exists = False
+
+
+class Batch(object):
+    kind = 'batch'
+
+    def __init__(self):
+        self.statements = []
+
+
+class CreateKeyspace(object):
+    kind = 'create_keyspace'
+
+    def __init__(self):
+        self.keyspace = None
+        self.if_not_exists = False
+        self.properties = {}
+
+
+class CreateTable(object):
+    kind = 'create_table'
+
+    def __init__(self):
+        self.keyspace = None
+        self.table = None
+        self.if_not_exists = False
+        self.columns = []  # (name, cql type)
+        self.partition_key = []
+        self.clustering_key = []
+        self.clustering_order = {}
+        self.properties = {}
+
+
+class CreateIndex(object):
+    kind = 'create_index'
+
+    def __init__(self):
+        self.keyspace = None
+        self.table = None
+        self.name = None
+        self.column = None
+        self.target = None
+        self.if_not_exists = False
+        self.custom_class = None
+        self.options = {}
+
+
+class AlterTable(object):
+    kind = 'alter_table'
+
+    def __init__(self):
+        self.keyspace = None
+        self.table = None
+        self.add = []  # (name, cql type)
+        self.drop = []
+        self.properties = {}
+
+
+class Drop(object):
+    kind = 'drop'
+
+    def __init__(self, what):
+        self.what = what
+        self.keyspace = None
+        self.table = None
+        self.name = None
+        self.if_exists = False
+
+
+class Truncate(object):
+    kind = 'truncate'
+
+    def __init__(self):
+        self.keyspace = None
+        self.table = None
+
+
+class Use(object):
+    kind = 'use'
+
+    def __init__(self, keyspace):
+        self.keyspace = keyspace
+
+
+def tokenize(query):
+    tokens = []
+    position = 0
+    positional = 0
+    length = len(query)
+    while position < length:
+        match = TOKEN_PATTERN.match(query, position)
+        if None is match:
+            raise SyntaxException(
+                code=SyntaxException.error_code,
+                message='Invalid character at %d in "%s"' % (
+                    position,
+                    query
+                ),
+                info=None
+            )
+
+        position = match.end()
+        kind = match.lastgroup
+        if 'name' == kind:
+            kind = 'named'
+
+        text = match.group(kind)
+        if 'space' == kind:
+            continue
+
+        if 'named' == kind:
+            tokens.append(('param', match.group('name')))
+
+        elif 'positional' == kind:
+            tokens.append(('param', positional))
+            positional += 1
+
+        elif 'quoted' == kind:
+            tokens.append(('name', text[1:-1].replace('""', '"')))
+
+        elif 'string' == kind:
+            tokens.append(('literal', text[1:-1].replace("''", "'")))
+
+        elif 'uuid' == kind:
+            tokens.append(('literal', UUID(text)))
+
+        elif 'blob' == kind:
+            tokens.append(('literal', text[2:].decode('hex')))
+
+        elif 'number' == kind:
+            if '.' in text or 'e' in text or 'E' in text:
+                tokens.append(('literal', Decimal(text)))
+
+            else:
+                tokens.append(('literal', int(text)))
+
+        elif 'word' == kind:
+            tokens.append(('word', text))
+
+        else:
+            tokens.append(('symbol', text))
+
+    tokens.append(('end', None))
+    return tokens
+
+
+class Parser(object):
+    def __init__(self, query):
+        self.query = query
+        self.tokens = tokenize(query)
+        self.position = 0
+
+    def error(self, message=None):
+        kind, value = self.tokens[self.position]
+        raise SyntaxException(
+            code=SyntaxException.error_code,
+            message='%s at %s %r in "%s"' % (
+                message or 'Unexpected input',
+                kind,
+                value,
+                self.query
+            ),
+            info=None
+        )
+
+    def peek(self, offset=0):
+        return self.tokens[min(
+            self.position + offset,
+            len(self.tokens) - 1
+        )]
+
+    def next(self):
+        token = self.tokens[self.position]
+        if 'end' != token[0]:
+            self.position += 1
+
+        return token
+
+    def is_word(self, *words):
+        kind, value = self.peek()
+        return 'word' == kind and value.lower() in words
+
+    def is_symbol(self, *symbols):
+        kind, value = self.peek()
+        return 'symbol' == kind and value in symbols
+
+    def accept_word(self, *words):
+        if self.is_word(*words):
+            return self.next()[1].lower()
+
+        return None
+
+    def accept_symbol(self, *symbols):
+        if self.is_symbol(*symbols):
+            return self.next()[1]
+
+        return None
+
+    def expect_word(self, *words):
+        word = self.accept_word(*words)
+        if None is word:
+            self.error('Expected %s' % ' or '.join(words).upper())
+
+        return word
+
+    def expect_symbol(self, *symbols):
+        symbol = self.accept_symbol(*symbols)
+        if None is symbol:
+            self.error('Expected %s' % ' or '.join(symbols))
+
+        return symbol
+
+    def accept_words(self, *words):
+        '''
+        Accepts the sequence of words if all of them are next.
+        '''
+        for offset, word in enumerate(words):
+            kind, value = self.peek(offset)
+            if 'word' != kind or value.lower() != word:
+                return False
+
+        self.position += len(words)
+        return True
+
+    def name(self):
+        kind, value = self.next()
+        if 'name' == kind:
+            return value
+
+        if 'word' == kind:
+            return value.lower()
+
+        self.position -= 1
+        self.error('Expected a name')
+
+    def table_name(self, statement):
+        name = self.name()
+        if self.accept_symbol('.'):
+            statement.keyspace = name
+            name = self.name()
+
+        statement.table = name
+
+    def names(self):
+        self.expect_symbol('(')
+        names = [self.name()]
+        while self.accept_symbol(','):
+            names.append(self.name())
+
+        self.expect_symbol(')')
+        return names
+
+    def cql_type(self):
+        name = self.name()
+        if not self.accept_symbol('<'):
+            return name
+
+        parameters = [self.cql_type()]
+        while self.accept_symbol(','):
+            parameters.append(self.cql_type())
+
+        self.expect_symbol('>')
+        if 'frozen' == name:
+            return parameters[0]
+
+        return '%s<%s>' % (name, ', '.join(parameters))
+
+    def term(self):
+        kind, value = self.peek()
+        if 'param' == kind:
+            self.next()
+            return Param(value)
+
+        if 'literal' == kind:
+            self.next()
+            return Literal(value)
+
+        if 'word' == kind and value.lower() in ('true', 'false', 'null'):
+            self.next()
+            return Literal({
+                'true': True,
+                'false': False,
+                'null': None
+            }[value.lower()])
+
+        if self.accept_symbol('('):
+            terms = []
+            if not self.accept_symbol(')'):
+                terms.append(self.term())
+                while self.accept_symbol(','):
+                    terms.append(self.term())
+
+                self.expect_symbol(')')
+
+            return TupleTerm(terms)
+
+        if self.accept_symbol('['):
+            terms = []
+            if not self.accept_symbol(']'):
+                terms.append(self.term())
+                while self.accept_symbol(','):
+                    terms.append(self.term())
+
+                self.expect_symbol(']')
+
+            return ListTerm(terms)
+
+        if self.accept_symbol('{'):
+            if self.accept_symbol('}'):
+                return MapTerm([])
+
+            first = self.term()
+            if self.accept_symbol(':'):
+                items = [(first, self.term())]
+                while self.accept_symbol(','):
+                    key = self.term()
+                    self.expect_symbol(':')
+                    items.append((key, self.term()))
+
+                self.expect_symbol('}')
+                return MapTerm(items)
+
+            terms = [first]
+            while self.accept_symbol(','):
+                terms.append(self.term())
+
+            self.expect_symbol('}')
+            return SetTerm(terms)
+
+        self.error('Expected a term')
+
+    def properties(self, properties):
+        '''
+        Parses name = value {AND name = value} into properties.
+        '''
+        while True:
+            name = self.name()
+            self.expect_symbol('=')
+            kind, value = self.peek()
+            if 'word' == kind and value.lower() not in (
+                'true', 'false', 'null'
+            ):
+                self.next()
+                properties[name] = value
+
+            else:
+                properties[name] = self.term().bind({})
+
+            if not self.accept_word('and'):
+                break
+
+    def relation(self):
+        if self.accept_word('token'):
+            columns = tuple(self.names())
+            op = self.expect_symbol('=', '<', '>', '<=', '>=')
+            if self.accept_word('token'):
+                self.expect_symbol('(')
+                terms = [self.term()]
+                while self.accept_symbol(','):
+                    terms.append(self.term())
+
+                self.expect_symbol(')')
+                term = TupleTerm(terms)
+
+            else:
+                term = self.term()
+
+            return Relation(columns, op, term, token=True)
+
+        column = self.name()
+        if self.accept_word('in'):
+            return Relation((column,), 'in', self.term())
+
+        if self.accept_word('contains'):
+            if self.accept_word('key'):
+                return Relation((column,), 'contains_key', self.term())
+
+            return Relation((column,), 'contains', self.term())
+
+        if self.accept_word('like'):
+            return Relation((column,), 'like', self.term())
+
+        op = self.expect_symbol('=', '<', '>', '<=', '>=', '!=')
+        return Relation((column,), op, self.term())
+
+    def where(self):
+        relations = []
+        if self.accept_word('where'):
+            relations.append(self.relation())
+            while self.accept_word('and'):
+                relations.append(self.relation())
+
+        return relations
+
+    def using(self):
+        if self.accept_word('using'):
+            while True:
+                self.expect_word('ttl', 'timestamp')
+                self.term()
+                if not self.accept_word('and'):
+                    break
+
+    def parse(self):
+        statement = self.statement()
+        self.accept_symbol(';')
+        if 'end' != self.peek()[0]:
+            self.error()
+
+        return statement
+
+    def statement(self):
+        word = self.expect_word(
+            'select',
+            'insert',
+            'update',
+            'delete',
+            'begin',
+            'create',
+            'alter',
+            'drop',
+            'truncate',
+            'use'
+        )
+        return getattr(self, 'parse_' + word)()
+
+    def parse_select(self):
+        statement = Select()
+        if self.accept_word('distinct'):
+            statement.distinct = True
+
+        if self.accept_symbol('*'):
+            pass
+
+        else:
+            statement.columns = []
+            statement.aliases = []
+            while True:
+                if (
+                    self.is_word(*AGGREGATE_FUNCTIONS) and
+                    self.peek(1) == ('symbol', '(')
+                ):
+                    column = self.selector()
+
+                else:
+                    column = self.name()
+
+                statement.columns.append(column)
+                if self.accept_word('as'):
+                    statement.aliases.append(self.name())
+
+                elif isinstance(column, Selector):
+                    statement.aliases.append(column.name)
+
+                else:
+                    statement.aliases.append(column)
+
+                if not self.accept_symbol(','):
+                    break
+
+        self.expect_word('from')
+        self.table_name(statement)
+        statement.where = self.where()
+
+        if self.accept_words('group', 'by'):
+            statement.group_by.append(self.name())
+            while self.accept_symbol(','):
+                statement.group_by.append(self.name())
+
+        if self.accept_words('order', 'by'):
+            while True:
+                column = self.name()
+                descending = 'desc' == self.accept_word('asc', 'desc')
+                statement.order_by.append((column, descending))
+                if not self.accept_symbol(','):
+                    break
+
+        if self.accept_word('limit'):
+            statement.limit = self.term()
+
+        if self.accept_words('allow', 'filtering'):
+            statement.allow_filtering = True
+
+        return statement
+
+    def selector(self):
+        function = self.next()[1].lower()
+        self.expect_symbol('(')
+        if self.accept_symbol('*'):
+            if 'count' != function:
+                self.error('Only COUNT accepts *')
+
+            column = None
+
+        elif 'count' == function and 'literal' == self.peek()[0]:
+            self.next()
+            column = None
+
+        elif self.is_word('cast') and self.peek(1) == ('symbol', '('):
+            self.next()
+            self.expect_symbol('(')
+            column = self.name()
+            self.expect_word('as')
+            cast = self.next()[1].lower()
+            self.expect_symbol(')')
+            self.expect_symbol(')')
+            return Selector(function, column, cast)
+
+        else:
+            column = self.name()
+
+        self.expect_symbol(')')
+        return Selector(function, column)
+
+    def parse_insert(self):
+        statement = Insert()
+        self.expect_word('into')
+        self.table_name(statement)
+        statement.columns = self.names()
+        self.expect_word('values')
+        statement.values = self.term().terms
+        if len(statement.values) != len(statement.columns):
+            self.error('Unmatched column names/values')
+
+        if self.accept_words('if', 'not', 'exists'):
+            statement.if_not_exists = True
+
+        self.using()
+        return statement
+
+    def parse_update(self):
+        statement = Update()
+        self.table_name(statement)
+        self.using()
+        self.expect_word('set')
+        while True:
+            statement.assignments.append(self.assignment())
+            if not self.accept_symbol(','):
+                break
+
+        statement.where = self.where()
+        if self.accept_words('if', 'exists'):
+            statement.if_exists = True
+
+        return statement
+
+    def assignment(self):
+        column = self.name()
+        if self.accept_symbol('['):
+            key = self.term()
+            self.expect_symbol(']')
+            self.expect_symbol('=')
+            return Assignment(column, 'set_item', self.term(), key)
+
+        self.expect_symbol('=')
+        kind, value = self.peek()
+        if kind in ('name', 'word') and value.lower() not in (
+            'true', 'false', 'null'
+        ):
+            if self.name() != column:
+                self.error('Only %s can be used in its assignment' % column)
+
+            op = self.expect_symbol('+', '-')
+            return Assignment(
+                column,
+                'add' if '+' == op else 'remove',
+                self.term()
+            )
+
+        term = self.term()
+        if self.accept_symbol('+'):
+            if self.name() != column:
+                self.error('Only %s can be used in its assignment' % column)
+
+            return Assignment(column, 'prepend', term)
+
+        return Assignment(column, 'set', term)
+
+    def parse_delete(self):
+        statement = Delete()
+        if not self.is_word('from'):
+            while True:
+                column = self.name()
+                key = None
+                if self.accept_symbol('['):
+                    key = self.term()
+                    self.expect_symbol(']')
+
+                statement.columns.append((column, key))
+                if not self.accept_symbol(','):
+                    break
+
+        self.expect_word('from')
+        self.table_name(statement)
+        self.using()
+        statement.where = self.where()
+        if self.accept_words('if', 'exists'):
+            statement.if_exists = True
+
+        return statement
+
+    def parse_begin(self):
+        statement = Batch()
+        self.accept_word('unlogged', 'logged', 'counter')
+        self.expect_word('batch')
+        self.using()
+        while not self.accept_words('apply', 'batch'):
+            statement.statements.append(self.statement())
+            while self.accept_symbol(';'):
+                pass
+
+        return statement
+
+    def parse_create(self):
+        custom = bool(self.accept_word('custom'))
+        what = self.expect_word('keyspace', 'table', 'columnfamily', 'index')
+        if custom and 'index' != what:
+            self.error()
+
+        if_not_exists = self.accept_words('if', 'not', 'exists')
+
+        if 'keyspace' == what:
+            statement = CreateKeyspace()
+            statement.if_not_exists = if_not_exists
+            statement.keyspace = self.name()
+            self.expect_word('with')
+            self.properties(statement.properties)
+            return statement
+
+        if 'index' == what:
+            statement = CreateIndex()
+            statement.if_not_exists = if_not_exists
+            if not self.is_word('on'):
+                statement.name = self.name()
+
+            self.expect_word('on')
+            self.table_name(statement)
+            self.expect_symbol('(')
+            target = self.accept_word('keys', 'values', 'entries', 'full')
+            if target:
+                self.expect_symbol('(')
+                statement.column = self.name()
+                self.expect_symbol(')')
+
+            else:
+                statement.column = self.name()
+
+            statement.target = target
+            self.expect_symbol(')')
+
+            if custom:
+                self.expect_word('using')
+                kind, value = self.next()
+                statement.custom_class = value
+                if self.accept_word('with'):
+                    self.expect_word('options')
+                    self.expect_symbol('=')
+                    statement.options = self.term().bind({})
+
+            return statement
+
+        statement = CreateTable()
+        statement.if_not_exists = if_not_exists
+        self.table_name(statement)
+        self.expect_symbol('(')
+        while True:
+            if self.accept_words('primary', 'key'):
+                self.expect_symbol('(')
+                if self.is_symbol('('):
+                    statement.partition_key = self.names()
+
+                else:
+                    statement.partition_key = [self.name()]
+
+                while self.accept_symbol(','):
+                    statement.clustering_key.append(self.name())
+
+                self.expect_symbol(')')
+
+            else:
+                name = self.name()
+                statement.columns.append((name, self.cql_type()))
+                self.accept_word('static')
+                if self.accept_words('primary', 'key'):
+                    statement.partition_key = [name]
+
+            if not self.accept_symbol(','):
+                break
+
+        self.expect_symbol(')')
+
+        if self.accept_word('with'):
+            while True:
+                if self.accept_words('clustering', 'order', 'by'):
+                    self.expect_symbol('(')
+                    while True:
+                        column = self.name()
+                        statement.clustering_order[column] = (
+                            self.accept_word('asc', 'desc') or 'asc'
+                        ).upper()
+                        if not self.accept_symbol(','):
+                            break
+
+                    self.expect_symbol(')')
+
+                elif self.accept_words('compact', 'storage'):
+                    pass
+
+                else:
+                    name = self.name()
+                    self.expect_symbol('=')
+                    statement.properties[name] = self.term().bind({})
+
+                if not self.accept_word('and'):
+                    break
+
+        return statement
+
+    def parse_alter(self):
+        self.expect_word('table', 'columnfamily')
+        statement = AlterTable()
+        self.table_name(statement)
+        if self.accept_word('add'):
+            if self.accept_symbol('('):
+                while True:
+                    name = self.name()
+                    statement.add.append((name, self.cql_type()))
+                    if not self.accept_symbol(','):
+                        break
+
+                self.expect_symbol(')')
+
+            else:
+                name = self.name()
+                statement.add.append((name, self.cql_type()))
+
+        elif self.accept_word('drop'):
+            statement.drop.append(self.name())
+
+        else:
+            self.expect_word('with')
+            self.properties(statement.properties)
+
+        return statement
+
+    def parse_drop(self):
+        what = self.expect_word('keyspace', 'table', 'columnfamily', 'index')
+        statement = Drop('table' if 'columnfamily' == what else what)
+        statement.if_exists = self.accept_words('if', 'exists')
+        if 'keyspace' == what:
+            statement.keyspace = self.name()
+
+        elif 'index' == what:
+            name = self.name()
+            if self.accept_symbol('.'):
+                statement.keyspace = name
+                name = self.name()
+
+            statement.name = name
+
+        else:
+            self.table_name(statement)
+
+        return statement
+
+    def parse_truncate(self):
+        statement = Truncate()
+        self.accept_word('table', 'columnfamily')
+        self.table_name(statement)
+        return statement
+
+    def parse_use(self):
+        return Use(self.name())
+
+
+def parse(query):
+    return Parser(query).parse()
@@ -0,0 +1,1422 @@
+'''
+In-memory storage engine executing parsed CQL statements.
+
+Values are normalized by round tripping them through the driver's
+serializers so they come back exactly like they would from Cassandra
+(text as unicode, timestamps truncated to milliseconds, ...).
+Partitions are kept in token order and rows in clustering order.
+'''
+import re
+import struct
+
+from bisect import (
+    bisect_left,
+    insort
+)
+from itertools import product
+from collections import OrderedDict
+
+from cassandra import (
+    InvalidRequest,
+    AlreadyExists
+)
+from cassandra import cqltypes
+from cassandra.murmur3 import murmur3
+from cassandra.metadata import (
+    KeyspaceMetadata,
+    TableMetadata,
+    ColumnMetadata,
+    IndexMetadata,
+    protect_name
+)
+
+from .cql import Selector
+
+
+PROTOCOL_VERSION = 4
+
+SYSTEM_KEYSPACES = (
+    'system',
+    'system_schema',
+    'system_auth',
+    'system_distributed',
+    'system_traces'
+)
+
+COLLECTION_TYPES = (
+    'list',
+    'set',
+    'map'
+)
+
+
+# Bits of the integer types sums wrap around in.
+INTEGER_BITS = {
+    'int': 32,
+    'bigint': 64,
+    'smallint': 16,
+    'tinyint': 8,
+    'counter': 64
+}
+
+# Conversions of the types aggregated columns can be cast to.
+CASTS = {
+    'varint': long,
+    'double': float
+}
+
+
+def wrap_integer(value, bits):
+    value %= 1 << bits
+    if value >= 1 << (bits - 1):
+        value -= 1 << bits
+
+    return value
+
+
+def parse_type(cql_type):
+    '''
+    Returns the driver's type class for a CQL type name such as
+    "text" or "map<text, int>".
+    '''
+    cql_type = cql_type.strip()
+    if '<' not in cql_type:
+        return cqltypes._cqltypes[cql_type]
+
+    name, parameters = cql_type.split('<', 1)
+    parameters = parameters[:-1]
+
+    subtypes = []
+    depth = 0
+    start = 0
+    for index, character in enumerate(parameters):
+        if '<' == character:
+            depth += 1
+
+        elif '>' == character:
+            depth -= 1
+
+        elif ',' == character and 0 == depth:
+            subtypes.append(parameters[start:index])
+            start = index + 1
+
+    subtypes.append(parameters[start:])
+
+    name = name.strip()
+    if 'frozen' == name:
+        return parse_type(subtypes[0])
+
+    return cqltypes._cqltypes[name].apply_parameters([
+        parse_type(subtype) for subtype in subtypes
+    ])
+
+
+def get_base_type(cql_type):
+    return cql_type.split('<', 1)[0].strip()
+
+
+class Descending(object):
+    '''
+    Sort key wrapper inverting the order of a clustering column with
+    DESC clustering order.
+    '''
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __ne__(self, other):
+        return self.value != other.value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __gt__(self, other):
+        return other.value > self.value
+
+    def __le__(self, other):
+        return other.value <= self.value
+
+    def __ge__(self, other):
+        return other.value >= self.value
+
+
+class Partition(object):
+    def __init__(self, key, token):
+        self.key = key
+        self.token = token
+        self.rows = {}
+        self.order = []
+
+    def get_or_create_row(self, table, clustering, key_values):
+        row = self.rows.get(clustering)
+        if None is row:
+            row = self.rows[clustering] = dict(key_values)
+            insort(
+                self.order,
+                (table.clustering_sort_key(clustering), clustering)
+            )
+
+        return row
+
+    def delete_row(self, table, clustering):
+        if clustering not in self.rows:
+            return
+
+        del self.rows[clustering]
+        entry = (table.clustering_sort_key(clustering), clustering)
+        index = bisect_left(self.order, entry)
+        del self.order[index]
+
+    def iter_rows(self, reverse=False):
+        order = reversed(self.order) if reverse else self.order
+        for _, clustering in order:
+            yield self.rows[clustering]
+
+
+class Table(object):
+    def __init__(
+        self,
+        keyspace,
+        name,
+        columns,
+        partition_key,
+        clustering_key,
+        clustering_order
+    ):
+        self.keyspace = keyspace
+        self.name = name
+        self.columns = OrderedDict()
+        self.types = {}
+        self.partition_key = list(partition_key)
+        self.clustering_key = list(clustering_key)
+        self.descending = [
+            'DESC' == clustering_order.get(column, 'ASC').upper()
+            for column in clustering_key
+        ]
+        self.indexes = {}
+        self.partitions = {}
+        self.ring = []
+
+        for column, cql_type in columns:
+            self.add_column(column, cql_type)
+
+    def add_column(self, column, cql_type):
+        self.columns[column] = cql_type
+        self.types[column] = parse_type(cql_type)
+
+    @property
+    def primary_key(self):
+        return self.partition_key + self.clustering_key
+
+    @property
+    def regular_columns(self):
+        primary_key = set(self.primary_key)
+        return sorted(
+            column for column in self.columns
+            if column not in primary_key
+        )
+
+    @property
+    def all_columns(self):
+        return self.primary_key + self.regular_columns
+
+    def get_index(self, column, custom=False):
+        for index in self.indexes.values():
+            if column == index['column'] and (
+                not custom or index['custom_class']
+            ):
+                return index
+
+        return None
+
+    def check_column(self, column):
+        if column not in self.columns:
+            raise InvalidRequest(
+                'Undefined column name %s in table %s.%s' % (
+                    column,
+                    self.keyspace,
+                    self.name
+                )
+            )
+
+    def normalize(self, column, value):
+        if None is value:
+            return None
+
+        cql_type = self.types[column]
+        try:
+            value = cql_type.deserialize(
+                cql_type.serialize(value, PROTOCOL_VERSION),
+                PROTOCOL_VERSION
+            )
+
+        except Exception as e:
+            raise InvalidRequest(
+                'Invalid value %r for column %s of type %s: %s' % (
+                    value,
+                    column,
+                    self.columns[column],
+                    e
+                )
+            )
+
+        if (
+            get_base_type(self.columns[column]) in COLLECTION_TYPES and
+            not value
+        ):
+            return None
+
+        return value
+
+    def token(self, key):
+        if 1 == len(key):
+            serialized = self.types[self.partition_key[0]].serialize(
+                key[0],
+                PROTOCOL_VERSION
+            )
+
+        else:
+            serialized = ''.join(
+                struct.pack('>H', len(component)) + component + '\x00'
+                for component in (
+                    self.types[column].serialize(value, PROTOCOL_VERSION)
+                    for column, value in zip(self.partition_key, key)
+                )
+            )
+
+        return murmur3(serialized)
+
+    def clustering_sort_key(self, clustering):
+        return tuple(
+            Descending(value) if descending else value
+            for value, descending in zip(clustering, self.descending)
+        )
+
+    def get_partition(self, key, create=False):
+        partition = self.partitions.get(key)
+        if None is partition and create:
+            token = self.token(key)
+            partition = self.partitions[key] = Partition(key, token)
+            insort(self.ring, (token, key))
+
+        return partition
+
+    def delete_partition(self, key):
+        partition = self.partitions.pop(key, None)
+        if None is partition:
+            return
+
+        index = bisect_left(self.ring, (partition.token, key))
+        del self.ring[index]
+
+    def iter_partitions(self):
+        for _, key in self.ring:
+            yield self.partitions[key]
+
+    def truncate(self):
+        self.partitions = {}
+        self.ring = []
+
+
+def like_to_regex(column, pattern, options):
+    '''
+    Like SASI only a leading and a trailing % are wildcards, and only
+    indexes in CONTAINS mode accept a leading one.
+    '''
+    starts = pattern.startswith('%')
+    ends = 1 < len(pattern) and pattern.endswith('%')
+    term = pattern[
+        1 if starts else 0:
+        -1 if ends else len(pattern)
+    ]
+    if not term:
+        raise InvalidRequest('LIKE value can\'t be empty.')
+
+    if starts and 'CONTAINS' != options.get('mode', 'PREFIX').upper():
+        raise InvalidRequest(
+            '%s LIKE \'%%<term>%s\' abbreviated form is only supported '
+            'by CONTAINS mode.' % (
+                column,
+                '%' if ends else ''
+            )
+        )
+
+    flags = re.DOTALL
+    if 'false' == str(options.get('case_sensitive', 'true')).lower():
+        flags |= re.IGNORECASE
+
+    return re.compile(
+        '^' + ('.*' if starts else '') + re.escape(term) +
+        ('.*' if ends else '') + '$',
+        flags
+    )
+
+
+def compare(op, value, other):
+    if None is value:
+        return False
+
+    if '=' == op:
+        return value == other
+
+    if '<' == op:
+        return value < other
+
+    if '>' == op:
+        return value > other
+
+    if '<=' == op:
+        return value <= other
+
+    if '>=' == op:
+        return value >= other
+
+    if '!=' == op:
+        return value != other
+
+    if 'in' == op:
+        return value in other
+
+    if 'contains' == op:
+        if isinstance(value, dict):
+            return other in value.values()
+
+        return other in value
+
+    if 'contains_key' == op:
+        return other in value
+
+    if 'like' == op:
+        return None is not other.match(value)
+
+    raise InvalidRequest('Unsupported operator %s' % (op,))
+
+
+class Store(object):
+    '''
+    All keyspaces of one in-memory cluster. Not thread safe, callers
+    serialize access.
+    '''
+    def __init__(self, metadata):
+        self.metadata = metadata
+        self.keyspaces = {}
+
+    def execute(
+        self,
+        statement,
+        parameters,
+        keyspace=None
+    ):
+        '''
+        Returns (column names, column types, rows) for SELECTs and
+        conditional statements, (None, None, None) otherwise.
+        '''
+        return getattr(self, 'execute_' + statement.kind)(
+            statement,
+            parameters,
+            keyspace
+        )
+
+    def get_keyspace(self, name):
+        tables = self.keyspaces.get(name)
+        if None is tables:
+            raise InvalidRequest('Keyspace %s does not exist' % (name,))
+
+        return tables
+
+    def get_table(self, statement, keyspace):
+        keyspace = statement.keyspace or keyspace
+        if None is keyspace:
+            raise InvalidRequest(
+                'No keyspace has been specified. USE a keyspace, or '
+                'explicitly specify keyspace.tablename'
+            )
+
+        table = self.keyspaces.get(keyspace, {}).get(statement.table)
+        if None is table:
+            raise InvalidRequest(
+                'unconfigured table %s' % (statement.table,)
+            )
+
+        return table
+
+    def bind_relations(self, table, relations, parameters):
+        bound = []
+        for relation in relations:
+            value = relation.term.bind(parameters)
+            if relation.token:
+                if list(relation.columns) != table.partition_key:
+                    raise InvalidRequest(
+                        'The token function arguments must be the '
+                        'partition key columns in order'
+                    )
+
+                if isinstance(value, tuple):
+                    value = table.token(tuple(
+                        table.normalize(column, component)
+                        for column, component in zip(
+                            table.partition_key,
+                            value
+                        )
+                    ))
+
+                bound.append((None, relation.op, value))
+                continue
+
+            column = relation.column
+            table.check_column(column)
+            base_type = get_base_type(table.columns[column])
+
+            if 'in' == relation.op:
+                value = [
+                    table.normalize(column, item) for item in value
+                ]
+
+            elif 'contains' == relation.op:
+                subtypes = table.types[column].subtypes
+                value = subtypes[-1].deserialize(
+                    subtypes[-1].serialize(value, PROTOCOL_VERSION),
+                    PROTOCOL_VERSION
+                )
+
+            elif 'contains_key' == relation.op:
+                subtype = table.types[column].subtypes[0]
+                value = subtype.deserialize(
+                    subtype.serialize(value, PROTOCOL_VERSION),
+                    PROTOCOL_VERSION
+                )
+
+            elif 'like' == relation.op:
+                index = table.get_index(column, custom=True)
+                if None is index:
+                    raise InvalidRequest(
+                        'LIKE restriction is only supported on properly '
+                        'indexed columns. %s LIKE %r is not valid.' % (
+                            column,
+                            value
+                        )
+                    )
+
+                value = like_to_regex(
+                    column,
+                    value,
+                    index['options'] or {}
+                )
+
+            elif base_type not in COLLECTION_TYPES:
+                value = table.normalize(column, value)
+
+            bound.append((column, relation.op, value))
+
+        return bound
+
+    def get_key_values(self, table, columns, bound, statement_kind):
+        '''
+        Returns the list of possible value tuples of columns restricted
+        by = or IN, or None if one of them isn't.
+        '''
+        values = []
+        for column in columns:
+            restriction = None
+            for relation_column, op, value in bound:
+                if relation_column == column and op in ('=', 'in'):
+                    restriction = [value] if '=' == op else value
+
+            if None is restriction:
+                return None
+
+            values.append(restriction)
+
+        return list(product(*values))
+
+    def execute_select(self, statement, parameters, keyspace):
+        keyspace = statement.keyspace or keyspace
+        if (
+            keyspace in SYSTEM_KEYSPACES and
+            statement.table not in self.keyspaces.get(keyspace, {})
+        ):
+            return (
+                statement.aliases or statement.columns or [],
+                [cqltypes.UTF8Type] * len(statement.columns or []),
+                []
+            )
+
+        table = self.get_table(statement, keyspace)
+        bound = self.bind_relations(table, statement.where, parameters)
+
+        partition_keys = self.get_key_values(
+            table,
+            table.partition_key,
+            bound,
+            'select'
+        )
+
+        filters = []
+        needs_filtering = False
+        for relation in bound:
+            column, op, value = relation
+            if None is column:
+                filters.append(relation)
+                continue
+
+            if (
+                None is not partition_keys and
+                column in table.partition_key
+            ):
+                continue
+
+            filters.append(relation)
+            if column in table.clustering_key:
+                if None is partition_keys:
+                    needs_filtering = True
+
+            elif column in table.partition_key:
+                needs_filtering = True
+
+            elif 'in' == op:
+                raise InvalidRequest(
+                    'IN predicates on non-primary-key columns (%s) is not '
+                    'yet supported' % (column,)
+                )
+
+            elif not ('=' == op and table.get_index(column)) and not (
+                'like' == op or
+                op in ('contains', 'contains_key') and
+                table.get_index(column)
+            ):
+                needs_filtering = True
+
+        if needs_filtering and not statement.allow_filtering:
+            raise InvalidRequest(
+                'Cannot execute this query as it might involve data '
+                'filtering and thus may have unpredictable performance. '
+                'If you want to execute this query despite the '
+                'performance unpredictability, use ALLOW FILTERING'
+            )
+
+        reverse = False
+        if statement.order_by:
+            if None is partition_keys:
+                raise InvalidRequest(
+                    'ORDER BY is only supported when the partition key '
+                    'is restricted by an EQ or an IN.'
+                )
+
+            flipped = set()
+            for position, (column, descending) in enumerate(
+                statement.order_by
+            ):
+                if (
+                    position >= len(table.clustering_key) or
+                    table.clustering_key[position] != column
+                ):
+                    raise InvalidRequest(
+                        'Order by currently only supports the ordering '
+                        'of columns following their declared order in '
+                        'the PRIMARY KEY'
+                    )
+
+                flipped.add(descending != table.descending[position])
+
+            if 1 < len(flipped):
+                raise InvalidRequest('Unsupported order by relation')
+
+            reverse = flipped.pop()
+
+        if None is partition_keys:
+            partitions = table.iter_partitions()
+
+        else:
+            partitions = [
+                table.partitions[key] for key in sorted(
+                    set(partition_keys),
+                    key=table.token
+                )
+                if key in table.partitions
+            ]
+
+        limit = statement.limit.bind(parameters) if statement.limit else None
+
+        def matching_rows():
+            for partition in partitions:
+                if statement.distinct:
+                    if partition.rows:
+                        yield partition.rows[partition.order[0][1]]
+
+                    continue
+
+                for row in partition.iter_rows(reverse):
+                    for column, op, value in filters:
+                        if None is column:
+                            if not compare(op, partition.token, value):
+                                break
+
+                        elif not compare(op, row.get(column), value):
+                            break
+
+                    else:
+                        yield row
+
+        rows = matching_rows()
+        if (
+            statement.order_by and
+            None is not partition_keys and
+            1 < len(partition_keys)
+        ):
+            rows = sorted(
+                rows,
+                key=lambda row: table.clustering_sort_key(tuple(
+                    row[column] for column in table.clustering_key
+                )),
+                reverse=reverse
+            )
+
+        if None is not statement.columns and any(
+            isinstance(column, Selector) for column in statement.columns
+        ):
+            return self.aggregate(table, statement, rows, limit)
+
+        if statement.group_by:
+            raise InvalidRequest(
+                'Group by is only supported with aggregate functions'
+            )
+
+        if None is statement.columns:
+            if statement.distinct:
+                columns = list(table.partition_key)
+
+            else:
+                columns = table.all_columns
+
+            names = columns
+
+        else:
+            for column in statement.columns:
+                table.check_column(column)
+
+            columns = statement.columns
+            names = statement.aliases
+
+        result = []
+        for row in rows:
+            if None is not limit and len(result) >= limit:
+                break
+
+            result.append(tuple(row.get(column) for column in columns))
+
+        return (
+            names,
+            [table.types[column] for column in columns],
+            result
+        )
+
+    def aggregate(self, table, statement, rows, limit):
+        '''
+        Evaluates the aggregate functions of statement over rows, per
+        group of the GROUP BY columns.
+        '''
+        group_by = statement.group_by
+        key_columns = table.partition_key + table.clustering_key
+        if group_by and (
+            group_by != key_columns[:len(group_by)] or
+            len(group_by) < len(table.partition_key)
+        ):
+            raise InvalidRequest(
+                'Group by currently only support groups of columns '
+                'following their declared order in the PRIMARY KEY'
+            )
+
+        types = []
+        for column in statement.columns:
+            if isinstance(column, Selector):
+                if None is not column.column:
+                    table.check_column(column.column)
+
+                if 'count' == column.function:
+                    types.append(cqltypes.LongType)
+
+                elif None is not column.cast:
+                    types.append(parse_type(column.cast))
+
+                else:
+                    types.append(table.types[column.column])
+
+            else:
+                table.check_column(column)
+                types.append(table.types[column])
+
+        groups = OrderedDict()
+        for row in rows:
+            key = tuple(row.get(column) for column in group_by)
+            groups.setdefault(key, []).append(row)
+
+        # Without GROUP BY there's a result row even if no row matched.
+        if not group_by and not groups:
+            groups[()] = []
+
+        def evaluate(column, group_rows):
+            if not isinstance(column, Selector):
+                return group_rows[0].get(column) if group_rows else None
+
+            if None is column.column:
+                return len(group_rows)
+
+            values = [
+                row[column.column] for row in group_rows
+                if None is not row.get(column.column)
+            ]
+            if 'count' == column.function:
+                return len(values)
+
+            if 'min' == column.function:
+                return min(values) if values else None
+
+            if 'max' == column.function:
+                return max(values) if values else None
+
+            if None is not column.cast:
+                cast = CASTS[column.cast]
+                total = sum((cast(value) for value in values), cast(0))
+
+            else:
+                total = sum(values, 0)
+
+                # Sums have the type of the column and wrap around.
+                bits = INTEGER_BITS.get(
+                    table.types[column.column].typename
+                )
+                if None is not bits:
+                    total = wrap_integer(total, bits)
+
+            if 'sum' == column.function or not values:
+                return total
+
+            # Like Cassandra's, averages of integers are integers.
+            if isinstance(total, (int, long)):
+                quotient = abs(total) // len(values)
+                return quotient if 0 <= total else -quotient
+
+            return total / len(values)
+
+        results = []
+        for group_rows in groups.itervalues():
+            if None is not limit and len(results) >= limit:
+                break
+
+            results.append(tuple(
+                evaluate(column, group_rows)
+                for column in statement.columns
+            ))
+
+        return (
+            statement.aliases,
+            types,
+            results
+        )
+
+    def get_primary_keys(self, table, bound, statement_kind):
+        partition_keys = self.get_key_values(
+            table,
+            table.partition_key,
+            bound,
+            statement_kind
+        )
+        if None is partition_keys:
+            raise InvalidRequest(
+                'Some partition key parts are missing: %s' % (
+                    ', '.join(table.partition_key),
+                )
+            )
+
+        clustering_keys = self.get_key_values(
+            table,
+            table.clustering_key,
+            bound,
+            statement_kind
+        )
+
+        return partition_keys, clustering_keys
+
+    def conditional_result(self, applied, table, row=None):
+        names = ['[applied]']
+        types = [cqltypes.BooleanType]
+        values = [applied]
+        if not applied and None is not row:
+            for column in table.all_columns:
+                names.append(column)
+                types.append(table.types[column])
+                values.append(row.get(column))
+
+        return names, types, [tuple(values)]
+
+    def get_row(self, table, partition_key, clustering_key):
+        partition = table.partitions.get(partition_key)
+        if None is partition:
+            return None
+
+        return partition.rows.get(clustering_key)
+
+    def execute_insert(self, statement, parameters, keyspace):
+        table = self.get_table(statement, keyspace)
+
+        values = {}
+        for column, term in zip(statement.columns, statement.values):
+            table.check_column(column)
+            values[column] = table.normalize(column, term.bind(parameters))
+
+        for column in table.primary_key:
+            if None is values.get(column):
+                raise InvalidRequest(
+                    'Missing mandatory PRIMARY KEY part %s' % (column,)
+                )
+
+        partition_key = tuple(
+            values[column] for column in table.partition_key
+        )
+        clustering_key = tuple(
+            values[column] for column in table.clustering_key
+        )
+
+        if statement.if_not_exists:
+            existing = self.get_row(table, partition_key, clustering_key)
+            if None is not existing:
+                return self.conditional_result(False, table, existing)
+
+        partition = table.get_partition(partition_key, create=True)
+        row = partition.get_or_create_row(
+            table,
+            clustering_key,
+            (
+                (column, values[column])
+                for column in table.primary_key
+            )
+        )
+
+        for column, value in values.iteritems():
+            if None is value:
+                row.pop(column, None)
+
+            else:
+                row[column] = value
+
+        if statement.if_not_exists:
+            return self.conditional_result(True, table)
+
+        return None, None, None
+
+    def apply_assignment(self, table, row, assignment, parameters):
+        column = assignment.column
+        table.check_column(column)
+        if column in table.primary_key:
+            raise InvalidRequest(
+                'PRIMARY KEY part %s found in SET part' % (column,)
+            )
+
+        cql_type = table.columns[column]
+        base_type = get_base_type(cql_type)
+        value = assignment.term.bind(parameters)
+        current = row.get(column)
+
+        if 'set' == assignment.op:
+            value = table.normalize(column, value)
+
+        elif 'set_item' == assignment.op:
+            key = assignment.key.bind(parameters)
+            if 'map' == base_type:
+                value = dict(current or {})
+                value[key] = assignment.term.bind(parameters)
+
+            elif 'list' == base_type:
+                value = list(current or [])
+                try:
+                    value[key] = assignment.term.bind(parameters)
+
+                except IndexError:
+                    raise InvalidRequest(
+                        'List index %d out of bound, list has size %d' % (
+                            key,
+                            len(value)
+                        )
+                    )
+
+            else:
+                raise InvalidRequest(
+                    'Invalid operation for non map/list column %s' % (
+                        column,
+                    )
+                )
+
+            value = table.normalize(column, value)
+
+        elif 'counter' == base_type:
+            if 'prepend' == assignment.op:
+                raise InvalidRequest(
+                    'Invalid operation for counter column %s' % (column,)
+                )
+
+            value = int(value or 0)
+            if 'remove' == assignment.op:
+                value = -value
+
+            value = (current or 0) + value
+
+        elif 'list' == base_type:
+            value = list(value or [])
+            if 'add' == assignment.op:
+                value = list(current or []) + value
+
+            elif 'prepend' == assignment.op:
+                value = value + list(current or [])
+
+            else:
+                removed = table.normalize(column, value) or []
+                value = [
+                    item for item in (current or []) if item not in removed
+                ]
+
+            value = table.normalize(column, value)
+
+        elif 'set' == base_type:
+            value = table.normalize(column, set(value or ())) or set()
+            if 'add' == assignment.op:
+                value = set(current or ()) | set(value)
+
+            elif 'remove' == assignment.op:
+                value = set(current or ()) - set(value)
+
+            else:
+                raise InvalidRequest(
+                    'Invalid operation for set column %s' % (column,)
+                )
+
+            value = table.normalize(column, value)
+
+        elif 'map' == base_type:
+            if 'add' == assignment.op:
+                merged = dict(current or {})
+                merged.update(value or {})
+                value = table.normalize(column, merged)
+
+            elif 'remove' == assignment.op:
+                key_type = table.types[column].subtypes[0]
+                removed = set(
+                    key_type.deserialize(
+                        key_type.serialize(key, PROTOCOL_VERSION),
+                        PROTOCOL_VERSION
+                    ) for key in (value or ())
+                )
+                value = table.normalize(column, dict(
+                    (key, item) for key, item in (current or {}).items()
+                    if key not in removed
+                ))
+
+            else:
+                raise InvalidRequest(
+                    'Invalid operation for map column %s' % (column,)
+                )
+
+        else:
+            raise InvalidRequest(
+                'Invalid operation (%s = %s %s ...) for non counter '
+                'column %s' % (
+                    column,
+                    column,
+                    '+' if 'add' == assignment.op else '-',
+                    column
+                )
+            )
+
+        if None is value:
+            row.pop(column, None)
+
+        else:
+            row[column] = value
+
+    def execute_update(self, statement, parameters, keyspace):
+        table = self.get_table(statement, keyspace)
+        bound = self.bind_relations(table, statement.where, parameters)
+        partition_keys, clustering_keys = self.get_primary_keys(
+            table,
+            bound,
+            'update'
+        )
+        if None is clustering_keys:
+            raise InvalidRequest(
+                'Some clustering keys are missing: %s' % (
+                    ', '.join(table.clustering_key),
+                )
+            )
+
+        if statement.if_exists:
+            for partition_key, clustering_key in product(
+                partition_keys,
+                clustering_keys
+            ):
+                if None is self.get_row(
+                    table,
+                    partition_key,
+                    clustering_key
+                ):
+                    return self.conditional_result(False, table)
+
+        for partition_key, clustering_key in product(
+            partition_keys,
+            clustering_keys
+        ):
+            partition = table.get_partition(partition_key, create=True)
+            row = partition.get_or_create_row(
+                table,
+                clustering_key,
+                zip(table.primary_key, partition_key + clustering_key)
+            )
+
+            for assignment in statement.assignments:
+                self.apply_assignment(table, row, assignment, parameters)
+
+        if statement.if_exists:
+            return self.conditional_result(True, table)
+
+        return None, None, None
+
+    def execute_delete(self, statement, parameters, keyspace):
+        table = self.get_table(statement, keyspace)
+        bound = self.bind_relations(table, statement.where, parameters)
+        partition_keys, clustering_keys = self.get_primary_keys(
+            table,
+            bound,
+            'delete'
+        )
+
+        clustering_filters = [
+            (column, op, value) for column, op, value in bound
+            if column in table.clustering_key
+        ]
+
+        if statement.if_exists:
+            found = False
+            for partition_key in partition_keys:
+                partition = table.partitions.get(partition_key)
+                if None is not partition and partition.rows:
+                    found = True
+
+            if not found:
+                return self.conditional_result(False, table)
+
+        for partition_key in partition_keys:
+            partition = table.partitions.get(partition_key)
+            if None is partition:
+                continue
+
+            if None is not clustering_keys:
+                rows = [
+                    partition.rows[clustering_key]
+                    for clustering_key in clustering_keys
+                    if clustering_key in partition.rows
+                ]
+
+            else:
+                rows = [
+                    row for row in partition.iter_rows()
+                    if all(
+                        compare(op, row.get(column), value)
+                        for column, op, value in clustering_filters
+                    )
+                ]
+
+            for row in rows:
+                clustering_key = tuple(
+                    row[column] for column in table.clustering_key
+                )
+                if not statement.columns:
+                    partition.delete_row(table, clustering_key)
+                    continue
+
+                for column, key in statement.columns:
+                    table.check_column(column)
+                    if None is key:
+                        row.pop(column, None)
+                        continue
+
+                    current = row.get(column)
+                    if current:
+                        current = dict(current)
+                        current.pop(key.bind(parameters), None)
+                        current = table.normalize(column, current)
+
+                    if None is current:
+                        row.pop(column, None)
+
+                    else:
+                        row[column] = current
+
+            if not partition.rows:
+                table.delete_partition(partition_key)
+
+        if statement.if_exists:
+            return self.conditional_result(True, table)
+
+        return None, None, None
+
+    def execute_batch(self, statement, parameters, keyspace):
+        for child in statement.statements:
+            self.execute(child, parameters, keyspace)
+
+        return None, None, None
+
+    def execute_create_keyspace(self, statement, parameters, keyspace):
+        name = statement.keyspace
+        if name in self.keyspaces:
+            if statement.if_not_exists:
+                return None, None, None
+
+            raise AlreadyExists(keyspace=name)
+
+        replication = dict(statement.properties.get('replication', {}))
+        strategy_class = replication.pop(
+            'class',
+            'SimpleStrategy'
+        ).split('.')[-1]
+        durable_writes = statement.properties.get('durable_writes', True)
+        if isinstance(durable_writes, basestring):
+            durable_writes = 'true' == durable_writes.lower()
+
+        self.keyspaces[name] = {}
+        self.metadata.keyspaces[name] = KeyspaceMetadata(
+            name,
+            durable_writes,
+            strategy_class,
+            replication
+        )
+
+        return None, None, None
+
+    def execute_create_table(self, statement, parameters, keyspace):
+        keyspace = statement.keyspace or keyspace
+        tables = self.get_keyspace(keyspace)
+        if statement.table in tables:
+            if statement.if_not_exists:
+                return None, None, None
+
+            raise AlreadyExists(keyspace=keyspace, table=statement.table)
+
+        if not statement.partition_key:
+            raise InvalidRequest('No PRIMARY KEY specified')
+
+        table = Table(
+            keyspace,
+            statement.table,
+            statement.columns,
+            statement.partition_key,
+            statement.clustering_key,
+            statement.clustering_order
+        )
+        for column in table.primary_key:
+            table.check_column(column)
+            if get_base_type(table.columns[column]) in COLLECTION_TYPES:
+                raise InvalidRequest(
+                    'Invalid collection type for PRIMARY KEY '
+                    'component %s' % (column,)
+                )
+
+        tables[statement.table] = table
+
+        table_metadata = TableMetadata(
+            keyspace,
+            statement.table,
+            options=dict(statement.properties)
+        )
+        for column, cql_type in statement.columns:
+            table_metadata.columns[column] = ColumnMetadata(
+                table_metadata,
+                column,
+                cql_type,
+                is_reversed=(
+                    'DESC' == statement.clustering_order.get(column, 'ASC')
+                )
+            )
+
+        table_metadata.partition_key = [
+            table_metadata.columns[column] for column in table.partition_key
+        ]
+        table_metadata.clustering_key = [
+            table_metadata.columns[column]
+            for column in table.clustering_key
+        ]
+        self.metadata.keyspaces[keyspace].tables[statement.table] = (
+            table_metadata
+        )
+
+        return None, None, None
+
+    def execute_create_index(self, statement, parameters, keyspace):
+        keyspace = statement.keyspace or keyspace
+        table = self.get_table(statement, keyspace)
+        table.check_column(statement.column)
+
+        name = statement.name
+        if None is name:
+            # Like Cassandra, default names get a numeric suffix when
+            # taken, but the same index can't be created twice.
+            name = base_name = '%s_%s_idx' % (
+                statement.table,
+                statement.column
+            )
+            suffix = 0
+            while name in table.indexes:
+                suffix += 1
+                name = '%s_%d' % (base_name, suffix)
+
+        if name in table.indexes or (
+            None is statement.name and any(
+                statement.column == index['column'] and
+                statement.custom_class == index['custom_class']
+                for index in table.indexes.values()
+            )
+        ):
+            if statement.if_not_exists:
+                return None, None, None
+
+            raise InvalidRequest('Index %s already exists' % (name,))
+
+        if statement.column in table.partition_key and 1 == len(
+            table.partition_key
+        ):
+            raise InvalidRequest(
+                'Cannot create secondary index on partition key '
+                'column %s' % (statement.column,)
+            )
+
+        table.indexes[name] = {
+            'column': statement.column,
+            'target': statement.target,
+            'custom_class': statement.custom_class,
+            'options': statement.options
+        }
+
+        target = protect_name(statement.column)
+        if statement.target and 'full' != statement.target:
+            target = '%s(%s)' % (statement.target, target)
+
+        index_options = {'target': target}
+        if statement.custom_class:
+            index_options['class_name'] = statement.custom_class
+            index_options.update(statement.options)
+
+        index_metadata = IndexMetadata(
+            keyspace,
+            statement.table,
+            name,
+            'CUSTOM' if statement.custom_class else 'COMPOSITES',
+            index_options
+        )
+        keyspace_metadata = self.metadata.keyspaces[keyspace]
+        keyspace_metadata.tables[statement.table].indexes[name] = (
+            index_metadata
+        )
+        keyspace_metadata.indexes[name] = index_metadata
+
+        return None, None, None
+
+    def execute_alter_table(self, statement, parameters, keyspace):
+        keyspace = statement.keyspace or keyspace
+        table = self.get_table(statement, keyspace)
+        table_metadata = self.metadata.keyspaces[keyspace].tables[
+            statement.table
+        ]
+
+        for column, cql_type in statement.add:
+            if column in table.columns:
+                raise InvalidRequest(
+                    'Invalid column name %s because it conflicts with '
+                    'an existing column' % (column,)
+                )
+
+            table.add_column(column, cql_type)
+            table_metadata.columns[column] = ColumnMetadata(
+                table_metadata,
+                column,
+                cql_type
+            )
+
+        for column in statement.drop:
+            table.check_column(column)
+            if column in table.primary_key:
+                raise InvalidRequest(
+                    'Cannot drop PRIMARY KEY part %s' % (column,)
+                )
+
+            del table.columns[column]
+            del table.types[column]
+            del table_metadata.columns[column]
+            for partition in table.partitions.values():
+                for row in partition.rows.values():
+                    row.pop(column, None)
+
+        table_metadata.options.update(statement.properties)
+        return None, None, None
+
+    def execute_drop(self, statement, parameters, keyspace):
+        if 'keyspace' == statement.what:
+            if statement.keyspace not in self.keyspaces:
+                if statement.if_exists:
+                    return None, None, None
+
+                raise InvalidRequest(
+                    'Cannot drop non existing keyspace \'%s\'.' % (
+                        statement.keyspace,
+                    )
+                )
+
+            del self.keyspaces[statement.keyspace]
+            del self.metadata.keyspaces[statement.keyspace]
+            return None, None, None
+
+        if 'index' == statement.what:
+            keyspace = statement.keyspace or keyspace
+            for table in self.keyspaces.get(keyspace, {}).values():
+                if statement.name in table.indexes:
+                    del table.indexes[statement.name]
+                    keyspace_metadata = self.metadata.keyspaces[keyspace]
+                    del keyspace_metadata.tables[table.name].indexes[
+                        statement.name
+                    ]
+                    keyspace_metadata.indexes.pop(statement.name, None)
+                    return None, None, None
+
+            if statement.if_exists:
+                return None, None, None
+
+            raise InvalidRequest(
+                'Index \'%s\' could not be found in any of the tables '
+                'of keyspace \'%s\'' % (statement.name, keyspace)
+            )
+
+        keyspace = statement.keyspace or keyspace
+        tables = self.keyspaces.get(keyspace, {})
+        if statement.table not in tables:
+            if statement.if_exists:
+                return None, None, None
+
+            raise InvalidRequest(
+                'unconfigured table %s' % (statement.table,)
+            )
+
+        del tables[statement.table]
+        keyspace_metadata = self.metadata.keyspaces[keyspace]
+        table_metadata = keyspace_metadata.tables.pop(statement.table)
+        for name in table_metadata.indexes:
+            keyspace_metadata.indexes.pop(name, None)
+
+        return None, None, None
+
+    def execute_truncate(self, statement, parameters, keyspace):
+        self.get_table(statement, keyspace).truncate()
+        return None, None, None
+
+    def execute_use(self, statement, parameters, keyspace):
+        self.get_keyspace(statement.keyspace)
+        return None, None, None
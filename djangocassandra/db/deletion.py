@@ -0,0 +1,100 @@
+from django.db import router
+from django.db.models import (
+    Q,
+    signals,
+    sql
+)
+from django.db.models.deletion import Collector
+from django.db.models.sql.constants import NO_RESULTS
+
+
+class CassandraCollector(Collector):
+    '''
+    Collector deleting the instances it collected with a single DELETE
+    query per model, instead of one per hundred primary keys. The
+    backend deletes them by key, with unlogged batches per partition
+    run concurrently, and reads the related rows cascaded to with
+    concurrent single partition or index lookups.
+    '''
+    def delete(self):
+        # Cassandra has neither transactions nor constraints, instances
+        # aren't sorted and nothing is deferred to a commit.
+        for model, obj in self.instances_with_model():
+            if not model._meta.auto_created:
+                signals.pre_delete.send(
+                    sender=model,
+                    instance=obj,
+                    using=self.using
+                )
+
+        for queryset in self.fast_deletes:
+            queryset._raw_delete(using=self.using)
+
+        for model, field_updates in self.field_updates.iteritems():
+            query = sql.UpdateQuery(model)
+            for (field, value), instances in field_updates.iteritems():
+                query.update_batch(
+                    [obj.pk for obj in instances],
+                    {field.name: value},
+                    self.using
+                )
+
+        for model, instances in self.data.iteritems():
+            self.delete_instances(
+                model,
+                instances
+            )
+
+            if not model._meta.auto_created:
+                for obj in instances:
+                    signals.post_delete.send(
+                        sender=model,
+                        instance=obj,
+                        using=self.using
+                    )
+
+        for model, field_updates in self.field_updates.iteritems():
+            for (field, value), instances in field_updates.iteritems():
+                for obj in instances:
+                    setattr(obj, field.attname, value)
+
+        for model, instances in self.data.iteritems():
+            for instance in instances:
+                setattr(instance, model._meta.pk.attname, None)
+
+    def delete_instances(
+        self,
+        model,
+        instances
+    ):
+        query = sql.DeleteQuery(model)
+        query.add_q(Q(**{
+            '%s__in' % (model._meta.pk.attname,): [
+                instance.pk for instance in instances
+            ]
+        }))
+        query.get_compiler(self.using).execute_sql(NO_RESULTS)
+
+
+def delete_instance(
+    instance,
+    using=None
+):
+    '''
+    Model.delete() with a CassandraCollector.
+    '''
+    using = using or router.db_for_write(
+        instance.__class__,
+        instance=instance
+    )
+    assert None is not instance._get_pk_val(), (
+        '%s object can\'t be deleted because its %s attribute is set '
+        'to None.' % (
+            instance._meta.object_name,
+            instance._meta.pk.attname
+        )
+    )
+
+    collector = CassandraCollector(using=using)
+    collector.collect([instance])
+    collector.delete()
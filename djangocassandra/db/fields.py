@@ -1,13 +1,13 @@
 import uuid
 
-from math import log10, floor
-from datetime import datetime
+from django.core import checks
 from django.utils.six import with_metaclass
 from django.db.models import (
     Field,
     AutoField,
     SubfieldBase,
     CharField,
+    IntegerField,
     ForeignKey,
     DateTimeField as DjangoDateTimeField
 )
@@ -21,26 +21,84 @@ from .values import PrimaryKeyValue
 class DateTimeField(DjangoDateTimeField):
     def get_prep_value(self, value):
         # Hack cassandra truncates microseconds to milliseconds.
-        microsecond = value.microsecond
-        if 0 != microsecond:
-            microsecond = round(
-                value.microsecond,
-                -int(floor(log10(abs(value.microsecond)))) + 2
-            )
-            value = datetime(
-                value.year,
-                value.month,
-                value.day,
-                value.hour,
-                value.minute,
-                value.second,
-                int(microsecond),
-                value.tzinfo
-            )
+        if None is not value:
+            remainder = value.microsecond % 1000
+            if 0 != remainder:
+                value = value.replace(
+                    microsecond=value.microsecond - remainder
+                )
 
         return super(DateTimeField, self).get_prep_value(value)
 
 
+class CounterField(IntegerField):
+    '''
+    Cassandra counter column. Counters can't be set, only incremented
+    or decremented: update(views=F('views') + n) is sent as a single
+    UPDATE ... SET "views" = "views" + ?, and saving an instance adds
+    the difference between its value and the value it was read with.
+
+    Cassandra doesn't allow counters and regular columns in the same
+    table, a model with counters only has its primary key besides.
+    Only ColumnFamilyModel keeps the values counters were read with,
+    the field can't be used on other models.
+    '''
+    description = _('Counter')
+
+    def __init__(
+        self,
+        *args,
+        **kwargs
+    ):
+        kwargs.setdefault('default', 0)
+
+        super(CounterField, self).__init__(
+            *args,
+            **kwargs
+        )
+
+    def get_internal_type(self):
+        return 'CounterField'
+
+    def check(self, **kwargs):
+        errors = super(CounterField, self).check(**kwargs)
+
+        from .models import ColumnFamilyModel
+        if not issubclass(self.model, ColumnFamilyModel):
+            errors.append(checks.Error(
+                'CounterField can only be used on a ColumnFamilyModel.',
+                hint=(
+                    'Saving an instance adds the difference with the '
+                    'value the counter was read with, which only '
+                    'ColumnFamilyModel keeps.'
+                ),
+                obj=self,
+                id='djangocassandra.E001'
+            ))
+
+        return errors
+
+    @property
+    def saved_attname(self):
+        return '_%s_saved' % (self.attname,)
+
+    def get_increment(self, instance):
+        '''
+        Returns the amount the counter of instance changed since it was
+        read or saved.
+        '''
+        return (
+            (getattr(instance, self.attname) or 0) -
+            instance.__dict__.get(self.saved_attname, 0)
+        )
+
+    def set_saved(self, instance):
+        if self.attname in instance.__dict__:
+            instance.__dict__[self.saved_attname] = (
+                instance.__dict__[self.attname] or 0
+            )
+
+
 class TokenPartitionKeyField(Field):
     def __init__(
         self,
@@ -84,27 +142,8 @@ class TokenPartitionKeyField(Field):
         if None is instance:
             return self
 
-        if (
-            hasattr(instance, 'Cassandra') and
-            hasattr(instance.Cassandra, 'partition_keys') and
-            1 < len(instance.Cassandra.partition_keys)
-        ):
-            compound_pk = []
-            for key in instance.Cassandra.partition_keys:
-                field = instance._meta.get_field(key)
-                if isinstance(field, ForeignKey):
-                    key += '_id'
-
-                value = getattr(instance, key)
-                try:
-                    value = uuid.UUID(value)
-
-                except:
-                    pass
-
-                compound_pk.append(value)
-
-            pk = tuple(compound_pk)
+        if hasattr(instance, '_get_token_val'):
+            pk = instance._get_token_val()
 
         else:
             pk = instance.pk
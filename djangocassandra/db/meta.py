@@ -24,6 +24,7 @@ internal_type_to_column_map = {
     'OneToOneField': columns.UUID,
     'ManyToManyField': columns.UUID,
     'BigIntegerField': columns.BigInt,
+    'CounterField': columns.Counter,
     'BooleanField': columns.Boolean,
     'CharField': columns.Text,
     'CommaSeparatedIntegerField': columns.Text,
@@ -67,6 +68,74 @@ def get_cql_column_type(field):
     ]
 
 
+def get_registered_model(model):
+    '''
+    Historical models built by migrations don't carry the Cassandra
+    meta class, the model registered in the app registry does.
+    '''
+    try:
+        from django.apps import apps
+        return apps.get_model(
+            model._meta.app_label,
+            model._meta.model_name
+        )
+
+    except:
+        return model
+
+
+SASI_INDEX_CLASS = 'org.apache.cassandra.index.sasi.SASIIndex'
+SASI_ANALYZER_CLASS = (
+    'org.apache.cassandra.index.sasi.analyzer.NonTokenizingAnalyzer'
+)
+SASI_INDEX_MODES = ('PREFIX', 'CONTAINS')
+
+
+def get_sasi_indexes(model):
+    '''
+    Returns the options of the SASI indexes listed in sasi_indexes of
+    the model's Cassandra meta class by column name.
+
+    sasi_indexes is a list of field names or a dict mapping field names
+    to a dict with the index mode (PREFIX or CONTAINS, default
+    CONTAINS) and case_sensitive (default True).
+    '''
+    registered_model = get_registered_model(model)
+    sasi_indexes = getattr(
+        getattr(registered_model, 'Cassandra', None),
+        'sasi_indexes',
+        None
+    ) or {}
+
+    if not isinstance(sasi_indexes, dict):
+        sasi_indexes = dict(
+            (field_name, {}) for field_name in sasi_indexes
+        )
+
+    indexes = {}
+    for field_name, options in sasi_indexes.iteritems():
+        field = registered_model._meta.get_field(field_name)
+        mode = options.get('mode', 'CONTAINS').upper()
+        if mode not in SASI_INDEX_MODES:
+            raise DatabaseError(
+                'The SASI index mode of %s must be one of %s.' % (
+                    field_name,
+                    ', '.join(SASI_INDEX_MODES)
+                )
+            )
+
+        indexes[
+            field.db_column if
+            field.db_column else
+            field.column
+        ] = {
+            'mode': mode,
+            'case_sensitive': options.get('case_sensitive', True)
+        }
+
+    return indexes
+
+
 class CqlColumnFamilyMetaClass(CqlEngineModelMetaClass):
     __column_families__ = {}
 
@@ -85,20 +154,19 @@ class CqlColumnFamilyMetaClass(CqlEngineModelMetaClass):
     ):
         ordered_attrs = OrderedDict(attrs)
 
-        if name in CqlColumnFamilyMetaClass.__column_families__:
-            return CqlColumnFamilyMetaClass.__column_families__[name]
-
         model = attrs.get('__model__')
-        registered_model = model
-        try:
-            from django.apps import apps
-            registered_model = apps.get_model(
-                model._meta.app_label,
-                model._meta.model_name
-            )
+        registered_model = get_registered_model(model)
 
-        except:
-            pass
+        # Historical models that aren't registered change with every
+        # migration operation, their column families are built again.
+        column_family = CqlColumnFamilyMetaClass.__column_families__.get(
+            name
+        )
+        if None is not column_family and (
+            None is model or
+            get_registered_model(column_family.__model__) is registered_model
+        ):
+            return column_family
 
         if hasattr(registered_model, 'Cassandra'):
             cassandra_options = registered_model.Cassandra
@@ -297,16 +365,7 @@ def get_column_family(
 ):
     connection_settings = connection.settings_dict
 
-    registered_model = model
-    try:
-        from django.apps import apps
-        registered_model = apps.get_model(
-            model._meta.app_label,
-            model._meta.model_name
-        )
-
-    except:
-        pass
+    registered_model = get_registered_model(model)
 
     if hasattr(registered_model, 'Cassandra'):
         cassandra_options = registered_model.Cassandra
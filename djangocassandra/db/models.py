@@ -1,19 +1,71 @@
+import uuid
+
 from itertools import chain
-from collections import OrderedDict
 
 from django.apps import apps
+from django.db import connections
 from django.db.models import (
     Model as DjangoModel,
-    Manager,
-    ForeignKey
+    Manager
 )
 from django.db.models.fields import (
     FieldDoesNotExist
 )
 
+from cassandra.cqlengine import columns
+
+from .meta import get_cql_column_type
 from .fields import TokenPartitionKeyField
 from .values import PrimaryKeyValue
 from .query import QuerySet
+from .deletion import delete_instance
+from .updates import (
+    set_saved,
+    get_saved_attname,
+    COLLECTION_FIELD_KINDS
+)
+
+
+def get_denormalized_models(model):
+    '''
+    Resolves the denormalized_models of model's manager (model
+    classes, model names or (app_label, model name) tuples) to model
+    classes, leaving out model itself and its parents.
+    '''
+    denormalized_models = getattr(
+        model.objects,
+        'denormalized_models',
+        None
+    )
+    if not denormalized_models:
+        return []
+
+    resolved = []
+    for denormalized_model in denormalized_models:
+        app_label = None
+
+        if isinstance(denormalized_model, tuple):
+            app_label = denormalized_model[0]
+            denormalized_model = denormalized_model[1]
+
+        if isinstance(denormalized_model, str):
+            if None is app_label:
+                app_label = model._meta.app_label
+
+            denormalized_model = apps.get_model(
+                app_label=app_label,
+                model_name=denormalized_model
+            )
+
+        if (
+            not issubclass(denormalized_model, DjangoModel) or
+            issubclass(model, denormalized_model)
+        ):
+            continue
+
+        resolved.append(denormalized_model)
+
+    return resolved
 
 
 class ColumnFamilyManager(Manager.from_queryset(QuerySet)):
@@ -73,95 +125,203 @@ class ColumnFamilyModel(DjangoModel):
             **kwargs
         )
 
+    @classmethod
+    def _get_key_accessors(cls):
+        '''
+        Resolve the primary key and partition key fields of this model
+        once per class. Returns a tuple of:
+
+            (
+                (attname, get_prep_value) for every primary key field
+                    if the primary key is compound otherwise None,
+                (attname, is_uuid) for every partition key field,
+                frozenset of all key attnames
+            )
+        '''
+        accessors = cls.__dict__.get('_key_accessors')
+        if None is not accessors:
+            return accessors
+
+        cassandra_options = getattr(cls, 'Cassandra', None)
+        partition_keys = getattr(cassandra_options, 'partition_keys', None)
+        clustering_keys = getattr(cassandra_options, 'clustering_keys', [])
+
+        primary_key_fields = None
+        if partition_keys:
+            all_keys = [key for key in chain(
+                partition_keys,
+                clustering_keys
+            )]
+
+            if 1 < len(all_keys):
+                primary_key_fields = tuple(
+                    (field.attname, field.get_prep_value) for
+                    field in [
+                        cls._meta.get_field(key) for key in all_keys
+                    ]
+                )
+
+            partition_fields = [
+                cls._meta.get_field(key) for key in partition_keys
+            ]
+
+        else:
+            partition_fields = [cls._meta.pk]
+
+        partition_key_fields = tuple(
+            (
+                field.attname,
+                columns.UUID is get_cql_column_type(field)
+            ) for field in partition_fields
+        )
+
+        key_attnames = set(
+            attname for attname, _ in partition_key_fields
+        )
+        key_attnames.add(cls._meta.pk.attname)
+        if primary_key_fields:
+            key_attnames.update(
+                attname for attname, _ in primary_key_fields
+            )
+
+        accessors = (
+            primary_key_fields,
+            partition_key_fields,
+            frozenset(key_attnames)
+        )
+        cls._key_accessors = accessors
+        return accessors
+
+    @classmethod
+    def _get_saved_fields(cls):
+        '''
+        Returns the counter and collection fields of this model, whose
+        values as read are kept for saves to only write what changed.
+        Resolved once per class.
+        '''
+        saved_fields = cls.__dict__.get('_saved_fields')
+        if None is not saved_fields:
+            return saved_fields
+
+        saved_fields = tuple(
+            field for field in cls._meta.concrete_fields
+            if field.get_internal_type() in (
+                ('CounterField',) + COLLECTION_FIELD_KINDS
+            )
+        )
+        cls._saved_fields = saved_fields
+        return saved_fields
+
+    @classmethod
+    def from_db(
+        cls,
+        db,
+        field_names,
+        values
+    ):
+        instance = super(ColumnFamilyModel, cls).from_db(
+            db,
+            field_names,
+            values
+        )
+
+        # Saves only write what changed since counters and collections
+        # were read.
+        for field in cls._get_saved_fields():
+            set_saved(field, instance)
+
+        return instance
+
+    def refresh_from_db(
+        self,
+        *args,
+        **kwargs
+    ):
+        super(ColumnFamilyModel, self).refresh_from_db(
+            *args,
+            **kwargs
+        )
+
+        for field in self._get_saved_fields():
+            set_saved(field, self)
+
+    def __setattr__(self, name, value):
+        if name in self._get_key_accessors()[2]:
+            self.__dict__.pop('_primary_key_cache', None)
+            self.__dict__.pop('_token_cache', None)
+
+            # Counters and collections saved under another key are
+            # written whole to the new row. A key assigned to a row
+            # without one (by an insert) keeps them.
+            previous = self.__dict__.get(name)
+            if None is not previous and previous != value:
+                for field in self._get_saved_fields():
+                    self.__dict__.pop(get_saved_attname(field), None)
+
+        super(ColumnFamilyModel, self).__setattr__(name, value)
+
     def __hash__(self):
         pk_value = self._get_pk_val()
 
-        if isinstance(pk_value, dict):
-            return int(pk_value)
+        if isinstance(pk_value, PrimaryKeyValue):
+            return hash(pk_value)
 
         else:
             return super(
                 ColumnFamilyModel,
                 self
             ).__hash__()
-        
 
     def _get_pk_val(self, meta=None):
-        if (
-            hasattr(self, "Cassandra") and
-            hasattr(self.Cassandra, "partition_keys")
-        ):
-            if hasattr(self.Cassandra, "clustering_keys"):
-                all_keys = [key for key in chain(
-                    self.Cassandra.partition_keys,
-                    self.Cassandra.clustering_keys
-                )]
-
-            else:
-                all_keys = self.Cassandra.partition_keys
-
-            if 1 < len(all_keys):
-                pk_value = PrimaryKeyValue()
-                for key in all_keys:
-                    field = self._meta.get_field_by_name(key)[0]
-                    if isinstance(field, ForeignKey):
-                        key += "_id"
-
-                    pk_value[key] = field.get_prep_value(getattr(
-                        self,
-                        key
-                    ))
+        primary_key_fields = self._get_key_accessors()[0]
+        if None is not primary_key_fields:
+            pk_value = self.__dict__.get('_primary_key_cache')
+            if None is pk_value:
+                pk_value = PrimaryKeyValue(
+                    (attname, get_prep_value(getattr(self, attname)))
+                    for attname, get_prep_value in primary_key_fields
+                )
+                self.__dict__['_primary_key_cache'] = pk_value
 
-                return pk_value
+            return pk_value
 
         return super(
             ColumnFamilyModel,
             self
         )._get_pk_val(meta=meta)
-                
-    def _set_pk_val(self, value):
-        if (
-            hasattr(self, "Cassandra") and
-            hasattr(self.Cassandra, "partition_keys")
-        ):
-            if hasattr(self.Cassandra, "clustering_keys"):
-                all_keys = [field for field in chain(
-                    self.Cassandra.partition_keys,
-                    self.Cassandra.clustering_keys
-                )]
-
-            else:
-                all_keys = self.Cassandra.partition_keys
 
-            if 1 < len(all_keys):
-                if not isinstance(value, dict):
-                    raise self.PrimaryKeyInconsistencyException(
-                        "PK values must be a dict of the form "
-                        "{ field: value, ... }"
-                    )
+    def _set_pk_val(self, value):
+        primary_key_fields = self._get_key_accessors()[0]
+        if None is not primary_key_fields:
+            if not isinstance(value, (dict, PrimaryKeyValue)):
+                raise self.PrimaryKeyInconsistencyException(
+                    "PK values must be a dict of the form "
+                    "{ field: value, ... }"
+                )
 
-                items = [i for i in value.iteritems()]
+            pk_fields = [attname for attname, _ in primary_key_fields]
+            items = [i for i in value.iteritems()]
 
-                if len(items) != len(pk_fields):
-                    raise self.PrimaryKeyInconsistencyException(
-                        "Expected %s field/value pairs, recieved %s." % (
-                            len(pk_fields),
-                            len(items)
-                        )
+            if len(items) != len(pk_fields):
+                raise self.PrimaryKeyInconsistencyException(
+                    "Expected %s field/value pairs, recieved %s." % (
+                        len(pk_fields),
+                        len(items)
                     )
+                )
 
-                for field, value in items:
-                    if field not in pk_fields:
-                        raise self.PrimaryKeyInconsistencyException((
-                            "Field \"%s\" is not part of the primary key."
-                            "must be one of %s"
-                        ) % (field, pk_fields))
+            for field, value in items:
+                if field not in pk_fields:
+                    raise self.PrimaryKeyInconsistencyException((
+                        "Field \"%s\" is not part of the primary key."
+                        "must be one of %s"
+                    ) % (field, pk_fields))
 
-                # Loop twice to avoid partialy updating the key.
-                for field, value in items:
-                    setattr(self, field, value)
+            # Loop twice to avoid partialy updating the key.
+            for field, value in items:
+                setattr(self, field, value)
 
-                return None
+            return None
 
         return super(
             ColumnFamilyModel,
@@ -170,6 +330,31 @@ class ColumnFamilyModel(DjangoModel):
 
     pk = property(_get_pk_val, _set_pk_val)
 
+    def _get_token_val(self):
+        '''
+        Returns the tuple of partition key values the pk_token is
+        computed from. Cached until one of the key fields is set.
+        '''
+        token_value = self.__dict__.get('_token_cache')
+        if None is not token_value:
+            return token_value
+
+        token_value = []
+        for attname, is_uuid in self._get_key_accessors()[1]:
+            value = getattr(self, attname)
+            if is_uuid and isinstance(value, basestring):
+                try:
+                    value = uuid.UUID(value)
+
+                except ValueError:
+                    pass
+
+            token_value.append(value)
+
+        token_value = tuple(token_value)
+        self.__dict__['_token_cache'] = token_value
+        return token_value
+
     @staticmethod
     def should_denormalize(instance):
         '''
@@ -200,110 +385,53 @@ class ColumnFamilyModel(DjangoModel):
             **kwargs
         )
 
-        if hasattr(
-            self._meta.model.objects,
-            'denormalized_models'
-        ):
-            denormalized_models = self._meta.model.objects.denormalized_models
-
-        else:
-            denormalized_models = []
-
-        if (
-            None is denormalized_models or
-            0 >= len(denormalized_models)
-        ):
+        denormalized_models = get_denormalized_models(self._meta.model)
+        if not denormalized_models:
             return
 
-        for model in denormalized_models:
-            app_label = None
-
-            if isinstance(model, tuple):
-                app_label = model[0]
-                model = model[1]
-
-            if isinstance(model, str):
-                if None is app_label:
-                    app_label = self._meta.app_label
-
-                model = apps.get_model(
-                    app_label=app_label,
-                    model_name=model
-                )
-
-            if (
-                not issubclass(model, DjangoModel) or
-                isinstance(self, model)
-            ):
-                continue
-
-            if hasattr(model, 'should_denormalize'):
-                if not model.should_denormalize(self):
-                    continue
+        with connections[self._state.db].metrics.start(
+            self._meta.model,
+            'denormalize'
+        ) as sample:
+            sample.batch_size = 0
+            for model in denormalized_models:
+                if hasattr(model, 'should_denormalize'):
+                    if not model.should_denormalize(self):
+                        continue
+
+                denormalized_instance = model()
+                if hasattr(model, 'denormalize'):
+                    denormalized_instance.denormalize(
+                        self
+                    )
 
-            denormalized_instance = model()
-            if hasattr(model, 'denormalize'):
-                denormalized_instance.denormalize(
-                    self
-                )
+                else:
+                    ColumnFamilyManager.denormalize(
+                        self,
+                        denormalized_instance
+                    )
 
-            else:
-                ColumnFamilyManager.denormalize(
-                    self,
-                    denormalized_instance
+                super(ColumnFamilyModel, denormalized_instance).save(
+                    *args,
+                    **kwargs
                 )
-
-            super(ColumnFamilyModel, denormalized_instance).save(
-                *args,
-                **kwargs
-            )
+                sample.batch_size += 1
 
     def delete(
         self,
         *args,
         **kwargs
     ):
-        if hasattr(
-            self._meta.model.objects,
-            'denormalized_models'
-        ):
-            denormalized_models = self._meta.model.objects.denormalized_models
-
-        else:
-            denormalized_models = []
-
-        if (
-            None is denormalized_models or
-            0 >= len(denormalized_models)
-        ):
-            super(ColumnFamilyModel, self).delete(
+        denormalized_models = get_denormalized_models(self._meta.model)
+        if not denormalized_models:
+            delete_instance(
+                self,
                 *args,
                 **kwargs
             )
             return
 
         for model in denormalized_models:
-            app_label = None
-
-            if isinstance(model, tuple):
-                app_label = model[0]
-                model = model[1]
-
-            if isinstance(model, str):
-                if None is app_label:
-                    app_label = self._meta.app_label
-
-                model = apps.get_model(
-                    app_label=app_label,
-                    model_name=model
-                )
-
-            if (
-                not issubclass(model, DjangoModel) or
-                isinstance(self, model)
-            ):
-                continue
-
             if hasattr(model, 'should_denormalize'):
                 if not model.should_denormalize(self):
                     continue
@@ -320,15 +448,14 @@ class ColumnFamilyModel(DjangoModel):
                     denormalized_instance
                 )
 
-            super(
-                ColumnFamilyModel,
-                denormalized_instance
-            ).delete(
+            delete_instance(
+                denormalized_instance,
                 *args,
                 **kwargs
             )
 
-        super(ColumnFamilyModel, self).delete(
+        delete_instance(
+            self,
             *args,
             **kwargs
         )
@@ -1,7 +1,348 @@
-from django.db.models.query import QuerySet as DjangoQuerySet
+from collections import OrderedDict
+
+from django.db.models import Model
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.sql import Query as DjangoQuery
+from django.db.models.query import (
+    QuerySet as DjangoQuerySet,
+    ValuesQuerySet as DjangoValuesQuerySet,
+    ValuesListQuerySet as DjangoValuesListQuerySet,
+    prefetch_related_objects
+)
+
+from .deletion import CassandraCollector
+
+
+def get_related_manager(model):
+    '''
+    Returns the manager Django reads model through relations with.
+    '''
+    manager = model._default_manager
+    if not getattr(manager, 'use_for_related_fields', False):
+        manager = model._base_manager
+
+    return manager
+
+
+def prefetch_foreign_key(
+    instances,
+    field,
+    using
+):
+    '''
+    Reads the objects the ForeignKey field of instances points to with
+    a single __in lookup on their distinct keys and caches them on the
+    instances, as ForeignKey descriptors do.
+    '''
+    target = field.rel.get_related_field()
+    cache_name = field.get_cache_name()
+
+    # Keys are compared prepared, FieldUUIDs are UUIDs in the rows and
+    # strings on the instances.
+    instances_by_key = OrderedDict()
+    for instance in instances:
+        value = getattr(instance, field.attname)
+        if None is value or hasattr(instance, cache_name):
+            continue
+
+        instances_by_key.setdefault(
+            target.get_prep_value(value),
+            []
+        ).append(instance)
+
+    if not instances_by_key:
+        return
+
+    related_objects = get_related_manager(field.rel.to).using(using).filter(
+        **{'%s__in' % (target.name,): list(instances_by_key)}
+    )
+    for related_object in related_objects:
+        key = target.get_prep_value(getattr(related_object, target.attname))
+        for instance in instances_by_key.pop(key, ()):
+            setattr(instance, cache_name, related_object)
+
+    for key_instances in instances_by_key.itervalues():
+        for instance in key_instances:
+            setattr(instance, cache_name, None)
+
+
+def prefetch_reverse_foreign_key(
+    instances,
+    relation,
+    using
+):
+    '''
+    Reads the objects of the reverse ForeignKey relation of instances
+    with a single __in lookup on the distinct keys they're referred to
+    by and caches them as the related managers' results, as
+    prefetch_related does.
+    '''
+    field = relation.field
+    target = field.rel.get_related_field()
+    cache_name = field.related_query_name()
+    accessor_name = relation.get_accessor_name()
+
+    instances_by_key = OrderedDict()
+    for instance in instances:
+        if not hasattr(instance, '_prefetched_objects_cache'):
+            instance._prefetched_objects_cache = {}
+
+        if cache_name in instance._prefetched_objects_cache:
+            continue
+
+        value = getattr(instance, target.attname)
+        if None is value:
+            continue
+
+        instances_by_key.setdefault(
+            target.get_prep_value(value),
+            []
+        ).append(instance)
+
+    if not instances_by_key:
+        return
+
+    related_objects = OrderedDict((key, []) for key in instances_by_key)
+    for related_object in field.model._default_manager.using(using).filter(
+        **{'%s__in' % (field.name,): list(instances_by_key)}
+    ):
+        key = target.get_prep_value(getattr(related_object, field.attname))
+        if key in related_objects:
+            related_objects[key].append(related_object)
+
+    for key, key_instances in instances_by_key.iteritems():
+        for instance in key_instances:
+            values = list(related_objects[key])
+            for related_object in values:
+                setattr(related_object, field.get_cache_name(), instance)
+
+            queryset = getattr(instance, accessor_name).get_queryset()
+            queryset._result_cache = values
+            queryset._prefetch_done = True
+            instance._prefetched_objects_cache[cache_name] = queryset
+
+
+def prefetch_related_batch(
+    model,
+    instances,
+    lookup,
+    using
+):
+    '''
+    Prefetches lookup on instances if it names a ForeignKey or reverse
+    ForeignKey relation of model. Returns whether it did.
+    '''
+    if (
+        not isinstance(lookup, basestring) or
+        LOOKUP_SEP in lookup or
+        not all(isinstance(instance, Model) for instance in instances)
+    ):
+        return False
+
+    for field in model._meta.get_fields():
+        if field.many_to_one and field.concrete and lookup == field.name:
+            prefetch_foreign_key(
+                instances,
+                field,
+                using
+            )
+            return True
+
+        if (
+            field.one_to_many and
+            field.auto_created and
+            lookup == field.get_accessor_name()
+        ):
+            prefetch_reverse_foreign_key(
+                instances,
+                field,
+                using
+            )
+            return True
+
+    return False
+
+
+class Query(DjangoQuery):
+    '''
+    sql.Query that carries the name of the read replica (see the
+    REPLICAS database setting) the query should be read from, the
+    operation it's recorded as in the backend metrics and whether it
+    may run as a token range scan.
+    '''
+    replica = None
+    operation = None
+    scan = False
+
+    def clone(
+        self,
+        *args,
+        **kwargs
+    ):
+        obj = super(Query, self).clone(
+            *args,
+            **kwargs
+        )
+        obj.replica = self.replica
+        obj.operation = self.operation
+        obj.scan = self.scan
+        return obj
 
 
 class QuerySet(DjangoQuerySet):
+    def __init__(
+        self,
+        model=None,
+        query=None,
+        *args,
+        **kwargs
+    ):
+        if None is query:
+            query = Query(model)
+
+        super(QuerySet, self).__init__(
+            model,
+            query,
+            *args,
+            **kwargs
+        )
+
+    def using_replica(self, replica):
+        '''
+        Read the results of this QuerySet from the named read replica
+        instead of the main cluster. Writes are never routed to the
+        replica.
+        '''
+        clone = self._clone()
+        clone.query.replica = replica
+        return clone
+
+    def scan(self):
+        '''
+        Allow this QuerySet to scan the whole table even when
+        inefficient queries aren't. Filters Cassandra can't evaluate,
+        such as ranges on partition key columns, are then verified
+        client side on the rows of SCAN_SPLITS token ranges read
+        concurrently.
+        '''
+        clone = self._clone()
+        clone.query.scan = True
+        return clone
+
+    def explain(self):
+        '''
+        Returns the plan the backend follows to evaluate this QuerySet:
+        which filters become CQL WHERE clauses (and on what kind of
+        column), which are evaluated client side, whether ordering is
+        done by Cassandra or in memory, the CQL statement with its bind
+        parameters and the estimated number of partitions scanned.
+        '''
+        compiler = self.query.get_compiler(using=self.db)
+        return compiler.build_query().explain(
+            self.query.low_mark,
+            self.query.high_mark
+        )
+
+    def get(
+        self,
+        *args,
+        **kwargs
+    ):
+        clone = self._clone()
+        clone.query.operation = 'get'
+        return super(QuerySet, clone).get(
+            *args,
+            **kwargs
+        )
+
+    def exists(self):
+        if None is not self._result_cache:
+            return super(QuerySet, self).exists()
+
+        clone = self._clone()
+        clone.query.operation = 'exists'
+        return super(QuerySet, clone).exists()
+
+    def delete(self):
+        '''
+        QuerySet.delete() with a CassandraCollector.
+        '''
+        assert self.query.can_filter(), (
+            'Cannot use \'limit\' or \'offset\' with delete.'
+        )
+
+        del_query = self._clone()
+        del_query._for_write = True
+        del_query.query.select_for_update = False
+        del_query.query.select_related = False
+        del_query.query.clear_ordering(force_empty=True)
+
+        collector = CassandraCollector(using=del_query.db)
+        collector.collect(del_query)
+        collector.delete()
+
+        self._result_cache = None
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def values(self, *fields):
+        return self._clone(
+            klass=ValuesQuerySet,
+            setup=True,
+            _fields=fields
+        )
+
+    def values_list(
+        self,
+        *fields,
+        **kwargs
+    ):
+        flat = kwargs.pop('flat', False)
+        if kwargs:
+            raise TypeError(
+                'Unexpected keyword arguments to values_list: %s' % (
+                    list(kwargs),
+                )
+            )
+
+        if flat and len(fields) > 1:
+            raise TypeError(
+                '\'flat\' is not valid when values_list is called with '
+                'more than one field.'
+            )
+
+        return self._clone(
+            klass=ValuesListQuerySet,
+            setup=True,
+            flat=flat,
+            _fields=fields
+        )
+
+    def _prefetch_related_objects(self):
+        '''
+        ForeignKey and reverse ForeignKey relations are prefetched with
+        a single __in lookup on the distinct keys of the results, which
+        Cassandra reads as concurrent single partition queries. Other
+        lookups are left to Django.
+        '''
+        lookups = [
+            lookup for lookup in self._prefetch_related_lookups
+            if not prefetch_related_batch(
+                self.model,
+                self._result_cache,
+                lookup,
+                self.db
+            )
+        ]
+        if lookups:
+            prefetch_related_objects(
+                self._result_cache,
+                lookups
+            )
+
+        self._prefetch_done = True
+
     def next(self, limit=None):
         last_limit = len(self)
 
@@ -21,3 +362,31 @@ class QuerySet(DjangoQuerySet):
             new_set = new_set[:last_limit]
 
         return new_set
+
+
+class ValuesQuerySet(DjangoValuesQuerySet):
+    '''
+    values() queryset building its dicts straight from the rows
+    Cassandra returns, without instantiating the model.
+    '''
+    def iterator(self):
+        if self.query.extra_select or self.query.annotation_select:
+            return super(ValuesQuerySet, self).iterator()
+
+        compiler = self.query.get_compiler(self.db)
+        return compiler.values_iter(names=self.field_names)
+
+
+class ValuesListQuerySet(DjangoValuesListQuerySet):
+    '''
+    values_list() queryset building its tuples straight from the rows
+    Cassandra returns, without instantiating the model.
+    '''
+    def iterator(self):
+        if self.query.extra_select or self.query.annotation_select:
+            return super(ValuesListQuerySet, self).iterator()
+
+        compiler = self.query.get_compiler(self.db)
+        return compiler.values_iter(
+            flat=self.flat and 1 == len(self._fields)
+        )
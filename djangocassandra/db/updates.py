@@ -0,0 +1,181 @@
+from copy import deepcopy
+
+from .fields import CounterField
+
+
+class CollectionUpdate(object):
+    '''
+    Base of the values QuerySet.update() takes to change a ListField,
+    SetField or DictField in place instead of rewriting it:
+
+        Post.objects.filter(pk=pk).update(tags=Add('cassandra'))
+    '''
+    operation = None
+    field_kinds = ()
+
+    def __init__(self, *items):
+        self.items = items
+
+    def __repr__(self):
+        return '%s(%s)' % (
+            self.__class__.__name__,
+            ', '.join(repr(item) for item in self.items)
+        )
+
+
+class Append(CollectionUpdate):
+    '''
+    Appends items to a list: SET "c" = "c" + ?
+    '''
+    operation = 'append'
+    field_kinds = ('ListField',)
+
+
+class Prepend(CollectionUpdate):
+    '''
+    Prepends items to a list: SET "c" = ? + "c"
+    '''
+    operation = 'prepend'
+    field_kinds = ('ListField',)
+
+
+class Add(CollectionUpdate):
+    '''
+    Adds items to a set: SET "c" = "c" + ?
+    '''
+    operation = 'add'
+    field_kinds = ('SetField',)
+
+
+class Discard(CollectionUpdate):
+    '''
+    Removes items from a set, or every occurrence of them from a list:
+    SET "c" = "c" - ?
+    '''
+    operation = 'discard'
+    field_kinds = (
+        'SetField',
+        'ListField'
+    )
+
+
+class SetItem(CollectionUpdate):
+    '''
+    Sets the value of a key of a map, or of an index of a list:
+    SET "c"[?] = ?
+    '''
+    operation = 'set_item'
+    field_kinds = (
+        'DictField',
+        'ListField'
+    )
+
+    def __init__(
+        self,
+        key,
+        value
+    ):
+        super(SetItem, self).__init__(
+            key,
+            value
+        )
+        self.key = key
+        self.value = value
+
+
+class RemoveKey(CollectionUpdate):
+    '''
+    Removes keys from a map: SET "c" = "c" - ?
+    '''
+    operation = 'remove_key'
+    field_kinds = ('DictField',)
+
+
+COLLECTION_FIELD_KINDS = (
+    'ListField',
+    'SetField',
+    'DictField'
+)
+
+
+def get_saved_attname(field):
+    return '_%s_saved' % (field.attname,)
+
+
+def set_saved(
+    field,
+    instance
+):
+    '''
+    Keeps the value of a counter or collection field of instance as it
+    is stored in Cassandra, for saves to only write what changed. The
+    copy is deep, elements changed in place are changes too.
+    '''
+    if isinstance(field, CounterField):
+        field.set_saved(instance)
+        return
+
+    if field.attname in instance.__dict__:
+        value = instance.__dict__[field.attname]
+        instance.__dict__[get_saved_attname(field)] = (
+            None if None is value else deepcopy(value)
+        )
+
+
+def get_collection_updates(
+    field,
+    instance
+):
+    '''
+    Returns the CollectionUpdates writing the changes made to the
+    collection of field on instance since it was read or saved, an
+    empty list if it didn't change and None if it has to be written
+    whole.
+    '''
+    previous = instance.__dict__.get(get_saved_attname(field))
+    value = getattr(instance, field.attname)
+    if None is previous or None is value:
+        return None
+
+    kind = field.get_internal_type()
+    if 'SetField' == kind:
+        value = set(value)
+        updates = []
+        added = value - previous
+        if added:
+            updates.append(Add(*added))
+
+        removed = previous - value
+        if removed:
+            updates.append(Discard(*removed))
+
+        return updates
+
+    if 'ListField' == kind:
+        value = list(value)
+        if value == previous:
+            return []
+
+        # Elements can only be added at either end, removing some or
+        # reordering them rewrites the list.
+        size = len(previous)
+        if value[:size] == previous:
+            return [Append(*value[size:])]
+
+        if size < len(value) and value[-size:] == previous:
+            return [Prepend(*value[:-size])]
+
+        return None
+
+    if 'DictField' == kind:
+        updates = [
+            SetItem(key, item) for key, item in value.iteritems()
+            if key not in previous or previous[key] != item
+        ]
+        removed = [key for key in previous if key not in value]
+        if removed:
+            updates.append(RemoveKey(*removed))
+
+        return updates
+
+    return None
@@ -1,12 +1,91 @@
-from collections import OrderedDict
+class PrimaryKeyValue(object):
+    '''
+    Immutable composite primary key value.
 
+    Behaves like a read only ordered mapping of key name to value. The
+    hash is computed once on construction since composite keys are
+    hashed constantly by Django (collectors, related lookups, sets of
+    instances).
+    '''
+    __slots__ = (
+        '_keys',
+        '_values',
+        '_hash'
+    )
+
+    def __init__(self, items=()):
+        if hasattr(items, 'iteritems'):
+            items = items.iteritems()
+
+        keys = []
+        values = []
+        for key, value in items:
+            keys.append(key)
+            values.append(value)
+
+        object.__setattr__(self, '_keys', tuple(keys))
+        object.__setattr__(self, '_values', tuple(values))
+        object.__setattr__(self, '_hash', hash(self.to_tuple()))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('PrimaryKeyValue is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('PrimaryKeyValue is immutable')
+
+    def __reduce__(self):
+        return (PrimaryKeyValue, (self.to_tuple(),))
 
-class PrimaryKeyValue(OrderedDict):
     def __int__(self):
-        return self.__hash__()
+        return self._hash
 
     def __hash__(self):
-        return hash(self.to_tuple())
+        return self._hash
+
+    def __eq__(self, other):
+        if isinstance(other, PrimaryKeyValue):
+            return (
+                self._hash == other._hash and
+                self._keys == other._keys and
+                self._values == other._values
+            )
+
+        if isinstance(other, dict):
+            return (
+                len(self._keys) == len(other) and
+                all(
+                    key in other and other[key] == value
+                    for key, value in self.iteritems()
+                )
+            )
+
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+
+        return not result
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __getitem__(self, key):
+        try:
+            return self._values[self._keys.index(key)]
+
+        except ValueError:
+            raise KeyError(key)
+
+    def __repr__(self):
+        return 'PrimaryKeyValue(%r)' % (self.to_tuple(),)
 
     def __str__(self):
         return str(self.to_tuple())
@@ -14,6 +93,30 @@ class PrimaryKeyValue(OrderedDict):
     def __unicode__(self):
         return unicode(self.to_tuple())
 
-    def to_tuple(self):
-        return tuple(self.iteritems())
+    def get(self, key, default=None):
+        try:
+            return self[key]
+
+        except KeyError:
+            return default
+
+    def keys(self):
+        return list(self._keys)
 
+    def values(self):
+        return list(self._values)
+
+    def items(self):
+        return zip(self._keys, self._values)
+
+    def iterkeys(self):
+        return iter(self._keys)
+
+    def itervalues(self):
+        return iter(self._values)
+
+    def iteritems(self):
+        return iter(zip(self._keys, self._values))
+
+    def to_tuple(self):
+        return tuple(zip(self._keys, self._values))
@@ -36,7 +36,8 @@ setup(
         'djangocassandra',
         'djangocassandra.db',
         'djangocassandra.db.backends',
-        'djangocassandra.db.backends.cassandra'
+        'djangocassandra.db.backends.cassandra',
+        'djangocassandra.db.backends.memory'
     ],
     install_requires=[
         'django==1.8.17',
@@ -28,12 +28,17 @@ from django.db.models import (
     ForeignKey
 )
 
-from djangotoolbox.fields import DictField
+from djangotoolbox.fields import (
+    DictField,
+    ListField,
+    SetField
+)
 from djangocassandra.db.fields import (
     AutoFieldUUID,
     FieldUUID,
     PrimaryKeyField,
-    DateTimeField
+    DateTimeField,
+    CounterField
 )
 from djangocassandra.db.models import (
     ColumnFamilyModel,
@@ -270,6 +275,7 @@ class DenormalizedModelA(DenormalizedModelBase):
         clustering_keys = [
             'created'
         ]
+        route_to_denormalized = True
 
     field_1 = PrimaryKeyField(
         max_length=16,
@@ -325,3 +331,63 @@ class DictFieldModel(ColumnFamilyModel):
         CharField(max_length=4096),
         default=dict_field_default
     )
+
+
+class SASIIndexedTestModel(ColumnFamilyModel):
+    class Cassandra:
+        allow_inefficient_queries = False
+        sasi_indexes = {
+            'title': {},
+            'author': {
+                'mode': 'PREFIX',
+                'case_sensitive': False
+            }
+        }
+
+    id = AutoFieldUUID(primary_key=True)
+    title = CharField(max_length=64)
+    author = CharField(max_length=64)
+
+
+class AggregateTestModel(ColumnFamilyModel):
+    class Cassandra:
+        clustering_keys = ['minute']
+
+    sensor = CharField(
+        primary_key=True,
+        max_length=32
+    )
+    minute = IntegerField()
+    value = IntegerField()
+    parity = CharField(max_length=8)
+
+
+class CounterTestModel(ColumnFamilyModel):
+    page = CharField(
+        primary_key=True,
+        max_length=64
+    )
+    views = CounterField()
+    likes = CounterField()
+
+
+def set_field_default():
+    return set()
+
+def list_field_default():
+    return []
+
+class CollectionTestModel(ColumnFamilyModel):
+    id = AutoFieldUUID(primary_key=True)
+    tags = SetField(
+        CharField(max_length=64),
+        default=set_field_default
+    )
+    history = ListField(
+        IntegerField(),
+        default=list_field_default
+    )
+    attributes = DictField(
+        CharField(max_length=64),
+        default=dict_field_default
+    )
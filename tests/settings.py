@@ -9,7 +9,10 @@ SECRET_KEY = uuid.uuid4().hex
 
 DATABASES = {
     'default': {
-        'ENGINE': 'djangocassandra.db.backends.cassandra',
+        'ENGINE': os.environ.get(
+            'DJANGOCASSANDRA_TEST_ENGINE',
+            'djangocassandra.db.backends.cassandra'
+        ),
         'DEFAULT_KEYSPACE': 'test',
         'CONTACT_POINTS': (os.environ.get(
             'DJANGOCASSANDRA_TEST_HOST',
@@ -24,7 +27,11 @@ DATABASES = {
                 'replication_factor': 1,
                 'strategy_class': SimpleStrategy.name
             }
-        }
+        },
+        'REPLICAS': {
+            'analytics': {}
+        },
+        'COLLECT_METRICS': True
     }
 }
 
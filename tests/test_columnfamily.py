@@ -1,18 +1,23 @@
 import warnings
+import datetime
 from random import randint
 from unittest import TestCase
 
+from django.db import connections
+from django.db.models import Q
+
 from .models import (
     ColumnFamilyTestModel,
     ColumnFamilyIndexedTestModel,
     ClusterPrimaryKeyModel,
     ForeignPartitionKeyModel,
+    PartitionPrimaryKeyModel,
     DictFieldModel
 )
 
 from .util import (
     connect_db,
-    destroy_db,
+    reset_db,
     create_model
 )
 
@@ -65,7 +70,7 @@ class ColumnFamilyModelTestCase(TestCase):
         django.setup()
 
     def tearDown(self):
-        destroy_db(self.connection)
+        reset_db(self.connection)
 
     def test_token_partition_key_field_value_to_string(self):
         first_instance = ColumnFamilyTestModel.objects.all()[:1][0]
@@ -77,6 +82,27 @@ class ColumnFamilyModelTestCase(TestCase):
         result = token_field.value_to_string(first_instance)
         self.assertIsNotNone(result)
 
+    def test_token_range_scan(self):
+        query = ColumnFamilyTestModel.objects.filter(field_1__gt='foo')
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            self.assertEqual(
+                sorted(instance.pk for instance in query),
+                sorted(pk for pk in self.cached_rows if pk > 'foo')
+            )
+
+        # The partition key range is verified on the rows of every
+        # token range.
+        plan = query.explain()
+        self.assertEqual(plan['token_ranges'], 64)
+        self.assertEqual(plan['statements'], 64)
+        self.assertEqual(len(plan['client_side']), 1)
+        self.assertIn('token("field_1") > ?', plan['cql'])
+
+        # Only the selected columns are read.
+        plan = query.only('field_2').explain()
+        self.assertNotIn('"field_3"', plan['cql'])
+
 
 class ColumnFamilyTestIndexedQueriesTestCase(TestCase):
     def setUp(self):
@@ -144,7 +170,7 @@ class ColumnFamilyTestIndexedQueriesTestCase(TestCase):
         django.setup()
 
     def tearDown(self):
-        destroy_db(self.connection)
+        reset_db(self.connection)
 
     def test_partial_inefficient_get_query(self):
         all_results = ColumnFamilyIndexedTestModel.objects.all()
@@ -164,6 +190,17 @@ class ColumnFamilyTestIndexedQueriesTestCase(TestCase):
         self.assertIsNotNone(partial_inefficient_get)
         self.assertTrue(partial_inefficient_get.pk in self.cached_rows.keys())
 
+    def test_indexed_in_filter(self):
+        query = ColumnFamilyIndexedTestModel.objects.filter(
+            field_4__in=['yes', 'no', 'maybe']
+        )
+        self.assertEqual(len(list(query)), self.created_instances)
+
+        # Cassandra has no IN on indexed columns, each value is looked up.
+        plan = query.explain()
+        self.assertEqual(plan['statements'], 3)
+        self.assertEqual(plan['client_side'], [])
+
 
 class ForeignPartitionKeyModelTestCase(TestCase):
     def setUp(self):
@@ -182,17 +219,21 @@ class ForeignPartitionKeyModelTestCase(TestCase):
         )
 
     def tearDown(self):
-        destroy_db(self.connection)
+        reset_db(self.connection)
 
     def test_order_by_efficient(self):
         rel_instance = ClusterPrimaryKeyModel()
         rel_instance.auto_populate()
         rel_instance.save()
 
+        # Cassandra stores timestamps with millisecond precision, keep
+        # the clustering keys distinct however fast the inserts are.
+        created = datetime.datetime.utcnow()
         instances = []
         for i in xrange(10):
             instances.append(ForeignPartitionKeyModel.objects.create(
-                related=rel_instance
+                related=rel_instance,
+                created=created + datetime.timedelta(milliseconds=i)
             ))
 
         with warnings.catch_warnings(record=True) as w:
@@ -220,6 +261,242 @@ class ForeignPartitionKeyModelTestCase(TestCase):
             len(all_instances)
         )
 
+    def test_first_and_last(self):
+        rel_instance = ClusterPrimaryKeyModel()
+        rel_instance.auto_populate()
+        rel_instance.save()
+
+        created = datetime.datetime.utcnow().replace(microsecond=0)
+        for i in xrange(10):
+            ForeignPartitionKeyModel.objects.create(
+                related=rel_instance,
+                created=created + datetime.timedelta(milliseconds=i)
+            )
+
+        metrics = connections['default'].metrics
+        metrics.reset()
+
+        query = ForeignPartitionKeyModel.objects.filter(
+            related=rel_instance
+        )
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.assertEqual(query.first().created, created)
+            self.assertEqual(
+                query.last().created,
+                created + datetime.timedelta(milliseconds=9)
+            )
+            self.assertEqual(
+                query.latest('created').created,
+                created + datetime.timedelta(milliseconds=9)
+            )
+            self.assertEqual(query.earliest('created').created, created)
+            self.assertTrue(query.exists())
+            self.assertEqual(0, len(w))
+
+        operations = metrics.snapshot()['operations'][
+            'tests.ForeignPartitionKeyModel'
+        ]
+        self.assertEqual(operations['filter']['rows_fetched'], 2)
+        self.assertEqual(operations['get']['rows_fetched'], 2)
+        self.assertEqual(operations['exists']['rows_fetched'], 1)
+
+        # The clustering order is reversed, not sorted client side.
+        plan = query.order_by('-pk')[:1].explain()
+        self.assertEqual(plan['ordering']['pushed_down'], ['-created'])
+        self.assertEqual(plan['limit'], 1)
+        self.assertFalse(plan['inefficient'])
+
+    def test_prefetch_related(self):
+        related_instances = []
+        for i in xrange(3):
+            rel_instance = ClusterPrimaryKeyModel()
+            rel_instance.auto_populate()
+            rel_instance.save()
+            related_instances.append(rel_instance)
+
+        start = datetime.datetime(2016, 1, 1)
+        for hour in xrange(6):
+            ForeignPartitionKeyModel.objects.create(
+                related=related_instances[hour % 3],
+                created=start + datetime.timedelta(hours=hour)
+            )
+
+        metrics = connections['default'].metrics
+        metrics.reset()
+
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always', UserWarning)
+            instances = list(
+                ForeignPartitionKeyModel.objects.prefetch_related('related')
+            )
+            self.assertEqual(
+                sorted(instance.related.data for instance in instances),
+                sorted(2 * [
+                    rel_instance.data for rel_instance in related_instances
+                ])
+            )
+            for instance in instances:
+                self.assertEqual(
+                    instance.related.field_1,
+                    str(instance.related_id)
+                )
+
+            parents = list(ClusterPrimaryKeyModel.objects.prefetch_related(
+                'foreignpartitionkeymodel_set'
+            ))
+            for parent in parents:
+                children = list(parent.foreignpartitionkeymodel_set.all())
+                self.assertEqual(len(children), 2)
+                for child in children:
+                    self.assertIs(child.related, parent)
+
+            # Nothing is scanned client side.
+            self.assertEqual(0, len(w))
+
+        # Each model is read once in full and once by a prefetch, which
+        # reads the three partitions it needs with one prepared
+        # statement.
+        snapshot = metrics.snapshot()
+        for model_name, rows in (
+            ('tests.ClusterPrimaryKeyModel', 3),
+            ('tests.ForeignPartitionKeyModel', 6)
+        ):
+            operation = snapshot['operations'][model_name]['filter']
+            self.assertEqual(operation['calls'], 2)
+            self.assertEqual(operation['rows_fetched'], 2 * rows)
+
+        self.assertEqual(snapshot['statement_cache']['misses'], 2)
+
+    def test_cascading_delete(self):
+        related_instances = []
+        for i in xrange(2):
+            rel_instance = ClusterPrimaryKeyModel()
+            rel_instance.auto_populate()
+            rel_instance.save()
+            related_instances.append(rel_instance)
+
+        start = datetime.datetime(2016, 1, 1)
+        for rel_instance in related_instances:
+            for minute in xrange(50):
+                ForeignPartitionKeyModel.objects.create(
+                    related=rel_instance,
+                    created=start + datetime.timedelta(minutes=minute)
+                )
+
+        # Deleted instances lose their primary key.
+        keys = [rel_instance.pk for rel_instance in related_instances]
+
+        def count(rel_instance):
+            return len(ForeignPartitionKeyModel.objects.filter(
+                related=keys[related_instances.index(rel_instance)]
+            ))
+
+        metrics = connections['default'].metrics
+        metrics.reset()
+
+        # The children are deleted with their partition, unread.
+        related_instances[0].delete()
+        self.assertEqual(count(related_instances[0]), 0)
+        self.assertEqual(count(related_instances[1]), 50)
+
+        operations = metrics.snapshot()['operations']
+        delete = operations['tests.ForeignPartitionKeyModel']['delete']
+        self.assertEqual(delete['rows_fetched'], 0)
+        self.assertEqual(delete['calls'], 1)
+
+        # Instances are deleted by primary key, unread.
+        metrics.reset()
+        instances = list(ForeignPartitionKeyModel.objects.filter(
+            related=related_instances[1]
+        )[:2])
+        instances[0].delete()
+        ForeignPartitionKeyModel.objects.filter(
+            pk__in=[instances[1].pk]
+        ).delete()
+        self.assertEqual(count(related_instances[1]), 48)
+
+        operations = metrics.snapshot()['operations']
+        delete = operations['tests.ForeignPartitionKeyModel']['delete']
+        self.assertEqual(delete['rows_fetched'], 0)
+        self.assertEqual(delete['calls'], 2)
+
+        # Slices of a partition are read before they're deleted.
+        metrics.reset()
+        ForeignPartitionKeyModel.objects.filter(
+            related=keys[1],
+            created__gte=start + datetime.timedelta(minutes=40)
+        ).delete()
+        self.assertEqual(count(related_instances[1]), 38)
+
+        operations = metrics.snapshot()['operations']
+        delete = operations['tests.ForeignPartitionKeyModel']['delete']
+        self.assertEqual(delete['rows_fetched'], 10)
+
+    def test_exclude_efficient(self):
+        rel_instance = ClusterPrimaryKeyModel()
+        rel_instance.auto_populate()
+        rel_instance.save()
+
+        start = datetime.datetime(2016, 1, 1)
+        for hour in xrange(10):
+            ForeignPartitionKeyModel.objects.create(
+                related=rel_instance,
+                created=start + datetime.timedelta(hours=hour)
+            )
+
+        def hours(query):
+            return [
+                (instance.created - start).seconds // 3600
+                for instance in query
+            ]
+
+        with warnings.catch_warnings(record=True) as w:
+            # Excluding a time window becomes the ranges before and
+            # after it.
+            query = ForeignPartitionKeyModel.objects.filter(
+                related=rel_instance
+            ).exclude(
+                created__gte=start + datetime.timedelta(hours=2),
+                created__lt=start + datetime.timedelta(hours=8)
+            ).order_by('-created')
+            self.assertEqual(hours(query), [9, 8, 1, 0])
+
+            plan = query.explain()
+            self.assertEqual(plan['statements'], 2)
+            self.assertEqual(plan['client_side'], [])
+            self.assertFalse(plan['inefficient'])
+
+            # Excluding a single value within a slice.
+            query = ForeignPartitionKeyModel.objects.filter(
+                related=rel_instance,
+                created__gte=start + datetime.timedelta(hours=3),
+                created__lte=start + datetime.timedelta(hours=5)
+            ).exclude(
+                created=start + datetime.timedelta(hours=4)
+            )
+            self.assertEqual(sorted(hours(query)), [3, 5])
+            self.assertEqual(query.explain()['statements'], 2)
+
+            self.assertEqual(0, len(w))
+
+        # Negations of ORs are ANDs, overlapping ORs are deduplicated.
+        query = ForeignPartitionKeyModel.objects.filter(
+            related=rel_instance
+        ).exclude(
+            Q(created__lt=start + datetime.timedelta(hours=3)) |
+            Q(created__gt=start + datetime.timedelta(hours=6))
+        )
+        self.assertEqual(sorted(hours(query)), [3, 4, 5, 6])
+        self.assertEqual(query.explain()['statements'], 1)
+
+        query = ForeignPartitionKeyModel.objects.filter(
+            Q(created__lt=start + datetime.timedelta(hours=3)) |
+            Q(created__lte=start + datetime.timedelta(hours=1)),
+            related=rel_instance
+        )
+        self.assertEqual(sorted(hours(query)), [0, 1, 2])
+
 
 class TestDictFieldModel(TestCase):
     def setUp(self):
@@ -234,7 +511,7 @@ class TestDictFieldModel(TestCase):
         )
 
     def tearDown(self):
-        destroy_db(self.connection)
+        reset_db(self.connection)
 
     def test_creation(self):
         instance = DictFieldModel.objects.create(
@@ -242,3 +519,46 @@ class TestDictFieldModel(TestCase):
         )
 
         self.assertIsNotNone(instance)
+
+
+class CompositePrimaryKeyTestCase(TestCase):
+    def setUp(self):
+        import django
+        django.setup()
+
+    def test_primary_key_cached(self):
+        instance = PartitionPrimaryKeyModel()
+        instance.auto_populate()
+
+        pk = instance.pk
+        self.assertIs(pk, instance.pk)
+        self.assertEqual(hash(pk), hash(instance))
+        self.assertEqual(
+            ['field_1', 'field_2', 'field_3', 'field_4'],
+            pk.keys()
+        )
+
+    def test_primary_key_invalidated(self):
+        instance = PartitionPrimaryKeyModel()
+        instance.auto_populate()
+
+        pk = instance.pk
+        token = instance.pk_token.value
+
+        instance.field_3 = 'changed'
+        self.assertIsNot(pk, instance.pk)
+        self.assertEqual('changed', instance.pk['field_3'])
+        self.assertEqual(token, instance.pk_token.value)
+
+        instance.field_1 = 'changed'
+        self.assertEqual(
+            ('changed', instance.field_2),
+            instance.pk_token.value
+        )
+
+    def test_primary_key_immutable(self):
+        instance = PartitionPrimaryKeyModel()
+        instance.auto_populate()
+
+        with self.assertRaises(AttributeError):
+            instance.pk._values = ()
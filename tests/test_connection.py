@@ -1,8 +1,11 @@
 from unittest import TestCase
 
+from .models import ColumnFamilyTestModel
+
 from .util import (
     connect_db,
-    destroy_db
+    destroy_db,
+    create_model
 )
 
 
@@ -46,3 +49,70 @@ class ConnectionCapabilitiesTestCase(TestCase):
             keyspace,
             self.connection.current_keyspace()
         )
+
+    def test_cursor_executemany(self):
+        create_model(
+            self.connection,
+            ColumnFamilyTestModel
+        )
+
+        query = (
+            'INSERT INTO %s.%s (field_1, field_2, field_3) '
+            'VALUES (?, ?, ?)'
+        ) % (
+            self.connection.keyspace,
+            ColumnFamilyTestModel._meta.db_table
+        )
+
+        cursor = self.connection.create_cursor()
+        cursor.executemany(query, [
+            ('key%s' % (i,), 'foo', 'bar') for i in xrange(250)
+        ])
+        cursor.executemany(query, [('key0', 'foo', 'raw')])
+
+        self.assertIn(query, self.connection.prepared_statements)
+        self.assertEqual(
+            250,
+            len(ColumnFamilyTestModel.objects.all())
+        )
+
+    def test_cursor_streaming(self):
+        create_model(
+            self.connection,
+            ColumnFamilyTestModel
+        )
+
+        table_name = '%s.%s' % (
+            self.connection.keyspace,
+            ColumnFamilyTestModel._meta.db_table
+        )
+
+        cursor = self.connection.create_cursor()
+        cursor.executemany(
+            (
+                'INSERT INTO %s (field_1, field_2, field_3) '
+                'VALUES (?, ?, ?)'
+            ) % (table_name,), [
+                ('key%s' % (i,), 'foo', 'bar') for i in xrange(25)
+            ]
+        )
+
+        cursor.fetch_size = 10
+        cursor.execute(
+            'SELECT field_1, field_2 FROM %s' % (table_name,)
+        )
+
+        self.assertEqual(
+            ['field_1', 'field_2'],
+            [column[0] for column in cursor.description]
+        )
+        self.assertLessEqual(len(cursor.page), 10)
+
+        rows = cursor.fetchmany(15)
+        self.assertEqual(15, len(rows))
+        # The second page was requested with the fetchmany size.
+        self.assertEqual(15, cursor.statement.fetch_size)
+        self.assertEqual(15, len(cursor.page))
+        self.assertIsNotNone(cursor.fetchone())
+        self.assertEqual(9, len(cursor.fetchall()))
+        self.assertIsNone(cursor.fetchone())
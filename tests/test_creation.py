@@ -1,5 +1,9 @@
 from unittest import TestCase
 
+from django.db import models
+from django.db.migrations import operations
+from django.db.migrations.state import ProjectState
+
 from .util import (
     connect_db,
     destroy_db,
@@ -8,7 +12,8 @@ from .util import (
 
 from .models import (
     SimpleTestModel,
-    CustomNameTestModel
+    CustomNameTestModel,
+    ColumnFamilyIndexedTestModel
 )
 
 
@@ -16,6 +21,9 @@ class DatabaseCreationTestCase(TestCase):
     def setUp(self):
         self.connection = connect_db()
 
+        # Other test cases keep their schema between tests.
+        destroy_db(self.connection)
+
     def tearDown(self):
         destroy_db(self.connection)
 
@@ -30,3 +38,119 @@ class DatabaseCreationTestCase(TestCase):
             self.connection,
             CustomNameTestModel
         )
+
+    def test_batched_creation(self):
+        models = [
+            SimpleTestModel,
+            CustomNameTestModel,
+            ColumnFamilyIndexedTestModel
+        ]
+
+        with self.connection.schema_editor() as schema_editor:
+            for model in models:
+                schema_editor.create_model(model)
+
+            self.assertEqual(
+                len(models) + 1,
+                len(schema_editor.deferred_cql)
+            )
+
+        table_names = self.connection.introspection.table_names()
+        for model in models:
+            self.assertIn(
+                model._meta.db_table,
+                table_names
+            )
+
+    def test_schema_agreement(self):
+        cluster = self.connection.cluster
+        control_connection = cluster.control_connection
+        max_wait = cluster.max_schema_agreement_wait
+        waits = []
+
+        def wait_for_schema_agreement(wait_time=None, **kwargs):
+            waits.append((wait_time, cluster.max_schema_agreement_wait))
+            return True
+
+        control_connection.wait_for_schema_agreement = \
+            wait_for_schema_agreement
+        try:
+            with self.connection.schema_editor() as schema_editor:
+                schema_editor.create_model(SimpleTestModel)
+                schema_editor.create_model(ColumnFamilyIndexedTestModel)
+
+        finally:
+            del control_connection.wait_for_schema_agreement
+
+        # One wait for the tables and one for the index.
+        self.assertEqual(
+            [(max_wait, max_wait)] * 2,
+            waits
+        )
+        self.assertEqual(
+            max_wait,
+            cluster.max_schema_agreement_wait
+        )
+
+    def test_create_model_then_add_field(self):
+        # makemigrations adds ForeignKeys between models created in the
+        # same initial migration with AddField.
+        state = ProjectState()
+        with self.connection.schema_editor() as schema_editor:
+            for operation in [
+                operations.CreateModel(
+                    'LateFieldTestModel',
+                    [
+                        ('id', models.CharField(
+                            primary_key=True,
+                            max_length=8
+                        )),
+                        ('name', models.CharField(max_length=8))
+                    ]
+                ),
+                operations.AddField(
+                    'latefieldtestmodel',
+                    'late',
+                    models.IntegerField(null=True)
+                )
+            ]:
+                new_state = state.clone()
+                operation.state_forwards('tests', new_state)
+                operation.database_forwards(
+                    'tests',
+                    schema_editor,
+                    state,
+                    new_state
+                )
+                state = new_state
+
+        self.assertEqual(
+            sorted(
+                column.name for column in
+                self.connection.introspection.get_table_description(
+                    None,
+                    'tests_latefieldtestmodel'
+                )
+            ),
+            ['id', 'late', 'name']
+        )
+
+    def test_collect_sql(self):
+        destroy_db(self.connection)
+        keyspace = self.connection.settings_dict['DEFAULT_KEYSPACE']
+
+        with self.connection.schema_editor(
+            collect_sql=True
+        ) as schema_editor:
+            schema_editor.create_model(ColumnFamilyIndexedTestModel)
+
+        self.assertNotIn(
+            keyspace,
+            self.connection.cluster.metadata.keyspaces
+        )
+        self.assertTrue(
+            schema_editor.collected_sql[0].startswith('CREATE TABLE')
+        )
+        self.assertTrue(
+            schema_editor.collected_sql[-1].startswith('CREATE INDEX')
+        )
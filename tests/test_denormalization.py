@@ -8,7 +8,7 @@ from .models import (
 
 from .util import (
     connect_db,
-    destroy_db,
+    reset_db,
     create_model,
     random_string,
     random_integer
@@ -32,7 +32,7 @@ class DenormalizationTestCase(TestCase):
         django.setup()
 
     def tearDown(self):
-        destroy_db(self.connection)
+        reset_db(self.connection)
 
     def test_model_denormalization(self):
         instance_a = DenormalizedModelA.objects.create(
@@ -106,3 +106,66 @@ class DenormalizationTestCase(TestCase):
             len(other_instances),
             len(DenormalizedModelB.objects.all())
         )
+
+    def test_denormalized_routing(self):
+        field_2 = random_integer(maximum=999999)
+        instances = [
+            DenormalizedModelA.objects.create(
+                field_1=random_string(16),
+                field_2=field_2,
+                created=datetime(2016, 1, 1, 0, i)
+            ) for i in xrange(5)
+        ]
+        DenormalizedModelA.objects.create(
+            field_1=random_string(16),
+            field_2=field_2 + 1
+        )
+
+        # field_2 alone only restricts DenormalizedModelB's partition key.
+        query = DenormalizedModelA.objects.filter(
+            field_2=field_2
+        ).order_by('created')
+
+        plan = query.explain()
+        self.assertEqual(
+            plan['column_family'],
+            DenormalizedModelB._meta.db_table
+        )
+        self.assertEqual(
+            plan['routed_from'],
+            DenormalizedModelA._meta.db_table
+        )
+        self.assertFalse(plan['inefficient'])
+
+        results = list(query)
+        self.assertTrue(all(
+            isinstance(result, DenormalizedModelA) for result in results
+        ))
+        self.assertEqual(
+            [(result.field_1, result.created) for result in results],
+            [(instance.field_1, instance.created) for instance in instances]
+        )
+
+        plan = DenormalizedModelA.objects.filter(
+            field_1=instances[0].field_1,
+            field_2=field_2
+        ).explain()
+        self.assertIsNone(plan['routed_from'])
+
+    def test_denormalized_routing_opt_in(self):
+        query = DenormalizedModelA.objects.filter(
+            field_2=random_integer(maximum=999999)
+        ).order_by('created')
+
+        del DenormalizedModelA.Cassandra.route_to_denormalized
+        try:
+            plan = query.explain()
+
+        finally:
+            DenormalizedModelA.Cassandra.route_to_denormalized = True
+
+        self.assertIsNone(plan['routed_from'])
+        self.assertEqual(
+            plan['column_family'],
+            DenormalizedModelA._meta.db_table
+        )
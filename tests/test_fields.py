@@ -1,13 +1,33 @@
 import uuid
+import datetime
 from unittest import TestCase
 
+from django.apps.registry import Apps
+from django.db import connections
+from django.db.models import F
+from django.db.utils import DatabaseError
+
+from djangocassandra.db.fields import CounterField
+from djangocassandra.db.updates import (
+    Append,
+    Prepend,
+    Add,
+    Discard,
+    SetItem,
+    RemoveKey
+)
+
 from .models import (
-    UUIDFieldModel
+    UUIDFieldModel,
+    DateTimeTestModel,
+    CounterTestModel,
+    CollectionTestModel
 )
 
 from .util import (
     connect_db,
     destroy_db,
+    reset_db,
     create_model
 )
 
@@ -36,3 +56,210 @@ class UUIDFieldModelTestCase(TestCase):
         uuid.UUID(instance.id)
 
         UUIDFieldModel.objects.get(pk=instance.pk)
+
+
+class DateTimeFieldTestCase(TestCase):
+    def test_prep_value_truncates_to_milliseconds(self):
+        field = DateTimeTestModel._meta.get_field('datetime_field')
+
+        self.assertEqual(
+            datetime.datetime(2014, 1, 1, 0, 0, 0, 999000),
+            field.get_prep_value(
+                datetime.datetime(2014, 1, 1, 0, 0, 0, 999999)
+            )
+        )
+        self.assertEqual(
+            datetime.datetime(2014, 1, 1, 0, 0, 0, 5000),
+            field.get_prep_value(
+                datetime.datetime(2014, 1, 1, 0, 0, 0, 5678)
+            )
+        )
+        self.assertIsNone(field.get_prep_value(None))
+
+
+class CounterFieldTestCase(TestCase):
+    def setUp(self):
+        self.connection = connect_db()
+
+        create_model(
+            self.connection,
+            CounterTestModel
+        )
+
+    def tearDown(self):
+        reset_db(self.connection)
+
+    def test_increment(self):
+        metrics = connections['default'].metrics
+        metrics.reset()
+
+        query = CounterTestModel.objects.filter(pk='home')
+        query.update(views=F('views') + 3)
+        query.update(views=F('views') - 1, likes=F('likes') + 1)
+
+        operations = metrics.snapshot()['operations'][
+            'tests.CounterTestModel'
+        ]
+        self.assertEqual(operations.keys(), ['update'])
+        self.assertEqual(operations['update']['calls'], 2)
+
+        instance = CounterTestModel.objects.get(pk='home')
+        self.assertEqual(instance.views, 2)
+        self.assertEqual(instance.likes, 1)
+
+        self.assertRaises(
+            DatabaseError,
+            query.update,
+            views=5
+        )
+        self.assertRaises(
+            DatabaseError,
+            query.update,
+            views=F('likes') + 1
+        )
+
+    def test_save(self):
+        instance = CounterTestModel.objects.create(
+            page='about',
+            views=2
+        )
+        self.assertEqual(
+            CounterTestModel.objects.get(pk='about').views,
+            2
+        )
+
+        # Saves only add what changed since the instance was read.
+        other = CounterTestModel.objects.get(pk='about')
+        instance.views += 1
+        instance.save()
+        other.views += 5
+        other.save()
+        other.save()
+
+        instance.refresh_from_db()
+        self.assertEqual(instance.views, 8)
+        self.assertEqual(instance.likes, 0)
+
+    def test_save_under_new_key(self):
+        instance = CounterTestModel.objects.create(
+            page='contact',
+            views=4
+        )
+        instance = CounterTestModel.objects.get(pk='contact')
+
+        # The copy starts from nothing, its counters are written whole.
+        instance.pk = 'contact-copy'
+        instance.save()
+        self.assertEqual(
+            CounterTestModel.objects.get(pk='contact-copy').views,
+            4
+        )
+        self.assertEqual(
+            CounterTestModel.objects.get(pk='contact').views,
+            4
+        )
+
+    def test_check(self):
+        from django.db import models
+
+        class PlainCounterModel(models.Model):
+            class Meta:
+                app_label = 'tests'
+                apps = Apps()
+
+            views = CounterField()
+
+        errors = PlainCounterModel._meta.get_field('views').check()
+        self.assertEqual(
+            [error.id for error in errors],
+            ['djangocassandra.E001']
+        )
+        self.assertEqual(
+            CounterTestModel._meta.get_field('views').check(),
+            []
+        )
+
+
+class CollectionUpdateTestCase(TestCase):
+    def setUp(self):
+        self.connection = connect_db()
+
+        create_model(
+            self.connection,
+            CollectionTestModel
+        )
+
+        self.instance = CollectionTestModel.objects.create(
+            tags=set(['a', 'b']),
+            history=[1, 2],
+            attributes={'x': '1', 'y': '2'}
+        )
+
+    def tearDown(self):
+        reset_db(self.connection)
+
+    def test_update(self):
+        query = CollectionTestModel.objects.filter(pk=self.instance.pk)
+        query.update(tags=Add('c', 'd'))
+        query.update(tags=Discard('a'))
+        query.update(history=Append(3, 4))
+        query.update(history=Prepend(0))
+        query.update(history=Discard(2))
+        query.update(history=SetItem(0, 9))
+        query.update(
+            attributes=SetItem('z', '3')
+        )
+        query.update(attributes=RemoveKey('x'))
+
+        instance = query.get()
+        self.assertEqual(instance.tags, set(['b', 'c', 'd']))
+        self.assertEqual(instance.history, [9, 1, 3, 4])
+        self.assertEqual(instance.attributes, {'y': '2', 'z': '3'})
+
+        self.assertRaises(
+            DatabaseError,
+            query.update,
+            tags=Append('e')
+        )
+
+    def test_save(self):
+        # Both saves only write their own changes.
+        first = CollectionTestModel.objects.get(pk=self.instance.pk)
+        second = CollectionTestModel.objects.get(pk=self.instance.pk)
+
+        first.tags.add('c')
+        first.history.append(3)
+        first.attributes['z'] = '3'
+        first.save()
+
+        second.tags.discard('a')
+        second.history.insert(0, 0)
+        del second.attributes['x']
+        second.save()
+
+        instance = CollectionTestModel.objects.get(pk=self.instance.pk)
+        self.assertEqual(instance.tags, set(['b', 'c']))
+        self.assertEqual(instance.history, [0, 1, 2, 3])
+        self.assertEqual(instance.attributes, {'y': '2', 'z': '3'})
+
+        # Lists that can't be changed at their ends are rewritten.
+        instance.history.reverse()
+        instance.save()
+        instance.save()
+        self.assertEqual(
+            CollectionTestModel.objects.get(pk=self.instance.pk).history,
+            [3, 2, 1, 0]
+        )
+
+    def test_save_under_new_key(self):
+        instance = CollectionTestModel.objects.get(pk=self.instance.pk)
+        instance.pk = None
+        instance.tags.add('c')
+        instance.save()
+
+        # The copy has every element, not only the added one.
+        copied = CollectionTestModel.objects.get(pk=instance.pk)
+        self.assertNotEqual(copied.pk, self.instance.pk)
+        self.assertEqual(copied.tags, set(['a', 'b', 'c']))
+        self.assertEqual(copied.history, [1, 2])
+        self.assertEqual(copied.attributes, {'x': '1', 'y': '2'})
@@ -15,7 +15,7 @@ from .models import (
 from .util import (
     connect_db,
     create_model,
-    destroy_db
+    reset_db
 )
 
 
@@ -52,7 +52,7 @@ class DatabaseInsertionTestCase(TestCase):
         django.setup()
 
     def tearDown(self):
-        destroy_db(self.connection)
+        reset_db(self.connection)
 
     def test_insertion(self):
         inserted = SimpleTestModel.objects.create(
@@ -23,6 +23,9 @@ class DatabaseIntrospectionTestCase(TestCase):
     def setUp(self):
         self.connection = connect_db()
 
+        # Other test cases keep their schema between tests.
+        destroy_db(self.connection)
+
         self.models = [
             SimpleTestModel,
             PartitionPrimaryKeyModel
@@ -54,3 +57,68 @@ class DatabaseIntrospectionTestCase(TestCase):
             PartitionPrimaryKeyModel._meta.db_table,
             table_names
         )
+
+    def test_get_table_description(self):
+        description = self.connection.introspection.get_table_description(
+            None,
+            SimpleTestModel._meta.db_table
+        )
+        self.assertEqual(
+            sorted(column.name for column in description),
+            sorted(
+                field.column for field in SimpleTestModel._meta.fields
+            )
+        )
+
+        columns = dict(
+            (column.name, column) for column in description
+        )
+        self.assertEqual(
+            columns['id'].type_code,
+            'int'
+        )
+        self.assertFalse(columns['id'].null_ok)
+        self.assertEqual(
+            columns['field_1'].type_code,
+            'text'
+        )
+        self.assertTrue(columns['field_1'].null_ok)
+
+    def test_get_table_description_unknown_table(self):
+        self.assertEqual(
+            self.connection.introspection.get_table_description(
+                None,
+                'tests_doesnotexist'
+            ),
+            []
+        )
+
+    def test_cache_invalidation(self):
+        introspection = self.connection.introspection
+        self.connection.settings_dict['INTROSPECTION_CACHE_TTL'] = 60
+        try:
+            self.assertNotIn(
+                DateTimeTestModel._meta.db_table,
+                introspection.table_names()
+            )
+
+            create_model(
+                self.connection,
+                DateTimeTestModel
+            )
+            self.assertIn(
+                DateTimeTestModel._meta.db_table,
+                introspection.table_names()
+            )
+
+            with self.connection.schema_editor() as editor:
+                editor.delete_model(DateTimeTestModel)
+
+            self.assertNotIn(
+                DateTimeTestModel._meta.db_table,
+                introspection.table_names()
+            )
+
+        finally:
+            del self.connection.settings_dict['INTROSPECTION_CACHE_TTL']
+            introspection.invalidate_cache()
@@ -0,0 +1,275 @@
+import time
+import datetime
+
+from unittest import TestCase
+
+from cassandra import (
+    InvalidRequest,
+    AlreadyExists
+)
+from cassandra.query import (
+    BatchStatement,
+    SimpleStatement,
+    dict_factory
+)
+from cassandra.concurrent import execute_concurrent_with_args
+
+from djangocassandra.db.backends.memory.cluster import MemoryCluster
+
+
+class MemoryClusterTestCase(TestCase):
+    def setUp(self):
+        self.cluster = MemoryCluster()
+        self.session = self.cluster.connect()
+        self.session.row_factory = dict_factory
+        self.session.execute(
+            'CREATE KEYSPACE memory WITH replication = '
+            '{\'class\': \'SimpleStrategy\', \'replication_factor\': 1}'
+        )
+        self.session.execute(
+            'CREATE TABLE memory.events ("source" text, "at" timestamp, '
+            '"kind" text, "tags" set<text>, PRIMARY KEY (("source"), "at")) '
+            'WITH CLUSTERING ORDER BY ("at" DESC)'
+        )
+        self.session.execute('CREATE INDEX ON memory.events ("kind")')
+
+        self.start = datetime.datetime(2016, 1, 1)
+        for source in ('a', 'b', 'c'):
+            for minute in xrange(10):
+                self.session.execute(
+                    'INSERT INTO memory.events ("source", "at", "kind") '
+                    'VALUES (%(0)s, %(1)s, %(2)s)',
+                    {
+                        '0': source,
+                        '1': self.start + datetime.timedelta(minutes=minute),
+                        '2': 'even' if 0 == minute % 2 else 'odd'
+                    }
+                )
+
+    def tearDown(self):
+        self.cluster.shutdown()
+
+    def test_schema(self):
+        keyspace_metadata = self.cluster.metadata.keyspaces['memory']
+        table_metadata = keyspace_metadata.tables['events']
+        self.assertEqual(
+            [column.name for column in table_metadata.partition_key],
+            ['source']
+        )
+        self.assertEqual(len(table_metadata.indexes), 1)
+
+        self.assertRaises(
+            AlreadyExists,
+            self.session.execute,
+            'CREATE TABLE memory.events ("source" text PRIMARY KEY)'
+        )
+
+    def test_select(self):
+        rows = list(self.session.execute(
+            'SELECT "at", "kind" FROM memory.events WHERE "source" = %s '
+            'LIMIT 3',
+            ['b']
+        ))
+        self.assertEqual(
+            [row['at'] for row in rows],
+            [
+                self.start + datetime.timedelta(minutes=minute)
+                for minute in (9, 8, 7)
+            ]
+        )
+
+        rows = list(self.session.execute(
+            'SELECT "at" FROM memory.events WHERE "source" = %s '
+            'ORDER BY "at" ASC',
+            ['b']
+        ))
+        self.assertEqual(rows[0]['at'], self.start)
+
+        count = self.session.execute(
+            'SELECT COUNT(*) FROM memory.events WHERE "kind" = %s',
+            ['odd']
+        )[0]['count']
+        self.assertEqual(count, 15)
+
+        self.assertRaises(
+            InvalidRequest,
+            self.session.execute,
+            'SELECT * FROM memory.events WHERE "at" > %s',
+            [self.start]
+        )
+
+        rows = list(self.session.execute(
+            'SELECT * FROM memory.events WHERE "at" > %s ALLOW FILTERING',
+            [self.start + datetime.timedelta(minutes=7)]
+        ))
+        self.assertEqual(len(rows), 6)
+
+    def test_paging(self):
+        statement = SimpleStatement(
+            'SELECT * FROM memory.events',
+            fetch_size=7
+        )
+        results = self.session.execute(statement)
+        self.assertEqual(len(results.current_rows), 7)
+        self.assertTrue(results.has_more_pages)
+        self.assertEqual(len(list(results)), 30)
+
+        # Partitions come back whole, in token order.
+        sources = [row['source'] for row in self.session.execute(
+            'SELECT "source" FROM memory.events'
+        )]
+        self.assertEqual(
+            sources,
+            sorted(sources, key=lambda source: sources.index(source))
+        )
+
+    def test_update(self):
+        self.session.execute(
+            'UPDATE memory.events SET "tags" = "tags" + %s '
+            'WHERE "source" = %s AND "at" = %s',
+            [set(['x', 'y']), 'a', self.start]
+        )
+        self.session.execute(
+            'UPDATE memory.events SET "tags" = "tags" - %s '
+            'WHERE "source" = %s AND "at" = %s',
+            [set(['x']), 'a', self.start]
+        )
+        row = self.session.execute(
+            'SELECT "tags" FROM memory.events '
+            'WHERE "source" = %s AND "at" = %s',
+            ['a', self.start]
+        )[0]
+        self.assertEqual(set(row['tags']), set(['y']))
+
+        self.session.execute(
+            'DELETE FROM memory.events WHERE "source" = %s',
+            ['a']
+        )
+        self.assertEqual(
+            len(list(self.session.execute('SELECT * FROM memory.events'))),
+            20
+        )
+
+    def test_prepared(self):
+        prepared = self.session.prepare(
+            'INSERT INTO memory.events ("source", "at", "kind") '
+            'VALUES (?, ?, ?)'
+        )
+        self.assertEqual(prepared.routing_key_indexes, [0])
+
+        batch = BatchStatement()
+        for minute in xrange(5):
+            batch.add(prepared, (
+                'd',
+                self.start + datetime.timedelta(minutes=minute),
+                'batched'
+            ))
+
+        self.session.execute(batch)
+
+        results = execute_concurrent_with_args(
+            self.session,
+            self.session.prepare(
+                'SELECT * FROM memory.events WHERE "source" = ?'
+            ),
+            [(source,) for source in 'abcd'],
+            concurrency=2
+        )
+        self.assertEqual(
+            [len(list(result.result_or_exc)) for result in results],
+            [10, 10, 10, 5]
+        )
+
+    def test_latency(self):
+        self.cluster.latency = 0.05
+
+        started = time.time()
+        self.session.execute('SELECT * FROM memory.events')
+        self.assertGreaterEqual(time.time() - started, 0.05)
+
+        started = time.time()
+        futures = [
+            self.session.execute_async(
+                'SELECT * FROM memory.events WHERE "source" = %s',
+                [source]
+            ) for source in ('a', 'b', 'c')
+        ]
+        for future in futures:
+            self.assertEqual(len(list(future.result())), 10)
+
+        self.assertLess(time.time() - started, 0.15)
+
+    def test_like(self):
+        self.assertRaises(
+            InvalidRequest,
+            self.session.execute,
+            'SELECT * FROM memory.events WHERE "kind" LIKE %s',
+            ['ev%']
+        )
+
+        self.session.execute(
+            'CREATE CUSTOM INDEX ON memory.events ("kind") USING '
+            '\'org.apache.cassandra.index.sasi.SASIIndex\' WITH OPTIONS = '
+            '{\'mode\': \'PREFIX\', \'case_sensitive\': \'false\'}'
+        )
+        rows = list(self.session.execute(
+            'SELECT * FROM memory.events WHERE "kind" LIKE %s',
+            ['EV%']
+        ))
+        self.assertEqual(len(rows), 15)
+
+        # Only CONTAINS mode indexes accept a leading wildcard.
+        self.assertRaises(
+            InvalidRequest,
+            self.session.execute,
+            'SELECT * FROM memory.events WHERE "kind" LIKE %s',
+            ['%dd']
+        )
+
+    def test_aggregates(self):
+        row = self.session.execute(
+            'SELECT count(*) AS "rows", min("at"), max("at") '
+            'FROM memory.events WHERE "source" = %s',
+            ['a']
+        )[0]
+        self.assertEqual(row['rows'], 10)
+        self.assertEqual(row['system.min(at)'], self.start)
+        self.assertEqual(
+            row['system.max(at)'],
+            self.start + datetime.timedelta(minutes=9)
+        )
+
+        rows = list(self.session.execute(
+            'SELECT "source", count("kind") FROM memory.events '
+            'GROUP BY "source"'
+        ))
+        self.assertEqual(
+            sorted(
+                (row['source'], row['system.count(kind)']) for row in rows
+            ),
+            [('a', 10), ('b', 10), ('c', 10)]
+        )
+
+        # Sums have the type of the column unless it's cast.
+        self.session.execute(
+            'CREATE TABLE memory.totals ("id" int PRIMARY KEY, "value" int)'
+        )
+        for value in (2 ** 31 - 1, 1):
+            self.session.execute(
+                'INSERT INTO memory.totals ("id", "value") VALUES (%s, %s)',
+                [value, value]
+            )
+
+        row = self.session.execute(
+            'SELECT sum("value") AS "wrapped", '
+            'sum(cast("value" as varint)) AS "total" FROM memory.totals'
+        )[0]
+        self.assertEqual(row['wrapped'], -2 ** 31)
+        self.assertEqual(row['total'], 2 ** 31)
+
+        # Groups have to be a primary key prefix.
+        self.assertRaises(
+            InvalidRequest,
+            self.session.execute,
+            'SELECT count(*) FROM memory.events GROUP BY "kind"'
+        )
@@ -0,0 +1,130 @@
+from unittest import TestCase
+
+from django.db import connections
+
+from .models import ColumnFamilyTestModel
+
+from .util import (
+    connect_db,
+    reset_db,
+    create_model
+)
+
+
+class MetricsTestCase(TestCase):
+    def setUp(self):
+        self.connection = connect_db()
+        create_model(
+            self.connection,
+            ColumnFamilyTestModel
+        )
+
+        import django
+        django.setup()
+
+        self.metrics = connections['default'].metrics
+        self.metrics.reset()
+
+    def tearDown(self):
+        reset_db(self.connection)
+
+    def test_operation_metrics(self):
+        for value in ('foo', 'bar', 'baz'):
+            ColumnFamilyTestModel.objects.create(
+                field_1=value,
+                field_2=value,
+                field_3=value
+            )
+
+        ColumnFamilyTestModel.objects.get(field_1='foo')
+        self.assertEqual(
+            len(ColumnFamilyTestModel.objects.filter(field_3='bar')),
+            1
+        )
+        self.assertEqual(ColumnFamilyTestModel.objects.count(), 3)
+
+        snapshot = self.metrics.snapshot()
+        operations = snapshot['operations']['tests.ColumnFamilyTestModel']
+
+        self.assertEqual(operations['insert']['calls'], 3)
+        self.assertEqual(operations['insert']['batch_sizes']['total'], 3)
+
+        self.assertEqual(operations['get']['calls'], 1)
+        self.assertEqual(operations['get']['rows_returned'], 1)
+
+        filtered = operations['filter']
+        self.assertEqual(filtered['calls'], 1)
+        self.assertEqual(filtered['rows_fetched'], 3)
+        self.assertEqual(filtered['rows_returned'], 1)
+        self.assertEqual(filtered['rows_filtered'], 2)
+        self.assertGreaterEqual(filtered['pages'], 1)
+        self.assertEqual(filtered['latency_ms']['count'], 1)
+
+        self.assertEqual(operations['count']['rows_returned'], 3)
+
+    def test_histogram(self):
+        from djangocassandra.db.backends.cassandra.metrics import Histogram
+
+        histogram = Histogram((1, 10, 100))
+        for value in (0.5, 5, 5, 50, 500):
+            histogram.observe(value)
+
+        values = histogram.as_dict()
+        self.assertEqual(values['count'], 5)
+        self.assertEqual(values['min'], 0.5)
+        self.assertEqual(values['max'], 500)
+        self.assertEqual(values['p50'], 10)
+        self.assertEqual(values['p99'], 500)
+
+    def test_consumer_time_not_counted(self):
+        import time
+
+        ColumnFamilyTestModel.objects.create(
+            field_1='foo',
+            field_2='bar',
+            field_3='baz'
+        )
+        self.metrics.reset()
+
+        for instance in ColumnFamilyTestModel.objects.filter(field_3='baz'):
+            time.sleep(0.05)
+
+        latency = self.metrics.snapshot()['operations'][
+            'tests.ColumnFamilyTestModel'
+        ]['filter']['latency_ms']
+        self.assertEqual(latency['count'], 1)
+        self.assertLess(latency['max'], 50)
+
+    def test_executemany_error(self):
+        cursor = self.connection.cursor()
+        with self.assertRaises(Exception):
+            cursor.executemany(
+                'INSERT INTO missing_table (id) VALUES (?)',
+                [(1,), (2,)]
+            )
+
+        executemany = self.connection.metrics.snapshot()['operations']['-'][
+            'executemany'
+        ]
+        self.assertEqual(executemany['calls'], 1)
+        self.assertEqual(executemany['errors'], 1)
+
+    def test_disabled(self):
+        from djangocassandra.db.backends.cassandra.metrics import (
+            MetricsRegistry
+        )
+
+        self.connection.settings_dict['COLLECT_METRICS'] = False
+        try:
+            metrics = MetricsRegistry(self.connection)
+
+        finally:
+            self.connection.settings_dict['COLLECT_METRICS'] = True
+
+        with metrics.start(ColumnFamilyTestModel, 'get'):
+            pass
+
+        metrics.record_statement_cache(True)
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['operations'], {})
+        self.assertEqual(snapshot['statement_cache']['hits'], 0)
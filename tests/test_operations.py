@@ -3,7 +3,8 @@ import uuid
 from unittest import TestCase
 
 from .models import (
-    ColumnFamilyTestModel
+    ColumnFamilyTestModel,
+    DictFieldModel
 )
 
 from .util import (
@@ -43,12 +44,12 @@ class OperationsTestCase(TestCase):
             len(cql)
         )
         self.assertEquals(
-            'use %s;' % (self.connection.keyspace,),
+            'use "%s";' % (self.connection.keyspace,),
             cql[0].lower()
         )
         for i in xrange(len(test_model_names)):
             self.assertEquals(
-                'truncate %s;' % (test_model_names[i],),
+                'truncate "%s";' % (test_model_names[i],),
                 cql[i + 1].lower()
             )
 
@@ -63,3 +64,67 @@ class OperationsTestCase(TestCase):
             self.connection.ops.value_to_db_auto(value.hex).hex,
             value.hex
         )
+
+    def test_model_converters(self):
+        converters = self.connection.ops.get_model_converters(
+            DictFieldModel
+        )
+        self.assertIs(
+            converters,
+            self.connection.ops.get_model_converters(DictFieldModel)
+        )
+
+        id_converter = converters.by_column['id']
+        self.assertIsNone(id_converter.to_db)
+        self.assertIsNone(id_converter.from_db)
+
+        parameters_converter = converters.by_column['parameters']
+        self.assertEquals(
+            {'key': 'value'},
+            parameters_converter.from_db([('key', 'value')])
+        )
+
+    def test_flush_tables(self):
+        ColumnFamilyTestModel.objects.create(
+            field_1='foo',
+            field_2='bar',
+            field_3='raw'
+        )
+
+        table_name = ColumnFamilyTestModel._meta.db_table
+        flushed = self.connection.ops.flush_tables([table_name])
+        self.assertEquals(1, len(flushed))
+        self.assertEquals(0, len(ColumnFamilyTestModel.objects.all()))
+
+        flushed = self.connection.ops.flush_tables([table_name])
+        self.assertEquals(0, len(flushed))
+
+    def test_flush_skip_empty(self):
+        from django.core.management.color import no_style
+
+        ColumnFamilyTestModel.objects.create(
+            field_1='foo',
+            field_2='bar',
+            field_3='raw'
+        )
+
+        table_name = ColumnFamilyTestModel._meta.db_table
+        self.connection.settings_dict['FLUSH_SKIP_EMPTY'] = True
+        try:
+            cql = self.connection.ops.sql_flush(
+                no_style(),
+                [table_name],
+                ()
+            )
+            self.assertEquals(2, len(cql))
+
+            self.connection.ops.flush_tables([table_name])
+            cql = self.connection.ops.sql_flush(
+                no_style(),
+                [table_name],
+                ()
+            )
+            self.assertEquals([], cql)
+
+        finally:
+            del self.connection.settings_dict['FLUSH_SKIP_EMPTY']
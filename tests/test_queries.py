@@ -3,17 +3,28 @@ import uuid
 
 from unittest import TestCase
 
+from django.db import connections
+from django.db.models import (
+    Avg,
+    Count,
+    Max,
+    Min,
+    Sum
+)
+
 from .models import (
     SimpleTestModel,
     DerivedPartitionPrimaryKeyModel,
     PartitionPrimaryKeyModel,
     ClusterPrimaryKeyModel,
-    ColumnFamilyTestModel
+    ColumnFamilyTestModel,
+    SASIIndexedTestModel,
+    AggregateTestModel
 )
 
 from .util import (
     connect_db,
-    destroy_db,
+    reset_db,
     create_model
 )
 
@@ -60,7 +71,7 @@ class DatabaseSimpleQueryTestCase(TestCase):
         django.setup()
 
     def tearDown(self):
-        destroy_db(self.connection)
+        reset_db(self.connection)
 
     def test_filter_on_unindexed_column(self):
         field_3_filter = SimpleTestModel.objects.filter(field_3='raw')
@@ -155,7 +166,7 @@ class DatabaseClusteringKeyTestCase(TestCase):
         django.setup()
 
     def tearDown(self):
-        destroy_db(self.connection)
+        reset_db(self.connection)
 
     def inefficient_filter(self):
         manager = ClusterPrimaryKeyModel.objects
@@ -295,6 +306,125 @@ class DatabaseClusteringKeyTestCase(TestCase):
                 filtered_rows_ordered_desc[i].data
             )
 
+    def test_explain(self):
+        manager = ClusterPrimaryKeyModel.objects
+
+        plan = manager.filter(
+            field_1=self.uuid1,
+            field_2='aaaa'
+        ).order_by('field_2').explain()
+
+        self.assertEqual(
+            sorted(
+                (where['column'], where['kind']) for where in plan['where']
+            ),
+            [('field_1', 'partition'), ('field_2', 'clustering')]
+        )
+        self.assertEqual(plan['client_side'], [])
+        self.assertEqual(plan['ordering']['pushed_down'], ['field_2'])
+        self.assertEqual(plan['ordering']['in_memory'], [])
+        self.assertTrue(plan['single_partition'])
+        self.assertEqual(plan['estimated_partitions'], 1)
+        self.assertFalse(plan['inefficient'])
+        self.assertNotIn('%(', plan['cql'])
+        self.assertEqual(plan['cql'].count('?'), len(plan['parameters']))
+
+        plan = manager.filter(data='Bar').order_by('data').explain()
+        self.assertEqual(plan['where'], [])
+        self.assertEqual(len(plan['client_side']), 1)
+        self.assertEqual(plan['ordering']['in_memory'], ['data'])
+        self.assertFalse(plan['single_partition'])
+        self.assertTrue(plan['inefficient'])
+
+
+    def test_clustering_key_in_filter(self):
+        query = ClusterPrimaryKeyModel.objects.filter(
+            field_1=self.uuid0,
+            field_2__in=['bbbb', 'aaaa', 'cccc']
+        ).order_by('-field_2')
+
+        self.assertEqual(
+            [row.data for row in query],
+            ['Tao', 'Foo']
+        )
+
+        plan = query.explain()
+        self.assertEqual(plan['statements'], 1)
+        self.assertIn('IN ?', plan['cql'])
+        self.assertEqual(plan['client_side'], [])
+        self.assertEqual(plan['ordering']['pushed_down'], ['-field_2'])
+
+        # Without the partition key Cassandra only takes exact lookups.
+        query = ClusterPrimaryKeyModel.objects.filter(
+            field_2__in=['aaaa', 'bbbb'],
+            field_3='aaaa'
+        )
+        self.assertEqual(
+            sorted(row.data for row in query),
+            ['Bar', 'Lel']
+        )
+        self.assertEqual(query.explain()['statements'], 2)
+
+        self.assertEqual(
+            list(ClusterPrimaryKeyModel.objects.filter(
+                field_1=self.uuid0,
+                field_2__in=['aaaa'],
+                field_2__gt='aaaa'
+            )),
+            []
+        )
+
+    def test_values(self):
+        manager = ClusterPrimaryKeyModel.objects
+        instances = list(manager.filter(field_1=self.uuid0))
+
+        self.assertEqual(
+            list(manager.filter(field_1=self.uuid0).values_list(
+                'data',
+                flat=True
+            )),
+            ['Foo', 'Tao']
+        )
+        self.assertEqual(
+            list(manager.filter(field_1=self.uuid0).values_list(
+                'field_2',
+                'data'
+            )),
+            [(instance.field_2, instance.data) for instance in instances]
+        )
+
+        # Like the rest of Django, values() skips SubfieldBase to_python.
+        rows = list(manager.filter(field_1=self.uuid0).values())
+        self.assertEqual(
+            [str(row['field_1']) for row in rows],
+            [self.uuid0, self.uuid0]
+        )
+        self.assertEqual(
+            set(rows[0]),
+            set(
+                field.attname
+                for field in ClusterPrimaryKeyModel._meta.concrete_fields
+            )
+        )
+        self.assertEqual(
+            list(manager.filter(field_1=self.uuid0).values(
+                'field_3',
+                'data'
+            )),
+            [
+                {'field_3': instance.field_3, 'data': instance.data}
+                for instance in instances
+            ]
+        )
+        self.assertEqual(
+            list(manager.filter(field_1=self.uuid1).values('data')[:1]),
+            [{'data': 'Bar'}]
+        )
+        self.assertEqual(
+            list(manager.none().values_list('data', flat=True)),
+            []
+        )
+
 
 class DatabasePartitionKeyTestCase(TestCase):
     def setUp(self):
@@ -347,7 +477,7 @@ class DatabasePartitionKeyTestCase(TestCase):
         django.setup()
 
     def tearDown(self):
-        destroy_db(self.connection)
+        reset_db(self.connection)
 
     def test_in_filter(self):
         qs = PartitionPrimaryKeyModel.objects.filter(pk__in=[
@@ -356,6 +486,29 @@ class DatabasePartitionKeyTestCase(TestCase):
         ])
         self.assertEqual(4, len(qs))
 
+    def test_partition_key_in_filter(self):
+        query = PartitionPrimaryKeyModel.objects.filter(
+            field_1__in=['aaaa', 'bbbb'],
+            field_2__in=['bbbb']
+        )
+        self.assertEqual(
+            sorted(row.data for row in query),
+            ['Lel', 'Tao']
+        )
+
+        # One single partition lookup per partition.
+        plan = query.explain()
+        self.assertEqual(plan['statements'], 2)
+        self.assertNotIn(' IN ', plan['cql'])
+        self.assertEqual(plan['estimated_partitions'], 2)
+        self.assertFalse(plan['single_partition'])
+
+        plan = PartitionPrimaryKeyModel.objects.filter(
+            pk__in=['aaaa', 'bbbb']
+        ).explain()
+        self.assertEqual(plan['statements'], 2)
+        self.assertFalse(plan['inefficient'])
+
     def test_filter_all_partition_keys(self):
         qs = PartitionPrimaryKeyModel.objects.filter(
             field_1='aaaa',
@@ -364,6 +517,236 @@ class DatabasePartitionKeyTestCase(TestCase):
         self.assertEqual(1, len(qs))
 
 
+class DatabaseSASIQueryTestCase(TestCase):
+    def setUp(self):
+        self.connection = connect_db()
+
+        create_model(
+            self.connection,
+            SASIIndexedTestModel
+        )
+
+        manager = SASIIndexedTestModel.objects
+        for title, author in (
+            ('Cassandra Internals', 'Avinash Lakshman'),
+            ('Dynamo Revisited', 'Werner Vogels'),
+            ('Inside Bigtable', 'Jeff Dean'),
+            ('Cassandra Operations', 'jonathan ellis')
+        ):
+            manager.create(
+                title=title,
+                author=author
+            )
+
+    def tearDown(self):
+        reset_db(self.connection)
+
+    def test_like_pushdown(self):
+        manager = SASIIndexedTestModel.objects
+
+        self.assertEqual(
+            sorted(row.title for row in manager.filter(
+                title__startswith='Cassandra'
+            )),
+            ['Cassandra Internals', 'Cassandra Operations']
+        )
+        self.assertEqual(
+            [row.title for row in manager.filter(title__endswith='isited')],
+            ['Dynamo Revisited']
+        )
+        self.assertEqual(
+            [row.title for row in manager.filter(title__contains='Big')],
+            ['Inside Bigtable']
+        )
+        self.assertEqual(
+            sorted(row.author for row in manager.filter(
+                author__istartswith='J'
+            )),
+            ['Jeff Dean', 'jonathan ellis']
+        )
+
+        plan = manager.filter(title__contains='Big').explain()
+        self.assertEqual(
+            [(where['column'], where['kind']) for where in plan['where']],
+            [('title', 'sasi')]
+        )
+        self.assertIn('LIKE ?', plan['cql'])
+        self.assertEqual(plan['parameters'], ['%Big%'])
+        self.assertFalse(plan['inefficient'])
+
+    def test_unsupported_like(self):
+        manager = SASIIndexedTestModel.objects
+
+        # The title index is case sensitive, the author one only
+        # indexes prefixes.
+        for query in (
+            manager.filter(title__icontains='big'),
+            manager.filter(author__contains='Dean'),
+            manager.filter(title__contains='100%')
+        ):
+            plan = query.explain()
+            self.assertEqual(plan['where'], [])
+            self.assertTrue(plan['raises_inefficient_query_error'])
+
+    def test_scan(self):
+        query = SASIIndexedTestModel.objects.filter(author__gte='K')
+        self.assertTrue(query.explain()['raises_inefficient_query_error'])
+
+        query = query.scan()
+        self.assertFalse(query.explain()['raises_inefficient_query_error'])
+        self.assertEqual(
+            sorted(row.author for row in query),
+            ['Werner Vogels', 'jonathan ellis']
+        )
+        self.assertEqual(len(query[:1]), 1)
+
+    def test_sasi_index_creation(self):
+        table_metadata = self.connection.cluster.metadata.keyspaces[
+            self.connection.current_keyspace()
+        ].tables[SASIIndexedTestModel._meta.db_table]
+
+        options = dict(
+            (
+                index_metadata.index_options['target'],
+                index_metadata.index_options
+            ) for index_metadata in table_metadata.indexes.values()
+        )
+        self.assertEqual(options['title']['mode'], 'CONTAINS')
+        self.assertEqual(options['author']['mode'], 'PREFIX')
+        self.assertEqual(options['author']['case_sensitive'], 'false')
+
+
+class DatabaseAggregateQueryTestCase(TestCase):
+    def setUp(self):
+        self.connection = connect_db()
+
+        create_model(
+            self.connection,
+            AggregateTestModel
+        )
+
+        for factor, sensor in enumerate(('a', 'b', 'c'), 1):
+            for minute in xrange(10):
+                AggregateTestModel.objects.create(
+                    sensor=sensor,
+                    minute=minute,
+                    value=minute * factor,
+                    parity='even' if 0 == minute % 2 else 'odd'
+                )
+
+        self.metrics = connections['default'].metrics
+        self.metrics.reset()
+
+    def tearDown(self):
+        reset_db(self.connection)
+
+    def test_aggregate_pushdown(self):
+        manager = AggregateTestModel.objects
+        self.assertEqual(
+            manager.filter(sensor='b').aggregate(
+                Sum('value'),
+                Avg('value'),
+                Min('value'),
+                Max('value'),
+                Count('value')
+            ),
+            {
+                'value__sum': 90,
+                'value__avg': 9.0,
+                'value__min': 0,
+                'value__max': 18,
+                'value__count': 10
+            }
+        )
+        self.assertEqual(manager.filter(sensor='a').count(), 10)
+        self.assertEqual(
+            manager.filter(sensor='z').aggregate(Sum('value')),
+            {'value__sum': None}
+        )
+
+        # The whole table is aggregated per token range.
+        self.assertEqual(
+            manager.aggregate(total=Sum('value'))['total'],
+            270
+        )
+
+        operations = self.metrics.snapshot()['operations'][
+            'tests.AggregateTestModel'
+        ]
+        self.assertEqual(operations['aggregate']['rows_fetched'], 2 + 64)
+        self.assertEqual(operations['count']['rows_fetched'], 1)
+
+    def test_aggregate_overflow(self):
+        manager = AggregateTestModel.objects
+        for minute in xrange(3):
+            manager.create(
+                sensor='big',
+                minute=minute,
+                value=2 ** 31 - 1,
+                parity='even' if 0 == minute % 2 else 'odd'
+            )
+
+        # A CQL sum of an int column is an int, the values are summed
+        # as varints instead.
+        self.assertEqual(
+            manager.filter(sensor='big').aggregate(
+                Sum('value'),
+                Avg('value')
+            ),
+            {
+                'value__sum': 3 * (2 ** 31 - 1),
+                'value__avg': float(2 ** 31 - 1)
+            }
+        )
+        self.assertEqual(
+            manager.aggregate(total=Sum('value'))['total'],
+            270 + 3 * (2 ** 31 - 1)
+        )
+
+        operations = self.metrics.snapshot()['operations'][
+            'tests.AggregateTestModel'
+        ]
+        self.assertEqual(operations['aggregate']['rows_fetched'], 1 + 64)
+
+    def test_streaming_aggregate(self):
+        manager = AggregateTestModel.objects
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            self.assertEqual(
+                manager.filter(parity='odd').aggregate(
+                    Sum('value'),
+                    Count('sensor', distinct=True)
+                ),
+                {
+                    'value__sum': 150,
+                    'sensor__count': 3
+                }
+            )
+
+    def test_grouped_aggregate(self):
+        manager = AggregateTestModel.objects
+        self.assertEqual(
+            list(manager.values('sensor').annotate(
+                total=Sum('value')
+            ).order_by('-total')),
+            [
+                {'sensor': 'c', 'total': 135},
+                {'sensor': 'b', 'total': 90},
+                {'sensor': 'a', 'total': 45}
+            ]
+        )
+
+        # Grouping by other columns is done client side.
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            self.assertEqual(
+                sorted(manager.values_list('parity').annotate(
+                    Max('value')
+                )),
+                [('even', 24), ('odd', 27)]
+            )
+
+
 class DerivedPartitionKeyModelTestCase(TestCase):
     def setUp(self):
         self.connection = connect_db()
@@ -415,7 +798,7 @@ class DerivedPartitionKeyModelTestCase(TestCase):
         django.setup()
 
     def tearDown(self):
-        destroy_db(self.connection)
+        reset_db(self.connection)
 
     def test_nothing(self):
         pass
@@ -465,7 +848,7 @@ class ColumnFamilyModelPagingQueryTestCase(TestCase):
         django.setup()
 
     def tearDown(self):
-        destroy_db(self.connection)
+        reset_db(self.connection)
 
     def test_paged_query(self):
         all_results = []
@@ -497,3 +880,14 @@ class ColumnFamilyModelPagingQueryTestCase(TestCase):
             all_results.extend(next_result)
 
         self.assertEqual(len(all_results), self.created_rows)
+
+    def test_replica_query(self):
+        replica_results = list(
+            ColumnFamilyTestModel.objects.using_replica('analytics').all()
+        )
+        self.assertEqual(len(replica_results), self.created_rows)
+
+        self.assertIs(
+            self.connection.get_replica_session('analytics'),
+            self.connection.get_replica_session('analytics')
+        )
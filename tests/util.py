@@ -5,14 +5,14 @@ random.seed()
 import string
 
 from django.conf import settings
+from django.db.utils import load_backend
 
 from cassandra.cqlengine.management import drop_keyspace
 
-from djangocassandra.db.backends.cassandra.base import DatabaseWrapper
-
 
 def connect_db():
-    connection = DatabaseWrapper(settings.DATABASES['default'])
+    backend = load_backend(settings.DATABASES['default']['ENGINE'])
+    connection = backend.DatabaseWrapper(settings.DATABASES['default'])
     connection_params = connection.get_connection_params()
     connection.get_new_connection(connection_params)
     return connection
@@ -39,6 +39,24 @@ def destroy_db(connection):
             drop_keyspace(keyspace)
 
 
+def reset_db(connection):
+    '''
+    Removes all rows from every table in the test keyspaces while
+    keeping the schema so the next test doesn't have to recreate it.
+    '''
+    if None is not connection:
+        keyspaces_metadata = connection.cluster.metadata.keyspaces
+        for keyspace in settings.DATABASES['default']['KEYSPACES'].keys():
+            keyspace_metadata = keyspaces_metadata.get(keyspace)
+            if None is keyspace_metadata:
+                continue
+
+            connection.ops.flush_tables(
+                keyspace_metadata.tables.keys(),
+                keyspace=keyspace
+            )
+
+
 def random_float(minimum=sys.float_info.min, maximum=sys.float_info.max):
     return random.uniform(minimum, maximum)
 